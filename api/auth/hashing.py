@@ -1,7 +1,21 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import time
+from typing import Optional, Tuple
+
+from api import config
+from api.telemetry import Counter
+from api.telemetry import Histogram
 from passlib.context import CryptContext
 
-# Configura CryptContext para usar Argon2 como esquema por defecto
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Configura CryptContext para usar Argon2 como esquema por defecto. Los
+# hashes con parámetros distintos a los configurados se marcan para rehash.
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=config.settings.ARGON2_TIME_COST,
+    argon2__memory_cost=config.settings.ARGON2_MEMORY_COST)
 
 
 def hash_password(password: str) -> str:
@@ -12,3 +26,103 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
   """Verifica si una contraseña coincide con su hash Argon2."""
   return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str,
+                      hashed_password: str) -> Tuple[bool, Optional[str]]:
+  """Verifica la contraseña y, si el hash usa parámetros antiguos,
+    devuelve un hash nuevo con los parámetros actuales.
+    """
+  return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _arrancar_proceso() -> None:
+  """Tarea vacía que obliga al pool a crear un proceso."""
+
+
+class HashingQueueFull(Exception):
+  """El pool de hashing tiene PASSWORD_HASH_MAX_QUEUE operaciones en curso."""
+
+
+class PasswordHashingPool:
+  """Pool de procesos dedicado a Argon2, separado del threadpool de la app.
+
+    Limita las operaciones pendientes (en cola o ejecutándose) para que una
+    avalancha de logins se rechace rápido en lugar de acumular latencia.
+    """
+
+  def __init__(self, workers: int, max_queue: int):
+    self.workers = workers
+    self.max_queue = max_queue
+    self._executor: Optional[ProcessPoolExecutor] = None
+    self._lock = threading.Lock()
+    self.in_flight = 0
+    self.rejected = Counter()
+    self.duration_seconds = Histogram()
+
+  def start(self) -> None:
+    """Crea el pool y arranca sus procesos (lo llama el lifespan de la app).
+
+      Así el costo de crear los procesos no recae en el primer login. Fuera
+      de la app (scripts, tests) el pool se crea en el primer uso.
+      """
+    executor = self._get_executor()
+    # Cada tarea enviada sin procesos libres arranca uno nuevo
+    for _ in range(self.workers):
+      executor.submit(_arrancar_proceso)
+
+  def _get_executor(self) -> ProcessPoolExecutor:
+    with self._lock:
+      if self._executor is None:
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+      return self._executor
+
+  async def run(self, fn, *args):
+    """Ejecuta fn(*args) en el pool; lanza HashingQueueFull si está lleno."""
+    with self._lock:
+      if self.in_flight >= self.max_queue:
+        self.rejected.inc()
+        raise HashingQueueFull()
+      self.in_flight += 1
+    start = time.perf_counter()
+    try:
+      loop = asyncio.get_running_loop()
+      return await loop.run_in_executor(self._get_executor(), fn, *args)
+    finally:
+      self.duration_seconds.observe(time.perf_counter() - start)
+      with self._lock:
+        self.in_flight -= 1
+
+  def shutdown(self) -> None:
+    with self._lock:
+      executor, self._executor = self._executor, None
+    if executor is not None:
+      executor.shutdown(wait=False, cancel_futures=True)
+
+  def stats(self) -> dict:
+    return {
+        "workers": self.workers,
+        "in_flight": self.in_flight,
+        "queued": max(self.in_flight - self.workers, 0),
+        "max_queue": self.max_queue,
+        "rejected": self.rejected.value,
+        "duration_seconds": self.duration_seconds.snapshot(),
+        "argon2_time_cost": config.settings.ARGON2_TIME_COST,
+        "argon2_memory_cost": config.settings.ARGON2_MEMORY_COST,
+    }
+
+
+hashing_pool = PasswordHashingPool(config.settings.PASSWORD_HASH_WORKERS,
+                                   config.settings.PASSWORD_HASH_MAX_QUEUE)
+
+
+async def hash_password_async(password: str) -> str:
+  """hash_password ejecutado en el pool de hashing."""
+  return await hashing_pool.run(hash_password, password)
+
+
+async def verify_and_update_async(
+    plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+  """verify_and_update ejecutado en el pool de hashing."""
+  return await hashing_pool.run(verify_and_update, plain_password,
+                                hashed_password)
@@ -1,9 +1,11 @@
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
+import time
 from typing import Optional
 
 from api import config
+from api.cache import LRUCache
 from fastapi import Header
 from fastapi import HTTPException
 from fastapi import status
@@ -13,6 +15,10 @@ from jose import JWTError
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Payloads de tokens ya verificados, indexados por el token completo (firma
+# incluida). Cada entrada expira con el exp del token.
+token_cache = LRUCache(config.settings.JWT_CACHE_SIZE)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
   """Crea un token JWT de acceso."""
@@ -29,12 +35,30 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
   return encoded_jwt
 
 
+def _decode_token(token: str) -> dict:
+  """Decodifica y verifica el token, reutilizando verificaciones previas.
+
+    Lanza JWTError si el token es inválido o expiró; los tokens inválidos
+    no se cachean.
+    """
+  payload = token_cache.get(token)
+  if payload is not None:
+    return payload
+  payload = jwt.decode(token,
+                       config.settings.SECRET_KEY,
+                       algorithms=[config.settings.ALGORITHM])
+  exp = payload.get("exp")
+  if exp is not None:
+    restante = exp - time.time()
+    if restante > 0:
+      token_cache.set(token, payload, ttl_seconds=restante)
+  return payload
+
+
 def verify_access_token(token: str):
   """Verifica un token JWT y devuelve el ID de usuario si es válido."""
   try:
-    payload = jwt.decode(token,
-                         config.settings.SECRET_KEY,
-                         algorithms=[config.settings.ALGORITHM])
+    payload = _decode_token(token)
     user_id: int = payload.get("sub")
     if user_id is None:
       raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,15 +69,20 @@ def verify_access_token(token: str):
                         detail="Token inválido o expirado.")
 
 
-def get_user_id_from_token(authorization: str = Header(None)) -> int | None:
-  """Extracts user ID from Authorization header if valid JWT is present."""
+async def get_user_id_from_token(authorization: str = Header(
+    None)) -> int | None:
+  """Extracts user ID from Authorization header if valid JWT is present.
+
+    Declared async so FastAPI resolves it on the event loop instead of
+    dispatching it to the threadpool.
+    """
   if not authorization or not authorization.startswith("Bearer "):
     return None
   token = authorization.split(" ")[1]
   try:
-    payload = jwt.decode(token,
-                         config.settings.SECRET_KEY,
-                         algorithms=[config.settings.ALGORITHM])
-    return payload.get("sub")
-  except JWTError:
+    payload = _decode_token(token)
+    user_id = payload.get("sub")
+    # asyncpg no convierte tipos implícitamente: el "sub" del JWT es texto
+    return int(user_id) if user_id is not None else None
+  except (JWTError, ValueError):
     return None
@@ -0,0 +1,69 @@
+"""
+In-process caching primitives for MoneyPilot API.
+Caches are per worker process: entries are never shared between uvicorn
+workers, so every cache here is bounded in size and age.
+"""
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+  """Thread-safe LRU cache with optional per-entry expiry and hit counters."""
+
+  def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None):
+    self.maxsize = maxsize
+    self.ttl_seconds = ttl_seconds
+    self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    """Returns the cached value, or default when missing or expired."""
+    now = time.monotonic()
+    with self._lock:
+      entry = self._entries.get(key, _MISSING)
+      if entry is not _MISSING:
+        value, expires_at = entry
+        if expires_at is None or expires_at > now:
+          self._entries.move_to_end(key)
+          self.hits += 1
+          return value
+        del self._entries[key]
+      self.misses += 1
+      return default
+
+  def set(self,
+          key: Hashable,
+          value: Any,
+          ttl_seconds: Optional[float] = None) -> None:
+    """Stores a value; ttl_seconds overrides the cache-wide TTL."""
+    ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+    expires_at = time.monotonic() + ttl if ttl is not None else None
+    with self._lock:
+      self._entries[key] = (value, expires_at)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.maxsize:
+        self._entries.popitem(last=False)
+
+  def pop(self, key: Hashable) -> None:
+    with self._lock:
+      self._entries.pop(key, None)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._entries.clear()
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.misses
+    return {
+        "size": len(self._entries),
+        "maxsize": self.maxsize,
+        "hits": self.hits,
+        "misses": self.misses,
+        "hit_rate": self.hits / lookups if lookups else 0.0,
+    }
@@ -1,21 +1,176 @@
+import logging
+import time
+
 from api import config
+from api.telemetry import charge_query_budget
+from api.telemetry import Counter
+from api.telemetry import current_request
+from api.telemetry import Histogram
 from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+  """Estadísticas de checkout acumuladas para una clase de pool."""
+
+  def __init__(self):
+    self.checkout_wait_seconds = Histogram()
+    self.checkout_timeouts = Counter()
+
+
+class InstrumentedPoolMixin:
+  """Mide el tiempo de espera de cada checkout y cuenta los timeouts.
+
+    Las estadísticas viven en la clase para sobrevivir a ``pool.recreate()``
+    (p. ej. tras ``engine.dispose()``).
+    """
+
+  stats: PoolStats
+
+  def _do_get(self):
+    start = time.perf_counter()
+    try:
+      return super()._do_get()
+    except exc.TimeoutError:
+      self.stats.checkout_timeouts.inc()
+      raise
+    finally:
+      self.stats.checkout_wait_seconds.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+  stats = PoolStats()
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin,
+                                        AsyncAdaptedQueuePool):
+  stats = PoolStats()
+
+
+def _pool_options() -> dict:
+  """Opciones de pool comunes a ambos engines, tomadas de Settings."""
+  return {
+      "pool_size": config.settings.DB_POOL_SIZE,
+      "max_overflow": config.settings.DB_MAX_OVERFLOW,
+      "pool_recycle": config.settings.DB_POOL_RECYCLE,
+      "pool_pre_ping": config.settings.DB_POOL_PRE_PING,
+      "pool_timeout": config.settings.DB_POOL_TIMEOUT,
+  }
+
 
 # Crear el engine de SQLAlchemy
 engine = create_engine(
     config.settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    **_pool_options(),
     # echo=True # Descomentar para ver queries SQL en consola (útil para debugging)
 )
 
 # Crear una clase de sesión local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str):
+  """Devuelve la URL de la base de datos usando el driver asyncpg."""
+  return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+# Engine asíncrono usado por los routers (asyncpg)
+async_engine = create_async_engine(_async_database_url(
+    config.settings.DATABASE_URL),
+                                   poolclass=InstrumentedAsyncAdaptedQueuePool,
+                                   **_pool_options())
+
+# Sesiones asíncronas; expire_on_commit=False evita lazy loads tras el commit
+AsyncSessionLocal = async_sessionmaker(bind=async_engine,
+                                       autoflush=False,
+                                       expire_on_commit=False)
+
+
+class QueryBudgetExceeded(AssertionError):
+  """Una ruta ejecutó más sentencias SQL que las declaradas en su presupuesto.
+
+    Solo se lanza con QUERY_BUDGET_ENFORCE=true (p. ej. al correr tests);
+    si no, se registra una advertencia.
+    """
+
+
+def _antes_de_consulta(conn, cursor, statement, parameters, context,
+                       executemany):
+  """Cuenta la sentencia en la petición HTTP en curso y toma el tiempo."""
+  stats = current_request.get()
+  if stats is not None:
+    stats.queries += 1
+    if charge_query_budget.get():
+      stats.budgeted_queries += 1
+    if (stats.query_budget is not None and
+        stats.budgeted_queries == stats.query_budget + 1):
+      mensaje = (f"{stats.route} superó su presupuesto de "
+                 f"{stats.query_budget} consultas: {statement}")
+      if config.settings.QUERY_BUDGET_ENFORCE:
+        raise QueryBudgetExceeded(mensaje)
+      logger.warning(mensaje)
+  conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+
+def _despues_de_consulta(conn, cursor, statement, parameters, context,
+                         executemany):
+  """Acumula el tiempo de la sentencia y registra las consultas lentas."""
+  duracion = time.perf_counter() - conn.info["inicio_consultas"].pop()
+  stats = current_request.get()
+  if stats is not None:
+    stats.db_seconds += duracion
+
+  umbral_ms = config.settings.SLOW_QUERY_THRESHOLD_MS
+  if umbral_ms > 0 and duracion * 1000 >= umbral_ms:
+    ruta = stats.route if stats is not None else "<fuera de petición>"
+    logger.warning("Consulta lenta (%.1f ms) en %s: %s", duracion * 1000, ruta,
+                   statement)
+
+
+def _descartar_inicio(context) -> None:
+  """Quita el tiempo de inicio de una sentencia que falló."""
+  inicios = context.connection.info.get("inicio_consultas")
+  if inicios:
+    inicios.pop()
+
+
+for _engine in (engine, async_engine.sync_engine):
+  event.listen(_engine, "before_cursor_execute", _antes_de_consulta)
+  event.listen(_engine, "after_cursor_execute", _despues_de_consulta)
+  event.listen(_engine, "handle_error", _descartar_inicio)
+
 # Instancia base para crear modelos
 Base = declarative_base()
 
 
+def pool_status() -> dict:
+  """Devuelve el estado actual y acumulado de los pools de conexiones."""
+  status = {}
+  for name, pool in (("sync", engine.pool), ("async", async_engine.pool)):
+    stats = type(pool).stats
+    status[name] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": config.settings.DB_MAX_OVERFLOW,
+        "checkout_timeouts": stats.checkout_timeouts.value,
+        "checkout_wait_seconds": stats.checkout_wait_seconds.snapshot(),
+    }
+  return status
+
+
 # Dependencia FastAPI para obtener la sesión de DB
 def get_db():
   db = SessionLocal()
@@ -23,3 +178,9 @@ def get_db():
     yield db
   finally:
     db.close()
+
+
+# Dependencia FastAPI para obtener la sesión asíncrona de DB
+async def get_async_db():
+  async with AsyncSessionLocal() as db:
+    yield db
@@ -1,32 +1,99 @@
+from typing import Optional
+
+from api import config
 from api.auth.token import verify_access_token
-from api.database import get_db
+from api.cache import LRUCache
+from api.database import get_async_db
 from api.models.usuario import Usuario
+from api.telemetry import current_request
+from api.telemetry import outside_query_budget
 from fastapi import Depends
 from fastapi import HTTPException
 from fastapi import status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from sqlalchemy.orm import Session
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="api/v1/auth/login")  # Ajusta la URL según tu router de login
 
+# Usuarios resueltos por id_usuario. Guarda copias desacopladas que nunca
+# pertenecen a una sesión (ver _copia_desacoplada); obtener_usuario las
+# incorpora a la sesión actual sin consultar.
+usuario_cache = LRUCache(config.settings.USER_CACHE_SIZE,
+                         config.settings.USER_CACHE_TTL_SECONDS)
+
+
+def _copia_desacoplada(user: Usuario) -> Usuario:
+  """Copia de las columnas del usuario, desacoplada y ya cargada.
+
+    La instancia original pertenece a la sesión de la petición: un rollback
+    o commit la expira y merge(load=False) copiaría ese estado expirado, que
+    en la sesión asíncrona falla al accederse (MissingGreenlet).
+    """
+  copia = Usuario(
+      **{
+          columna.key: getattr(user, columna.key)
+          for columna in inspect(Usuario).column_attrs
+      })
+  make_transient_to_detached(copia)
+  return copia
+
+
+async def obtener_usuario(db: AsyncSession, user_id: int) -> Optional[Usuario]:
+  """Devuelve el usuario con ese id, o None si no existe, usando la caché."""
+  cached = usuario_cache.get(user_id)
+  if cached is not None:
+    return await db.merge(cached, load=False)
+
+  # Como los catálogos, la carga en frío no cuenta para query_budget
+  with outside_query_budget():
+    user = await db.get(Usuario, user_id)
+  if user is not None:
+    usuario_cache.set(user_id, _copia_desacoplada(user))
+  return user
+
 
-def get_current_user(db: Session = Depends(get_db),
-                     token: str = Depends(oauth2_scheme)):
+def query_budget(max_queries: int):
+  """Dependencia que declara cuántas sentencias SQL puede ejecutar la ruta.
+
+    Si se supera, api.database registra una advertencia (o lanza
+    QueryBudgetExceeded con QUERY_BUDGET_ENFORCE=true). Las cargas de las
+    cachés compartidas (usuarios, catálogos) no cuentan: el presupuesto es
+    el de la ruta con cachés calientes.
+    """
+
+  async def _declarar_presupuesto() -> None:
+    stats = current_request.get()
+    if stats is not None:
+      stats.query_budget = max_queries
+
+  return _declarar_presupuesto
+
+
+@event.listens_for(Session, "after_flush")
+def _descartar_usuarios_modificados(session: Session, flush_context) -> None:
+  for obj in list(session.dirty) + list(session.deleted):
+    if isinstance(obj, Usuario):
+      usuario_cache.pop(obj.id_usuario)
+
+
+async def get_current_user(db: AsyncSession = Depends(get_async_db),
+                           token: str = Depends(oauth2_scheme)):
   """Dependencia que obtiene el usuario actual a partir del token JWT."""
   credentials_exception = HTTPException(
       status_code=status.HTTP_401_UNAUTHORIZED,
       detail="No se pudieron validar las credenciales",
       headers={"WWW-Authenticate": "Bearer"},
   )
-  payload = verify_access_token(token)
-  if payload is None:
-    raise credentials_exception
-  user_id: int = payload.get("sub")
+  user_id = verify_access_token(token)
   if user_id is None:
     raise credentials_exception
 
-  user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+  user = await obtener_usuario(db, int(user_id))
   if user is None:
     raise credentials_exception
   return user
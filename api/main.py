@@ -1,40 +1,54 @@
+from contextlib import asynccontextmanager
+import logging
+
 from api import config
+from api.auth.hashing import hashing_pool
+from api.database import async_engine
+from api.middleware import ForwardedProtoMiddleware
+from api.middleware import MetricsMiddleware
 from api.routers import auth
 from api.routers import categorias
 from api.routers import eventos_financieros
 from api.routers import financial_health
+from api.routers import metrics
+from api.routers import monitoring
 from api.routers import perfiles
 from api.routers import usuarios
+from api.services.reference_data_service import reference_data
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-
-app = FastAPI(title="MoneyPilot API", version="1.0.0")
+from sqlalchemy.exc import SQLAlchemyError
 
+logger = logging.getLogger(__name__)
 
-class ForwardedProtoMiddleware(BaseHTTPMiddleware):
-  """
-    Ensures FastAPI respects the original protocol (https/http)
-    when behind a reverse proxy (e.g., Nginx, Traefik, etc.)
-    """
 
-  async def dispatch(self, request: Request, call_next):
-    forwarded_proto = request.headers.get("x-forwarded-proto")
-    if forwarded_proto:
-      scope = request.scope
-      scope["scheme"] = forwarded_proto
-    response = await call_next(request)
-    return response
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  """Arranca el pool de hashing y precarga los catálogos; libera los pools
+    al terminar."""
+  hashing_pool.start()
+  try:
+    await reference_data.refresh()
+  except (SQLAlchemyError, OSError):
+    # Se cargarán en la primera petición que los necesite
+    logger.warning("No se pudieron precargar los catálogos", exc_info=True)
+  yield
+  hashing_pool.shutdown()
+  await async_engine.dispose()
 
 
-app.add_middleware(ForwardedProtoMiddleware)
+app = FastAPI(title="MoneyPilot API", version="1.0.0", lifespan=lifespan)
 
 # Conditional HTTPS redirect middleware for production
 if config.settings.ENV == "production":
   app.add_middleware(HTTPSRedirectMiddleware)
 
+# Se agrega después para envolver a HTTPSRedirectMiddleware: el esquema ya
+# está corregido cuando este decide si redirigir
+app.add_middleware(ForwardedProtoMiddleware,
+                   trusted_proxies=config.settings.trusted_proxies_list())
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=config.settings.allowed_origins_list(),
@@ -43,14 +57,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Más externo: mide cada petición completa, incluidos los demás middlewares
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(usuarios.router)
 app.include_router(perfiles.router)
 app.include_router(auth.router)
 app.include_router(categorias.router)
 app.include_router(eventos_financieros.router)
 app.include_router(financial_health.router)
+app.include_router(monitoring.router)
+app.include_router(metrics.router)
 
 
 @app.get("/", tags=["Root"])
-def read_root():
+async def read_root():
   return {"message": "MoneyPilot API is running."}
@@ -0,0 +1,124 @@
+"""
+ASGI middlewares for MoneyPilot API.
+Written against the raw ASGI interface (no BaseHTTPMiddleware) so they add
+no extra tasks or memory streams and keep streaming responses' backpressure.
+"""
+import functools
+import ipaddress
+import time
+from typing import Iterable, Optional
+
+from api.telemetry import current_request
+from api.telemetry import http_metrics
+from api.telemetry import RequestStats
+
+
+class ForwardedProtoMiddleware:
+  """
+    Ensures FastAPI respects the original protocol (https/http) and client
+    address when behind a reverse proxy (e.g., Nginx, Traefik, etc.)
+
+    X-Forwarded-Proto and X-Forwarded-For are only honoured when the direct
+    peer is in trusted_proxies (loopback by default; "*" trusts every direct
+    peer). The client address is the right-most X-Forwarded-For entry that
+    is not a trusted proxy network: entries left of it were written by the
+    client and are never used. "*" only applies to the direct peer, so with
+    it the right-most entry is taken.
+    """
+
+  def __init__(self, app,
+               trusted_proxies: Iterable[str] = ("127.0.0.1", "::1")):
+    self.app = app
+    proxies = [proxy.strip() for proxy in trusted_proxies if proxy.strip()]
+    self._trust_all = "*" in proxies
+    self._networks = [
+        ipaddress.ip_network(proxy, strict=False)
+        for proxy in proxies
+        if proxy != "*"
+    ]
+    self._is_trusted_hop = functools.lru_cache(maxsize=1024)(
+        self._check_trusted_hop)
+
+  def _is_trusted_peer(self, host: Optional[str]) -> bool:
+    return self._trust_all or self._is_trusted_hop(host)
+
+  def _check_trusted_hop(self, host: Optional[str]) -> bool:
+    if not host:
+      return False
+    try:
+      address = ipaddress.ip_address(host)
+    except ValueError:
+      return False
+    return any(address in network for network in self._networks)
+
+  def _forwarded_client(self, forwarded_for: str) -> str:
+    hosts = [host.strip() for host in forwarded_for.split(",")]
+    for host in reversed(hosts):
+      if not self._is_trusted_hop(host):
+        return host
+    # Every hop is a trusted proxy: the left-most one is the origin
+    return hosts[0]
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] not in ("http", "websocket"):
+      return await self.app(scope, receive, send)
+
+    client = scope.get("client")
+    if self._is_trusted_peer(client[0] if client else None):
+      forwarded_proto = forwarded_for = None
+      for name, value in scope["headers"]:
+        if name == b"x-forwarded-proto":
+          forwarded_proto = value
+        elif name == b"x-forwarded-for":
+          forwarded_for = value
+
+      if forwarded_proto:
+        # Con varios proxies, el último valor lo agregó el más cercano
+        proto = forwarded_proto.decode("latin-1").rsplit(",", 1)[-1]
+        scheme = proto.strip().lower()
+        if scope["type"] == "websocket":
+          scheme = "wss" if scheme == "https" else "ws"
+        scope["scheme"] = scheme
+      if forwarded_for:
+        host = self._forwarded_client(forwarded_for.decode("latin-1"))
+        if host:
+          scope["client"] = (host, 0)
+
+    return await self.app(scope, receive, send)
+
+
+class MetricsMiddleware:
+  """
+    Records latency, status code and SQL statement count of every HTTP
+    request in api.telemetry.http_metrics, labelled by route template so
+    every router is covered without per-route code.
+    """
+
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      return await self.app(scope, receive, send)
+
+    status_code = 500
+
+    async def send_wrapper(message):
+      nonlocal status_code
+      if message["type"] == "http.response.start":
+        status_code = message["status"]
+      await send(message)
+
+    stats = RequestStats(scope)
+    token = current_request.set(stats)
+    http_metrics.in_progress.inc()
+    start = time.perf_counter()
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      elapsed = time.perf_counter() - start
+      http_metrics.in_progress.dec()
+      current_request.reset(token)
+      # Starlette deja en el scope la ruta que atendió la petición
+      route = getattr(scope.get("route"), "path", None) or "<sin ruta>"
+      http_metrics.observe(scope["method"], route, status_code, elapsed, stats)
@@ -2,13 +2,15 @@ from .base import Base
 from .categorias import CategoriaGasto
 from .categorias import CategoriaIngreso
 from .evento_financiero import EventoFinanciero
+from .fuentes_ingreso import FuenteIngreso
+from .historial_score import HistorialScoreSalud
+from .pais import PaisLatam
 from .perfil import PerfilUsuario
+from .resumen_mensual import ResumenMensualEvento
 from .usuario import Usuario
 
-# Note: PaisLatam and FuenteIngreso are referenced in requirements but not currently implemented
-# They would be imported here when created
-
 __all__ = [
     "Base", "Usuario", "PerfilUsuario", "CategoriaGasto", "CategoriaIngreso",
-    "EventoFinanciero"
+    "EventoFinanciero", "FuenteIngreso", "HistorialScoreSalud", "PaisLatam",
+    "ResumenMensualEvento"
 ]
@@ -1,5 +1,17 @@
+from datetime import datetime
+from datetime import timezone
+
 from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
   pass
+
+
+def utc_now() -> datetime:
+  """Hora UTC sin zona, para columnas TIMESTAMP WITHOUT TIME ZONE.
+
+    asyncpg rechaza datetimes con zona en esas columnas (psycopg2 los
+    aceptaba descartando la zona).
+    """
+  return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -1,9 +1,9 @@
 from datetime import date
 from datetime import datetime
-from datetime import timezone
 from typing import Optional
 
 from api.models.base import Base
+from api.models.base import utc_now
 from sqlalchemy import Boolean
 from sqlalchemy import CheckConstraint
 from sqlalchemy import Date
@@ -17,6 +17,10 @@ from sqlalchemy.orm import mapped_column
 
 
 class EventoFinanciero(Base):
+  # En la base, la tabla está particionada por mes de `fecha` y su clave
+  # primaria es (id_evento, fecha); id_evento sigue siendo único porque lo
+  # asigna una sola secuencia, así que el ORM identifica los eventos por él.
+  # Ver api.services.partition_service.
   __tablename__ = "eventos_financieros"
 
   id_evento: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -42,8 +46,7 @@ class EventoFinanciero(Base):
   descripcion: Mapped[Optional[str]] = mapped_column(String, nullable=True)
   es_unico: Mapped[bool] = mapped_column(Boolean, default=True)
   semana_inicio: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
-  fecha_creacion: Mapped[datetime] = mapped_column(
-      DateTime, default=lambda: datetime.now(timezone.utc))
+  fecha_creacion: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
 
   __table_args__ = (CheckConstraint(
       "(tipo = 'gasto' AND id_categoria_gasto IS NOT NULL AND id_categoria_ingreso IS NULL) OR "
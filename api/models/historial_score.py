@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from api.models.base import Base
+from sqlalchemy import BigInteger
+from sqlalchemy import DateTime
+from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import Integer
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+
+class HistorialScoreSalud(Base):
+  """Puntajes de salud financiera calculados, uno por usuario y cálculo.
+
+    Se escribe al crear o actualizar el perfil financiero, en el primer
+    GET /financial_health/score de un usuario sin historial y en el recálculo
+    programado (`python -m api.scripts.recompute_scores`).
+    """
+  __tablename__ = "historial_score_salud"
+
+  id_historial: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+  id_usuario: Mapped[int] = mapped_column(Integer,
+                                          ForeignKey("usuarios.id_usuario",
+                                                     ondelete="CASCADE"),
+                                          nullable=False)
+  score: Mapped[int] = mapped_column(Integer, nullable=False)
+  status: Mapped[str] = mapped_column(String(20), nullable=False)
+  calculated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
+                                                  nullable=False)
+
+  __table_args__ = (Index("idx_historial_score_usuario_fecha", "id_usuario",
+                          "calculated_at"),)
@@ -0,0 +1,12 @@
+from api.models.base import Base
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+
+class PaisLatam(Base):
+  __tablename__ = "paises_latam"
+
+  id_pais: Mapped[int] = mapped_column(primary_key=True, index=True)
+  codigo: Mapped[str] = mapped_column(String(2), unique=True, nullable=False)
+  nombre: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -1,8 +1,8 @@
 from datetime import datetime
-from datetime import timezone
 from typing import List, Optional
 
 from api.models.base import Base
+from api.models.base import utc_now
 from sqlalchemy import ARRAY
 from sqlalchemy import Boolean
 from sqlalchemy import Date
@@ -50,12 +50,10 @@ class PerfilUsuario(Base):
       Numeric(12, 2))
   fuentes_ingreso: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text))
 
-  fecha_creacion: Mapped[datetime] = mapped_column(
-      DateTime, default=lambda: datetime.now(timezone.utc))
-  ultima_actualizacion: Mapped[datetime] = mapped_column(
-      DateTime,
-      default=lambda: datetime.now(timezone.utc),
-      onupdate=lambda: datetime.now(timezone.utc))
+  fecha_creacion: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+  ultima_actualizacion: Mapped[datetime] = mapped_column(DateTime,
+                                                         default=utc_now,
+                                                         onupdate=utc_now)
 
   usuario: Mapped["Usuario"] = relationship(back_populates="perfil")
   # pais = relationship("PaisLatam", lazy="joined")
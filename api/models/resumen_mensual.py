@@ -0,0 +1,37 @@
+from datetime import date
+from decimal import Decimal
+
+from api.models.base import Base
+from sqlalchemy import Date
+from sqlalchemy import ForeignKey
+from sqlalchemy import Integer
+from sqlalchemy import Numeric
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+
+class ResumenMensualEvento(Base):
+  """Totales de eventos por usuario, mes, tipo y categoría.
+
+    Se mantiene incrementalmente en cada escritura de EventoFinanciero
+    (ver api.services.rollup_service) y se puede reconstruir con
+    `python -m api.scripts.rebuild_rollups`.
+    """
+  __tablename__ = "resumen_mensual_eventos"
+
+  id_usuario: Mapped[int] = mapped_column(Integer,
+                                          ForeignKey("usuarios.id_usuario",
+                                                     ondelete="CASCADE"),
+                                          primary_key=True)
+  mes: Mapped[date] = mapped_column(Date,
+                                    primary_key=True)  # primer día del mes
+  tipo: Mapped[str] = mapped_column(String(10),
+                                    primary_key=True)  # 'INGRESO' o 'GASTO'
+  # id_categoria_gasto o id_categoria_ingreso según tipo; 0 = sin categoría
+  id_categoria: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+  total: Mapped[Decimal] = mapped_column(Numeric(14, 2),
+                                         nullable=False,
+                                         default=0)
+  cantidad: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
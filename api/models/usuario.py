@@ -1,7 +1,8 @@
 from datetime import datetime
-from datetime import timezone
 
 from api.models.base import Base
+from api.models.base import utc_now
+from sqlalchemy import BigInteger
 from sqlalchemy import DateTime
 from sqlalchemy import String
 from sqlalchemy.orm import Mapped
@@ -18,8 +19,14 @@ class Usuario(Base):
                                      index=True,
                                      nullable=False)
   password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
-  created_at: Mapped[datetime] = mapped_column(
-      DateTime, default=lambda: datetime.now(timezone.utc))
+  created_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+  # Se incrementa en cada escritura de sus eventos (ver
+  # rollup_service.aplicar_deltas); es la versión de las ETags de eventos.
+  # Leerla con una consulta: las instancias de usuario_cache no se refrescan.
+  version_eventos: Mapped[int] = mapped_column(BigInteger,
+                                               nullable=False,
+                                               default=0,
+                                               server_default="0")
 
   perfil: Mapped["PerfilUsuario"] = relationship(back_populates="usuario",
                                                  uselist=False)
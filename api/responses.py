@@ -0,0 +1,71 @@
+"""
+Response classes for MoneyPilot API.
+ORJSONResponse serializes plain service output (dicts, lists, Decimal,
+date/datetime) to JSON in one pass. Hot routes return it directly so the
+payload is neither rebuilt into Pydantic models nor re-validated through
+response_model; their response_model is kept for the OpenAPI schema.
+
+Polled read routes also send an ETag built from row versions (see `etag`)
+and answer If-None-Match with 304 before reading or serializing the
+payload.
+"""
+from decimal import Decimal
+import hashlib
+from typing import Any
+
+from fastapi import Request
+from fastapi import Response
+from fastapi.responses import JSONResponse
+import orjson
+
+# Cada petición debe revalidar, pero solo el cliente puede guardar la copia
+CACHE_CONTROL = "private, no-cache"
+
+
+def _default(obj: Any) -> Any:
+  # Numeric columns load as Decimal; the schemas expose them as float
+  if isinstance(obj, Decimal):
+    return float(obj)
+  raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+  """JSONResponse rendered with orjson, matching Pydantic's JSON output
+    for the types the routers return (UTC datetimes end in "Z")."""
+
+  def render(self, content: Any) -> bytes:
+    return orjson.dumps(content,
+                        default=_default,
+                        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+def etag(*partes: Any, weak: bool = True) -> str:
+  """ETag for a payload determined by `partes` (row versions, ids, the
+    request's query string...), without serializing the payload itself.
+
+    Weak unless the payload bytes are fully determined by `partes`.
+    """
+  digest = hashlib.blake2b(repr(partes).encode(), digest_size=12).hexdigest()
+  return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def coincide_etag(request: Request, etiqueta: str) -> bool:
+  """Whether If-None-Match matches `etiqueta` (weak comparison, as GET
+    conditional requests use)."""
+  cabecera = request.headers.get("if-none-match")
+  if not cabecera:
+    return False
+  if cabecera.strip() == "*":
+    return True
+  opaca = etiqueta.removeprefix("W/")
+  return any(candidata.strip().removeprefix("W/") == opaca
+             for candidata in cabecera.split(","))
+
+
+def cabeceras_etag(etiqueta: str) -> dict:
+  return {"ETag": etiqueta, "Cache-Control": CACHE_CONTROL}
+
+
+def no_modificado(etiqueta: str) -> Response:
+  """304 Not Modified, without body."""
+  return Response(status_code=304, headers=cabeceras_etag(etiqueta))
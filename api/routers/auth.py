@@ -1,29 +1,46 @@
-from api.auth.hashing import verify_password
+from api.auth.hashing import HashingQueueFull
+from api.auth.hashing import verify_and_update_async
 from api.auth.token import create_access_token
-from api.database import get_db
+from api.database import get_async_db
 from api.models.usuario import Usuario
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import HTTPException
 from fastapi import status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/auth", tags=["Autenticación"])
 
 
 @router.post("/login")
-def login(request: OAuth2PasswordRequestForm = Depends(),
-          db: Session = Depends(get_db)):
-  user = db.query(Usuario).filter(Usuario.email == request.username).first()
+async def login(request: OAuth2PasswordRequestForm = Depends(),
+                db: AsyncSession = Depends(get_async_db)):
+  user = await db.scalar(
+      select(Usuario).where(Usuario.email == request.username))
   if not user:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="Credenciales inválidas")
 
-  if not verify_password(request.password, user.password_hash):
+  # Argon2 es intensivo en CPU: se ejecuta en el pool de procesos de hashing
+  try:
+    valido, nuevo_hash = await verify_and_update_async(request.password,
+                                                       user.password_hash)
+  except HashingQueueFull:
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio de autenticación saturado. Intente nuevamente.",
+        headers={"Retry-After": "1"})
+  if not valido:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="Credenciales inválidas")
 
+  # El hash usaba parámetros de Argon2 anteriores: se guarda el nuevo
+  if nuevo_hash:
+    user.password_hash = nuevo_hash
+    await db.commit()
+
   access_token = create_access_token(data={"sub": str(user.id_usuario)})
 
   return {"access_token": access_token, "token_type": "bearer"}
@@ -1,30 +1,43 @@
-from api.database import get_db
-from api.models.categorias import CategoriaGasto
-from api.models.categorias import CategoriaIngreso
-from api.models.fuentes_ingreso import FuenteIngreso
+from api.responses import cabeceras_etag
+from api.responses import coincide_etag
+from api.responses import etag
+from api.responses import no_modificado
+from api.responses import ORJSONResponse
+from api.services.reference_data_service import reference_data
 from fastapi import APIRouter
-from fastapi import Depends
-from sqlalchemy.orm import Session
+from fastapi import Request
 
 router = APIRouter(prefix="/categorias", tags=["Categorías"])
 
 
+def _responder(request: Request, recurso: str, version: str, items):
+  """Lista del catálogo con ETag fuerte: el cuerpo depende solo de la versión
+    del catálogo, así que If-None-Match se resuelve sin tocar la base."""
+  etiqueta = etag(recurso, version, weak=False)
+  if coincide_etag(request, etiqueta):
+    return no_modificado(etiqueta)
+  return ORJSONResponse(list(items), headers=cabeceras_etag(etiqueta))
+
+
 @router.get("/gastos")
-def obtener_categorias_gastos(db: Session = Depends(get_db)):
+async def obtener_categorias_gastos(request: Request):
   """Obtiene todas las categorías de gastos disponibles."""
-  categorias = db.query(CategoriaGasto.nombre).all()
-  return [categoria[0] for categoria in categorias]
+  catalogo = await reference_data.get()
+  return _responder(request, "gastos", catalogo.version,
+                    catalogo.categorias_gasto.values())
 
 
 @router.get("/ingresos")
-def obtener_categorias_ingresos(db: Session = Depends(get_db)):
+async def obtener_categorias_ingresos(request: Request):
   """Obtiene todas las categorías de ingresos disponibles."""
-  categorias = db.query(CategoriaIngreso.nombre).all()
-  return [categoria[0] for categoria in categorias]
+  catalogo = await reference_data.get()
+  return _responder(request, "ingresos", catalogo.version,
+                    catalogo.categorias_ingreso.values())
 
 
 @router.get("/fuentes")
-def obtener_fuentes_ingreso(db: Session = Depends(get_db)):
+async def obtener_fuentes_ingreso(request: Request):
   """Obtiene todas las fuentes de ingreso disponibles."""
-  fuentes = db.query(FuenteIngreso.nombre).all()
-  return [fuente[0] for fuente in fuentes]
+  catalogo = await reference_data.get()
+  return _responder(request, "fuentes", catalogo.version,
+                    catalogo.fuentes_ingreso)
@@ -1,82 +1,109 @@
+import base64
+import binascii
+import csv
 from datetime import date
 from datetime import timedelta
-from typing import Optional
+import io
+import json
+from typing import AsyncIterator, Iterable, List, Literal, Optional, Tuple
 
+from api import config
 from api.auth.token import get_user_id_from_token
-from api.database import get_db
+from api.database import AsyncSessionLocal
+from api.database import get_async_db
+from api.dependencies import obtener_usuario
+from api.dependencies import query_budget
 from api.models.categorias import CategoriaGasto
 from api.models.categorias import CategoriaIngreso
 from api.models.evento_financiero import EventoFinanciero
-from api.models.usuario import Usuario
+from api.responses import cabeceras_etag
+from api.responses import coincide_etag
+from api.responses import etag
+from api.responses import no_modificado
+from api.responses import ORJSONResponse
 from api.schemas.evento_financiero import EventoFinancieroCreate
 from api.schemas.evento_financiero import EventoFinancieroDBRead
-from api.schemas.evento_financiero import EventoFinancieroListRead
 from api.schemas.evento_financiero import EventoFinancieroUpdate
+from api.schemas.evento_financiero import EventoImportError
 from api.schemas.evento_financiero import EventosFinancierosResponse
+from api.schemas.evento_financiero import EventosImportResponse
+from api.schemas.evento_financiero import ResumenMensualRead
+from api.services.financial_health_cache import marcar_usuario_modificado
+from api.services.recurrence_service import combinar
+from api.services.recurrence_service import contar_ocurrencias
+from api.services.recurrence_service import expandir
+from api.services.reference_data_service import reference_data
+from api.services.reference_data_service import ReferenceData
+from api.services.rollup_service import aplicar_deltas
+from api.services.rollup_service import resumen_por_mes
+from api.services.rollup_service import RollupDeltas
+from api.services.rollup_service import totales_por_tipo
+from api.services.rollup_service import version_eventos
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import File
 from fastapi import HTTPException
 from fastapi import Query
+from fastapi import Request
 from fastapi import status
+from fastapi import UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import case
 from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/eventos_financieros", tags=["Eventos Financieros"])
 
 
-@router.post("/",
-             response_model=EventoFinancieroDBRead,
-             status_code=status.HTTP_201_CREATED)
-def crear_evento_financiero(
-    data: EventoFinancieroCreate,
-    db: Session = Depends(get_db),
-    token_user_id: int | None = Depends(get_user_id_from_token),
-    id_usuario: int | None = None,
-):
-  """Crea un evento financiero ('INGRESO' o 'GASTO')."""
+def _codificar_cursor(fecha: date, id_evento: int) -> str:
+  """Codifica la posición (fecha, id_evento) como un cursor opaco."""
+  raw = f"{fecha.isoformat()}|{id_evento}".encode()
+  return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-  user_id = id_usuario or token_user_id
-  if not user_id:
-    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="No autorizado o token inválido.")
 
-  user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
-  if not user:
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Usuario no encontrado.")
+def _decodificar_cursor(cursor: str) -> Tuple[date, int]:
+  """Decodifica un cursor generado por _codificar_cursor."""
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    fecha, id_evento = base64.urlsafe_b64decode(padded).decode().split("|")
+    return date.fromisoformat(fecha), int(id_evento)
+  except (binascii.Error, UnicodeDecodeError, ValueError):
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Cursor inválido.")
+
 
+def _normalizar_evento(data: EventoFinancieroCreate,
+                       catalogo: ReferenceData) -> dict:
+  """Valida un evento a crear y devuelve sus columnas normalizadas.
+
+    Lanza ValueError con el motivo cuando el evento no es válido.
+    """
   tipo = data.tipo.upper()
 
   if tipo not in ("INGRESO", "GASTO"):
-    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="El tipo debe ser 'INGRESO' o 'GASTO'.")
+    raise ValueError("El tipo debe ser 'INGRESO' o 'GASTO'.")
 
   # Normalize fields
   if tipo == "GASTO":
     if not data.id_categoria_gasto:
-      raise HTTPException(
-          status_code=status.HTTP_400_BAD_REQUEST,
-          detail="Debe proporcionar id_categoria_gasto para un gasto.")
+      raise ValueError("Debe proporcionar id_categoria_gasto para un gasto.")
     # Validate category exists
-    categoria_gasto = db.query(CategoriaGasto).filter(
-        CategoriaGasto.id_categoria_gasto == data.id_categoria_gasto).first()
-    if not categoria_gasto:
-      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                          detail="Categoría de gasto no válida")
+    if data.id_categoria_gasto not in catalogo.categorias_gasto:
+      raise ValueError("Categoría de gasto no válida")
     id_categoria_gasto = data.id_categoria_gasto
     id_categoria_ingreso = None
   else:
     if not data.id_categoria_ingreso:
-      raise HTTPException(
-          status_code=status.HTTP_400_BAD_REQUEST,
-          detail="Debe proporcionar id_categoria_ingreso para un ingreso.")
+      raise ValueError(
+          "Debe proporcionar id_categoria_ingreso para un ingreso.")
     # Validate category exists
-    categoria_ingreso = db.query(CategoriaIngreso).filter(
-        CategoriaIngreso.id_categoria_ingreso ==
-        data.id_categoria_ingreso).first()
-    if not categoria_ingreso:
-      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                          detail="Categoría de ingreso no válida")
+    if data.id_categoria_ingreso not in catalogo.categorias_ingreso:
+      raise ValueError("Categoría de ingreso no válida")
     id_categoria_gasto = None
     id_categoria_ingreso = data.id_categoria_ingreso
 
@@ -84,29 +111,308 @@ def crear_evento_financiero(
   es_unico = True if data.es_unico is None else data.es_unico
   semana_inicio = None if es_unico else data.semana_inicio
 
-  evento = EventoFinanciero(
-      id_usuario=user_id,
-      tipo=tipo,
-      id_categoria_gasto=id_categoria_gasto,
-      id_categoria_ingreso=id_categoria_ingreso,
-      monto=data.monto,
-      fecha=data.fecha,
-      descripcion=data.descripcion,
-      es_unico=es_unico,
-      semana_inicio=semana_inicio,
-  )
+  return {
+      "tipo": tipo,
+      "id_categoria_gasto": id_categoria_gasto,
+      "id_categoria_ingreso": id_categoria_ingreso,
+      "monto": data.monto,
+      "fecha": data.fecha,
+      "descripcion": data.descripcion,
+      "es_unico": es_unico,
+      "semana_inicio": semana_inicio,
+  }
+
+
+def _validar_fila(valores: dict) -> EventoFinancieroCreate | str:
+  """Valida una fila de importación; devuelve el evento o el error legible."""
+  try:
+    return EventoFinancieroCreate.model_validate(valores)
+  except ValidationError as exc:
+    return "; ".join(
+        f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+
+
+async def _importar_eventos(
+    db: AsyncSession, user_id: int,
+    filas: Iterable[Tuple[int, EventoFinancieroCreate | str]]
+) -> EventosImportResponse:
+  """Valida todas las filas y escribe las válidas en una sola transacción.
+
+    Cada elemento es (número de fila, evento) o (número de fila, error de
+    lectura). Las categorías se validan contra el catálogo en memoria, sin
+    consultas, y las filas válidas se insertan con un único executemany.
+    """
+  catalogo = await reference_data.get()
+  errores = []
+  valores = []
+  for fila, data in filas:
+    if isinstance(data, str):
+      errores.append(EventoImportError(fila=fila, detalle=data))
+      continue
+    try:
+      valores.append({
+          "id_usuario": user_id,
+          **_normalizar_evento(data, catalogo)
+      })
+    except ValueError as exc:
+      errores.append(EventoImportError(fila=fila, detalle=str(exc)))
+
+  if valores:
+    deltas = RollupDeltas()
+    for evento in valores:
+      deltas.agregar(evento["id_usuario"], evento["fecha"], evento["tipo"],
+                     evento["id_categoria_gasto"],
+                     evento["id_categoria_ingreso"], evento["monto"], 1)
+    await db.execute(insert(EventoFinanciero), valores)
+    await aplicar_deltas(db, deltas)
+    # Bulk INSERTs bypass the flush hook that invalidates cached summaries
+    marcar_usuario_modificado(db.sync_session, user_id)
+    await db.commit()
+
+  return EventosImportResponse(insertados=len(valores), errores=errores)
+
+
+def _rango_fechas(fecha_inicio: Optional[date],
+                  fecha_fin: Optional[date]) -> Tuple[date, date]:
+  """Completa el rango de fechas con el mes en curso cuando falta un extremo."""
+  if not fecha_inicio or not fecha_fin:
+    today = date.today()
+    fecha_inicio = fecha_inicio or date(today.year, today.month, 1)
+    next_month = date(today.year + (today.month // 12), (today.month % 12) + 1,
+                      1)
+    fecha_fin = fecha_fin or (next_month - timedelta(days=1))
+  return fecha_inicio, fecha_fin
+
+
+def _es_rango_de_meses(fecha_inicio: date, fecha_fin: date) -> bool:
+  """True si el rango empieza el día 1 y termina el último día de un mes."""
+  return fecha_inicio.day == 1 and (fecha_fin + timedelta(days=1)).day == 1
+
+
+def _filtrar_eventos(user_id: int, fecha_inicio: Optional[date],
+                     fecha_fin: Optional[date], tipo: Optional[str],
+                     id_categoria_gasto: Optional[int],
+                     id_categoria_ingreso: Optional[int]) -> list:
+  """Condiciones WHERE comunes al listado y a la exportación.
+
+    Un extremo de fecha en None deja el rango abierto por ese lado.
+    """
+  filtros = [EventoFinanciero.id_usuario == user_id]
+  if fecha_inicio:
+    filtros.append(EventoFinanciero.fecha >= fecha_inicio)
+  if fecha_fin:
+    filtros.append(EventoFinanciero.fecha <= fecha_fin)
+  if tipo:
+    filtros.append(EventoFinanciero.tipo == tipo.upper())
+  if id_categoria_gasto:
+    filtros.append(EventoFinanciero.id_categoria_gasto == id_categoria_gasto)
+  if id_categoria_ingreso:
+    filtros.append(
+        EventoFinanciero.id_categoria_ingreso == id_categoria_ingreso)
+  return filtros
+
+
+def _seleccionar_con_categoria(*columnas) -> Select:
+  """SELECT de eventos más el nombre de su categoría.
+
+    Category names come from outer joins instead of one lookup per row.
+    """
+  categoria_nombre = case(
+      (EventoFinanciero.tipo == "GASTO", CategoriaGasto.nombre),
+      (EventoFinanciero.tipo == "INGRESO", CategoriaIngreso.nombre),
+  ).label("categoria")
+  join_gasto = (
+      CategoriaGasto.id_categoria_gasto == EventoFinanciero.id_categoria_gasto)
+  join_ingreso = (CategoriaIngreso.id_categoria_ingreso ==
+                  EventoFinanciero.id_categoria_ingreso)
+  return select(*columnas, categoria_nombre).outerjoin(
+      CategoriaGasto, join_gasto).outerjoin(CategoriaIngreso, join_ingreso)
+
+
+_COLUMNAS_EXPORTACION = (EventoFinanciero.id_evento, EventoFinanciero.tipo,
+                         EventoFinanciero.monto, EventoFinanciero.fecha,
+                         EventoFinanciero.descripcion,
+                         EventoFinanciero.es_unico,
+                         EventoFinanciero.semana_inicio)
+_CAMPOS_EXPORTACION = ("id_evento", "tipo", "monto", "fecha", "descripcion",
+                       "es_unico", "semana_inicio", "categoria")
+_FILAS_POR_BLOQUE = 1000
+
+
+async def _stream_filas(query: Select) -> AsyncIterator[list]:
+  """Lee el resultado por bloques con un cursor del servidor.
+
+    Abre su propia sesión: la de la petición puede cerrarse antes de que
+    StreamingResponse termine de enviar el cuerpo.
+    """
+  async with AsyncSessionLocal() as db:
+    result = await db.stream(
+        query.execution_options(yield_per=_FILAS_POR_BLOQUE))
+    async for bloque in result.partitions():
+      yield bloque
+
+
+async def _exportar_ndjson(query: Select) -> AsyncIterator[str]:
+  async for bloque in _stream_filas(query):
+    lineas = []
+    for fila in bloque:
+      registro = dict(fila._mapping)
+      registro["monto"] = float(registro["monto"])
+      lineas.append(json.dumps(registro, default=str, ensure_ascii=False))
+    yield "\n".join(lineas) + "\n"
+
+
+async def _exportar_csv(query: Select) -> AsyncIterator[str]:
+  buffer = io.StringIO()
+  writer = csv.writer(buffer)
+  writer.writerow(_CAMPOS_EXPORTACION)
+  async for bloque in _stream_filas(query):
+    writer.writerows(bloque)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+  # Header-only export when there are no rows
+  if buffer.tell():
+    yield buffer.getvalue()
+
+
+@router.post("/",
+             response_model=EventoFinancieroDBRead,
+             status_code=status.HTTP_201_CREATED)
+async def crear_evento_financiero(
+    data: EventoFinancieroCreate,
+    db: AsyncSession = Depends(get_async_db),
+    token_user_id: int | None = Depends(get_user_id_from_token),
+    id_usuario: int | None = None,
+):
+  """Crea un evento financiero ('INGRESO' o 'GASTO')."""
+
+  user_id = id_usuario or token_user_id
+  if not user_id:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="No autorizado o token inválido.")
+
+  user = await obtener_usuario(db, user_id)
+  if not user:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Usuario no encontrado.")
+
+  catalogo = await reference_data.get()
+  try:
+    valores = _normalizar_evento(data, catalogo)
+  except ValueError as exc:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=str(exc))
+
+  evento = EventoFinanciero(id_usuario=user_id, **valores)
+
+  deltas = RollupDeltas()
+  deltas.agregar_evento(evento, 1)
 
   db.add(evento)
-  db.commit()
-  db.refresh(evento)
+  await aplicar_deltas(db, deltas)
+  await db.commit()
+  await db.refresh(evento)
   return evento
 
 
+@router.post("/bulk",
+             response_model=EventosImportResponse,
+             status_code=status.HTTP_200_OK)
+async def importar_eventos_financieros(
+    data: List[dict],
+    db: AsyncSession = Depends(get_async_db),
+    token_user_id: int | None = Depends(get_user_id_from_token),
+    id_usuario: int | None = None,
+):
+  """Crea muchos eventos financieros en una sola transacción.
+
+    Las filas inválidas (también las que no cumplen el esquema) no detienen
+    la importación: se omiten y se informan en `errores` con su número de
+    fila (desde 1).
+    """
+  user_id = id_usuario or token_user_id
+  if not user_id:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="No autorizado o token inválido.")
+
+  if len(data) > config.settings.BULK_IMPORT_MAX_ROWS:
+    raise HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Máximo {config.settings.BULK_IMPORT_MAX_ROWS} eventos por "
+        "importación.")
+
+  user = await obtener_usuario(db, user_id)
+  if not user:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Usuario no encontrado.")
+
+  filas = ((fila, _validar_fila(valores))
+           for fila, valores in enumerate(data, start=1))
+  return await _importar_eventos(db, user_id, filas)
+
+
+@router.post("/bulk/csv",
+             response_model=EventosImportResponse,
+             status_code=status.HTTP_200_OK)
+async def importar_eventos_financieros_csv(
+    archivo: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    token_user_id: int | None = Depends(get_user_id_from_token),
+    id_usuario: int | None = None,
+):
+  """Importa eventos financieros desde un CSV (p. ej. un extracto bancario).
+
+    La primera línea debe contener los nombres de los campos de
+    EventoFinancieroCreate; las celdas vacías se toman como nulas.
+    """
+  user_id = id_usuario or token_user_id
+  if not user_id:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="No autorizado o token inválido.")
+
+  user = await obtener_usuario(db, user_id)
+  if not user:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Usuario no encontrado.")
+
+  try:
+    texto = (await archivo.read()).decode("utf-8-sig")
+  except UnicodeDecodeError:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="El archivo debe estar codificado en UTF-8.")
+
+  filas = []
+  for fila, registro in enumerate(csv.DictReader(io.StringIO(texto)), start=1):
+    if fila > config.settings.BULK_IMPORT_MAX_ROWS:
+      raise HTTPException(
+          status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+          detail=f"Máximo {config.settings.BULK_IMPORT_MAX_ROWS} eventos por "
+          "importación.")
+    valores = {k: v for k, v in registro.items() if k and v not in ("", None)}
+    filas.append((fila, _validar_fila(valores)))
+
+  return await _importar_eventos(db, user_id, filas)
+
+
+def _coincide_filtros(evento: EventoFinanciero, tipo: Optional[str],
+                      id_categoria_gasto: Optional[int],
+                      id_categoria_ingreso: Optional[int]) -> bool:
+  """Los filtros de _filtrar_eventos (salvo fechas), evaluados en memoria."""
+  return ((not tipo or evento.tipo == tipo.upper()) and
+          (not id_categoria_gasto or
+           evento.id_categoria_gasto == id_categoria_gasto) and
+          (not id_categoria_ingreso or
+           evento.id_categoria_ingreso == id_categoria_ingreso))
+
+
 @router.get("/",
             response_model=EventosFinancierosResponse,
-            status_code=status.HTTP_200_OK)
-def obtener_eventos_financieros(
-    db: Session = Depends(get_db),
+            status_code=status.HTTP_200_OK,
+            dependencies=[Depends(query_budget(5))])
+async def obtener_eventos_financieros(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     token_user_id: int | None = Depends(get_user_id_from_token),
     id_usuario: int | None = None,
     tipo: Optional[str] = Query(None),
@@ -116,94 +422,252 @@ def obtener_eventos_financieros(
     id_categoria_ingreso: Optional[int] = Query(None),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    expandir_recurrentes: bool = Query(False),
 ):
-  """Obtiene los eventos financieros de un usuario, con filtros dinámicos."""
+  """Obtiene los eventos financieros de un usuario, con filtros dinámicos.
+
+    Además de offset/limit admite paginación por cursor: cada página llena
+    devuelve next_cursor, que se envía como `cursor` para pedir la siguiente
+    sin recorrer las anteriores.
+
+    Con expandir_recurrentes=true, cada evento recurrente (es_unico=false)
+    aparece una vez por cada ocurrencia semanal dentro del rango, con la
+    fecha de la ocurrencia, y los totales incluyen todas las ocurrencias.
+
+    La respuesta lleva una ETag débil derivada de usuarios.version_eventos;
+    si coincide con If-None-Match se responde 304 con una sola consulta.
+    """
   user_id = id_usuario or token_user_id
   if not user_id:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+  if cursor and offset:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="No se puede combinar cursor con offset.")
+
+  user = await obtener_usuario(db, user_id)
   if not user:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Usuario no encontrado.")
 
-  if not fecha_inicio or not fecha_fin:
-    today = date.today()
-    fecha_inicio = fecha_inicio or date(today.year, today.month, 1)
-    next_month = date(today.year + (today.month // 12), (today.month % 12) + 1,
-                      1)
-    fecha_fin = fecha_fin or (next_month - timedelta(days=1))
+  # La versión se lee antes que los eventos: una escritura concurrente puede
+  # dejar una ETag más vieja que el cuerpo (el cliente volverá a descargarlo),
+  # nunca al revés. La fecha cuenta porque el rango por defecto depende de hoy
+  catalogo = await reference_data.get()
+  version = await version_eventos(db, user_id)
+  etiqueta = etag(user_id, version, catalogo.version, date.today(),
+                  str(request.query_params))
+  if coincide_etag(request, etiqueta):
+    return no_modificado(etiqueta)
+
+  fecha_inicio, fecha_fin = _rango_fechas(fecha_inicio, fecha_fin)
+  query = _seleccionar_con_categoria(EventoFinanciero).where(
+      *_filtrar_eventos(user_id, fecha_inicio, fecha_fin, tipo,
+                        id_categoria_gasto, id_categoria_ingreso))
+
+  posicion = _decodificar_cursor(cursor) if cursor else None
+  if posicion:
+    # Keyset: (fecha, id_evento) < cursor. The redundant fecha bound lets
+    # Postgres seek on idx_eventos_usuario_fecha instead of skipping rows.
+    cursor_fecha, cursor_id = posicion
+    anterior_al_cursor = or_(EventoFinanciero.fecha < cursor_fecha,
+                             EventoFinanciero.id_evento < cursor_id)
+    query = query.where(EventoFinanciero.fecha <= cursor_fecha,
+                        anterior_al_cursor)
+  elif not expandir_recurrentes:
+    query = query.offset(offset)
+  query = query.order_by(EventoFinanciero.fecha.desc(),
+                         EventoFinanciero.id_evento.desc())
+
+  recurrentes = []
+  if expandir_recurrentes:
+    # Recurring events of any date may have occurrences in the range; they
+    # are read unfiltered because the totals cover all of them
+    recurrentes = (await db.execute(
+        _seleccionar_con_categoria(EventoFinanciero).where(
+            EventoFinanciero.id_usuario == user_id,
+            EventoFinanciero.es_unico.is_(False)))).all()
+    filtrados = [
+        (ev, categoria)
+        for ev, categoria in recurrentes
+        if _coincide_filtros(ev, tipo, id_categoria_gasto, id_categoria_ingreso)
+    ]
+    # Only the one-off rows that can reach this page are read
+    consulta_unicos = query.where(EventoFinanciero.es_unico.isnot(False))
+    unicos = (await db.execute(consulta_unicos.limit(offset + limit + 1))).all()
+    hasta = min(fecha_fin, posicion[0]) if posicion else fecha_fin
+    items = combinar(unicos,
+                     expandir(filtrados, fecha_inicio, hasta),
+                     antes_de=posicion,
+                     inicio=offset,
+                     cantidad=limit + 1)
+  else:
+    # One extra item tells whether there is a next page
+    filas = (await db.execute(query.limit(limit + 1))).all()
+    items = [(ev.fecha, ev, categoria) for ev, categoria in filas]
+  hay_mas = len(items) > limit
+  items = items[:limit]
+
+  next_cursor = None
+  if hay_mas:
+    ultima_fecha, ultimo, _ = items[-1]
+    next_cursor = _codificar_cursor(ultima_fecha, ultimo.id_evento)
+
+  # Dicts con la forma de EventoFinancieroListRead, serializados una sola vez
+  eventos_enriquecidos = [{
+      "id_evento": ev.id_evento,
+      "tipo": ev.tipo,
+      "monto": ev.monto,
+      "fecha": fecha,
+      "descripcion": ev.descripcion,
+      "es_unico": ev.es_unico,
+      "semana_inicio": ev.semana_inicio,
+      "categoria": categoria,
+  } for fecha, ev, categoria in items]
+
+  if _es_rango_de_meses(fecha_inicio, fecha_fin) and not expandir_recurrentes:
+    # Whole months (the default range): read the monthly rollup
+    total_gastos, total_ingresos = await totales_por_tipo(
+        db, user_id, fecha_inicio, fecha_fin)
+  else:
+    # Both totals in a single pass using conditional aggregation
+    suma_gastos = func.sum(
+        EventoFinanciero.monto).filter(EventoFinanciero.tipo == "GASTO")
+    suma_ingresos = func.sum(
+        EventoFinanciero.monto).filter(EventoFinanciero.tipo == "INGRESO")
+    totales = select(func.coalesce(suma_gastos, 0),
+                     func.coalesce(suma_ingresos, 0)).where(
+                         EventoFinanciero.id_usuario == user_id,
+                         EventoFinanciero.fecha.between(fecha_inicio,
+                                                        fecha_fin))
+    if expandir_recurrentes:
+      totales = totales.where(EventoFinanciero.es_unico.isnot(False))
+    total_gastos, total_ingresos = (await db.execute(totales)).one()
+    # Each recurring event adds its amount once per occurrence in the range
+    for ev, _ in recurrentes:
+      veces = contar_ocurrencias(ev.fecha, ev.semana_inicio, fecha_inicio,
+                                 fecha_fin)
+      if ev.tipo == "GASTO":
+        total_gastos += ev.monto * veces
+      else:
+        total_ingresos += ev.monto * veces
+
+  return ORJSONResponse(
+      {
+          "eventos": eventos_enriquecidos,
+          "total_eventos": len(eventos_enriquecidos),
+          "total_gastos": float(total_gastos),
+          "total_ingresos": float(total_ingresos),
+          "next_cursor": next_cursor,
+      },
+      headers=cabeceras_etag(etiqueta))
+
+
+@router.get("/resumen_mensual",
+            response_model=List[ResumenMensualRead],
+            status_code=status.HTTP_200_OK)
+async def obtener_resumen_mensual(
+    db: AsyncSession = Depends(get_async_db),
+    token_user_id: int | None = Depends(get_user_id_from_token),
+    id_usuario: int | None = None,
+    fecha_inicio: Optional[date] = Query(None),
+    fecha_fin: Optional[date] = Query(None),
+):
+  """Devuelve los totales por mes, tipo y categoría del usuario.
 
-  query = db.query(EventoFinanciero).filter(
-      EventoFinanciero.id_usuario == user_id,
-      EventoFinanciero.fecha.between(fecha_inicio, fecha_fin))
+    Se leen del resumen mensual precalculado, por lo que el costo depende del
+    número de meses y no del número de eventos. Por defecto cubre los últimos
+    12 meses.
+    """
+  user_id = id_usuario or token_user_id
+  if not user_id:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="No autorizado o token inválido.")
 
-  if tipo:
-    query = query.filter(EventoFinanciero.tipo == tipo.upper())
-  if id_categoria_gasto:
-    query = query.filter(
-        EventoFinanciero.id_categoria_gasto == id_categoria_gasto)
-  if id_categoria_ingreso:
-    query = query.filter(
-        EventoFinanciero.id_categoria_ingreso == id_categoria_ingreso)
+  today = date.today()
+  fecha_fin = fecha_fin or today
+  if not fecha_inicio:
+    meses = today.year * 12 + today.month - 1 - 11
+    fecha_inicio = date(meses // 12, meses % 12 + 1, 1)
+
+  catalogo = await reference_data.get()
+  filas = await resumen_por_mes(db, user_id, fecha_inicio, fecha_fin)
+
+  resumen = []
+  for fila in filas:
+    categorias = (catalogo.categorias_gasto
+                  if fila.tipo == "GASTO" else catalogo.categorias_ingreso)
+    resumen.append(
+        ResumenMensualRead(mes=fila.mes,
+                           tipo=fila.tipo,
+                           id_categoria=fila.id_categoria or None,
+                           categoria=categorias.get(fila.id_categoria),
+                           total=float(fila.total),
+                           cantidad=fila.cantidad))
+  return resumen
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def exportar_eventos_financieros(
+    db: AsyncSession = Depends(get_async_db),
+    token_user_id: int | None = Depends(get_user_id_from_token),
+    id_usuario: int | None = None,
+    formato: Literal["ndjson", "csv"] = Query("ndjson"),
+    tipo: Optional[str] = Query(None),
+    fecha_inicio: Optional[date] = Query(None),
+    fecha_fin: Optional[date] = Query(None),
+    id_categoria_gasto: Optional[int] = Query(None),
+    id_categoria_ingreso: Optional[int] = Query(None),
+):
+  """Exporta todos los eventos financieros del usuario en NDJSON o CSV.
+
+    Usa los mismos filtros que el listado, sin límite de filas; sin
+    fecha_inicio ni fecha_fin exporta todo el historial, no solo el mes en
+    curso. Las filas se leen con un cursor del servidor y se envían por
+    bloques, de modo que la memoria usada no depende del tamaño del
+    historial.
+    """
+  user_id = id_usuario or token_user_id
+  if not user_id:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="No autorizado o token inválido.")
+
+  user = await obtener_usuario(db, user_id)
+  if not user:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Usuario no encontrado.")
 
-  eventos = query.order_by(
-      EventoFinanciero.fecha.desc()).offset(offset).limit(limit).all()
-
-  # Enrich with category names
-  eventos_enriquecidos = []
-  for ev in eventos:
-    categoria_nombre = None
-    if ev.tipo == "GASTO" and ev.id_categoria_gasto:
-      categoria = db.query(CategoriaGasto.nombre).filter(
-          CategoriaGasto.id_categoria_gasto == ev.id_categoria_gasto).first()
-      categoria_nombre = categoria[0] if categoria else None
-    elif ev.tipo == "INGRESO" and ev.id_categoria_ingreso:
-      categoria = db.query(
-          CategoriaIngreso.nombre).filter(CategoriaIngreso.id_categoria_ingreso
-                                          == ev.id_categoria_ingreso).first()
-      categoria_nombre = categoria[0] if categoria else None
-
-    eventos_enriquecidos.append(
-        EventoFinancieroListRead(id_evento=ev.id_evento,
-                                 tipo=ev.tipo,
-                                 monto=ev.monto,
-                                 fecha=ev.fecha,
-                                 descripcion=ev.descripcion,
-                                 es_unico=ev.es_unico,
-                                 semana_inicio=ev.semana_inicio,
-                                 categoria=categoria_nombre))
-
-  total_gastos = db.query(func.coalesce(
-      func.sum(EventoFinanciero.monto),
-      0)).filter(EventoFinanciero.id_usuario == user_id,
-                 EventoFinanciero.tipo == "GASTO",
-                 EventoFinanciero.fecha.between(fecha_inicio,
-                                                fecha_fin)).scalar()
-
-  total_ingresos = db.query(func.coalesce(
-      func.sum(EventoFinanciero.monto),
-      0)).filter(EventoFinanciero.id_usuario == user_id,
-                 EventoFinanciero.tipo == "INGRESO",
-                 EventoFinanciero.fecha.between(fecha_inicio,
-                                                fecha_fin)).scalar()
-
-  return EventosFinancierosResponse(
-      eventos=eventos_enriquecidos,
-      total_eventos=len(eventos_enriquecidos),
-      total_gastos=float(total_gastos),
-      total_ingresos=float(total_ingresos),
-  )
+  query = _seleccionar_con_categoria(*_COLUMNAS_EXPORTACION).where(
+      *_filtrar_eventos(user_id, fecha_inicio, fecha_fin, tipo,
+                        id_categoria_gasto, id_categoria_ingreso)).order_by(
+                            EventoFinanciero.fecha.desc(),
+                            EventoFinanciero.id_evento.desc())
+
+  if formato == "csv":
+    contenido = _exportar_csv(query)
+    media_type = "text/csv"
+  else:
+    contenido = _exportar_ndjson(query)
+    media_type = "application/x-ndjson"
+
+  return StreamingResponse(
+      contenido,
+      media_type=media_type,
+      headers={
+          "Content-Disposition":
+              f'attachment; filename="eventos_financieros.{formato}"'
+      })
 
 
 @router.put("/{id_evento}",
             response_model=EventoFinancieroDBRead,
             status_code=status.HTTP_200_OK)
-def actualizar_evento_financiero(
+async def actualizar_evento_financiero(
     id_evento: int,
     data: EventoFinancieroUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token_user_id: int | None = Depends(get_user_id_from_token),
     id_usuario: int | None = None,
 ):
@@ -213,14 +677,18 @@ def actualizar_evento_financiero(
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  evento = db.query(EventoFinanciero).filter(
-      EventoFinanciero.id_evento == id_evento,
-      EventoFinanciero.id_usuario == user_id).first()
+  evento = await db.scalar(
+      select(EventoFinanciero).where(EventoFinanciero.id_evento == id_evento,
+                                     EventoFinanciero.id_usuario == user_id))
 
   if not evento:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Evento no encontrado.")
 
+  # The event may move between months, categories or tipo
+  deltas = RollupDeltas()
+  deltas.agregar_evento(evento, -1)
+
   if data.tipo:
     tipo = data.tipo.upper()
     if tipo not in ("INGRESO", "GASTO"):
@@ -242,9 +710,8 @@ def actualizar_evento_financiero(
   if evento.tipo == "GASTO":
     if data.id_categoria_gasto is not None:
       # Validate category exists
-      categoria_gasto = db.query(CategoriaGasto).filter(
-          CategoriaGasto.id_categoria_gasto == data.id_categoria_gasto).first()
-      if not categoria_gasto:
+      catalogo = await reference_data.get()
+      if data.id_categoria_gasto not in catalogo.categorias_gasto:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Categoría de gasto no válida")
       evento.id_categoria_gasto = data.id_categoria_gasto
@@ -252,24 +719,25 @@ def actualizar_evento_financiero(
   elif evento.tipo == "INGRESO":
     if data.id_categoria_ingreso is not None:
       # Validate category exists
-      categoria_ingreso = db.query(CategoriaIngreso).filter(
-          CategoriaIngreso.id_categoria_ingreso ==
-          data.id_categoria_ingreso).first()
-      if not categoria_ingreso:
+      catalogo = await reference_data.get()
+      if data.id_categoria_ingreso not in catalogo.categorias_ingreso:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Categoría de ingreso no válida")
       evento.id_categoria_ingreso = data.id_categoria_ingreso
     evento.id_categoria_gasto = None
 
-  db.commit()
-  db.refresh(evento)
+  deltas.agregar_evento(evento, 1)
+  await aplicar_deltas(db, deltas)
+
+  await db.commit()
+  await db.refresh(evento)
   return evento
 
 
 @router.delete("/{id_evento}", status_code=status.HTTP_204_NO_CONTENT)
-def eliminar_evento_financiero(
+async def eliminar_evento_financiero(
     id_evento: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token_user_id: int | None = Depends(get_user_id_from_token),
     id_usuario: int | None = None,
 ):
@@ -279,14 +747,18 @@ def eliminar_evento_financiero(
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  evento = db.query(EventoFinanciero).filter(
-      EventoFinanciero.id_evento == id_evento,
-      EventoFinanciero.id_usuario == user_id).first()
+  evento = await db.scalar(
+      select(EventoFinanciero).where(EventoFinanciero.id_evento == id_evento,
+                                     EventoFinanciero.id_usuario == user_id))
 
   if not evento:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Evento no encontrado.")
 
-  db.delete(evento)
-  db.commit()
+  deltas = RollupDeltas()
+  deltas.agregar_evento(evento, -1)
+
+  await db.delete(evento)
+  await aplicar_deltas(db, deltas)
+  await db.commit()
   return None
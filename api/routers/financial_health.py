@@ -2,95 +2,186 @@
 Financial Health Routers for MoneyPilot API.
 Provides modular GET endpoints for financial health features.
 """
+from datetime import date
 from datetime import datetime
-from datetime import timezone
-from typing import Optional
 
+from api import config
 from api.auth.token import get_user_id_from_token
-from api.database import get_db
-from api.models.evento_financiero import EventoFinanciero
+from api.database import get_async_db
+from api.dependencies import query_budget
 from api.models.perfil import PerfilUsuario
+from api.models.usuario import Usuario
+from api.responses import cabeceras_etag
+from api.responses import coincide_etag
+from api.responses import etag
+from api.responses import no_modificado
+from api.responses import ORJSONResponse
 from api.schemas.financial_health import FinancialHealthMetrics
 from api.schemas.financial_health import FinancialHealthProjection
 from api.schemas.financial_health import FinancialHealthRecommendations
 from api.schemas.financial_health import FinancialHealthScore
+from api.schemas.financial_health import FinancialHealthScoreHistory
+from api.schemas.financial_health import FinancialHealthSimulation
 from api.schemas.financial_health import FinancialHealthSummary
 from api.schemas.financial_health import RecommendationItem
-from api.services.financial_health_service import analyze_financial_metrics
+from api.services.financial_health_cache import summary_cache
 from api.services.financial_health_service import build_summary
-from api.services.financial_health_service import calculate_health_score
-from api.services.financial_health_service import generate_recommendations
-from api.services.financial_health_service import project_savings
+from api.services.financial_health_service import transaction_window
+from api.services.financial_health_service import TransactionAggregates
+from api.services.projection_service import build_inputs
+from api.services.projection_service import DEFAULT_SCENARIOS
+from api.services.projection_service import history_window
+from api.services.projection_service import simulate_savings
+from api.services.rollup_service import agregados_por_tipo
+from api.services.rollup_service import totales_mensuales
+from api.services.score_history_service import historial_scores
+from api.services.score_history_service import registrar_score_perfil
+from api.services.score_history_service import ultimo_score
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import HTTPException
 from fastapi import Query
+from fastapi import Request
 from fastapi import status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/financial_health", tags=["Financial Health"])
 
+# analyze_financial_metrics devuelve además campos que el esquema no expone
+_CAMPOS_METRICS = tuple(FinancialHealthMetrics.model_fields)
+
+
+async def _cargar_agregados(db: AsyncSession,
+                            user_id: int) -> TransactionAggregates:
+  """Lee los agregados de eventos que declara el servicio, hasta hoy.
+
+    Los meses completos salen del resumen mensual, que se actualiza en cada
+    escritura de eventos: la ventana cuesta una fila por mes y categoría más
+    los eventos del mes en curso, sin los programados para después de hoy.
+    """
+  today = date.today()
+  desde, meses = transaction_window(today)
+  gastos, ingresos, cantidad = await agregados_por_tipo(db, user_id, desde,
+                                                        today)
+  return TransactionAggregates(ingresos=float(ingresos),
+                               gastos=float(gastos),
+                               cantidad=cantidad,
+                               meses=meses)
+
+
+async def _obtener_resumen(db: AsyncSession,
+                           user_id: int,
+                           versiones: tuple | None = None) -> dict:
+  """Devuelve la salida de build_summary del usuario, usando la caché.
+
+    Todos los endpoints comparten el mismo resumen, así que un dashboard que
+    consulta varios de ellos lo calcula una sola vez. Con `versiones`, solo
+    sirve un resumen calculado a partir de esas mismas versiones.
+    """
+  summary = summary_cache.get(user_id, versiones)
+  if summary is not None:
+    return summary
+
+  generacion = summary_cache.generacion(user_id)
+  profile = await db.scalar(
+      select(PerfilUsuario).where(PerfilUsuario.id_usuario == user_id))
+  if not profile:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Perfil no encontrado.")
+
+  transactions = await _cargar_agregados(db, user_id)
+  summary = build_summary(profile, transactions)
+  summary_cache.guardar(user_id, summary, generacion, versiones)
+  return summary
+
 
 @router.get("/score",
             response_model=FinancialHealthScore,
-            status_code=status.HTTP_200_OK)
-def obtener_score(db: Session = Depends(get_db),
-                  token_user_id: int | None = Depends(get_user_id_from_token),
-                  id_usuario: int | None = None):
-  """Devuelve el puntaje y estado de salud financiera del usuario."""
+            status_code=status.HTTP_200_OK,
+            dependencies=[Depends(query_budget(4))])
+async def obtener_score(db: AsyncSession = Depends(get_async_db),
+                        token_user_id: int |
+                        None = Depends(get_user_id_from_token),
+                        id_usuario: int | None = None,
+                        as_of: datetime | None = None):
+  """Devuelve el puntaje y estado de salud financiera del usuario.
+
+    Lee el último puntaje registrado en el historial (o el último calculado
+    hasta `as_of`). Si el usuario aún no tiene historial (perfil creado antes
+    del historial o fuera de la API), lo calcula y lo registra: es la única
+    lectura que escribe y hace commit, y solo la primera vez.
+    """
   user_id = id_usuario or token_user_id
   if not user_id:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  profile = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
+  snapshot = await ultimo_score(db, user_id, as_of)
+  if snapshot:
+    return FinancialHealthScore.model_validate(snapshot)
+  if as_of is not None:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                        detail="No hay puntaje registrado para esa fecha.")
+
+  profile = await db.scalar(
+      select(PerfilUsuario).where(PerfilUsuario.id_usuario == user_id))
   if not profile:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Perfil no encontrado.")
+  snapshot = registrar_score_perfil(db, profile)
+  await db.commit()
+
+  return FinancialHealthScore.model_validate(snapshot)
+
+
+@router.get("/score/history",
+            response_model=FinancialHealthScoreHistory,
+            status_code=status.HTTP_200_OK)
+async def obtener_historial_score(db: AsyncSession = Depends(get_async_db),
+                                  token_user_id: int |
+                                  None = Depends(get_user_id_from_token),
+                                  id_usuario: int | None = None,
+                                  desde: datetime | None = None,
+                                  hasta: datetime | None = None,
+                                  limit: int = Query(100, ge=1, le=1000)):
+  """Devuelve el historial de puntajes del usuario, del más reciente al más antiguo."""
+  user_id = id_usuario or token_user_id
+  if not user_id:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="No autorizado o token inválido.")
 
-  transactions = db.query(EventoFinanciero).filter(
-      EventoFinanciero.id_usuario == user_id).all()
-  metrics = analyze_financial_metrics(profile, transactions)
-  score = calculate_health_score(metrics)
+  snapshots = await historial_scores(db, user_id, desde, hasta, limit)
 
-  return FinancialHealthScore(
-      score=score,
-      status=("Excelente" if score >= 80 else "Buena" if score >= 60 else
-              "Regular" if score >= 40 else "Necesita Atención"),
-      calculated_at=datetime.now(timezone.utc))
+  return FinancialHealthScoreHistory(historial=[
+      FinancialHealthScore.model_validate(snapshot) for snapshot in snapshots
+  ])
 
 
 @router.get("/metrics",
             response_model=FinancialHealthMetrics,
             status_code=status.HTTP_200_OK)
-def obtener_metrics(db: Session = Depends(get_db),
-                    token_user_id: int | None = Depends(get_user_id_from_token),
-                    id_usuario: int | None = None):
+async def obtener_metrics(
+    db: AsyncSession = Depends(get_async_db),
+    token_user_id: int | None = Depends(get_user_id_from_token),
+    id_usuario: int | None = None):
   """Devuelve las métricas básicas de salud financiera del usuario."""
   user_id = id_usuario or token_user_id
   if not user_id:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  profile = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
-  if not profile:
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Perfil no encontrado.")
-
-  transactions = db.query(EventoFinanciero).filter(
-      EventoFinanciero.id_usuario == user_id).all()
-  metrics = analyze_financial_metrics(profile, transactions)
+  summary_data = await _obtener_resumen(db, user_id)
 
-  return FinancialHealthMetrics(**metrics)
+  return FinancialHealthMetrics(**summary_data["metrics"])
 
 
 @router.get("/projection",
             response_model=FinancialHealthProjection,
             status_code=status.HTTP_200_OK)
-def obtener_projection(
-    db: Session = Depends(get_db),
+async def obtener_projection(
+    db: AsyncSession = Depends(get_async_db),
     token_user_id: int | None = Depends(get_user_id_from_token),
     id_usuario: int | None = None):
   """Devuelve la proyección de ahorros del usuario a 24 meses."""
@@ -99,22 +190,71 @@ def obtener_projection(
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  profile = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
+  summary_data = await _obtener_resumen(db, user_id)
+
+  return FinancialHealthProjection(**summary_data["projection"])
+
+
+@router.get("/projection/simulation",
+            response_model=FinancialHealthSimulation,
+            status_code=status.HTTP_200_OK,
+            dependencies=[Depends(query_budget(2))])
+async def obtener_simulacion(db: AsyncSession = Depends(get_async_db),
+                             token_user_id: int |
+                             None = Depends(get_user_id_from_token),
+                             id_usuario: int | None = None,
+                             horizonte_meses: int = Query(24, ge=1, le=360),
+                             escenarios: int | None = Query(None,
+                                                            ge=100,
+                                                            le=10000),
+                             tasa_interes_anual: float = Query(0.0, ge=0, le=1),
+                             semilla: int | None = None):
+  """Simula escenarios de Monte Carlo del ahorro del usuario.
+
+    La media y la volatilidad mensual de ingresos y gastos salen de los
+    últimos meses completos de eventos (o del perfil si no hay historial
+    suficiente). Devuelve bandas de percentiles por mes y la probabilidad
+    de alcanzar la meta de ahorro. Sin `semilla` se usa el id del usuario,
+    así que la misma consulta devuelve el mismo resultado.
+
+    horizonte_meses × escenarios no puede superar SIMULATION_MAX_CELLS; sin
+    `escenarios` se usan DEFAULT_SCENARIOS, o menos si el horizonte no deja
+    más. La simulación corre en el threadpool para no bloquear el event loop.
+    """
+  user_id = id_usuario or token_user_id
+  if not user_id:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="No autorizado o token inválido.")
+
+  max_celdas = config.settings.SIMULATION_MAX_CELLS
+  if escenarios is None:
+    escenarios = min(DEFAULT_SCENARIOS, max_celdas // horizonte_meses)
+  if horizonte_meses * escenarios > max_celdas:
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"horizonte_meses × escenarios no puede superar {max_celdas}.")
+
+  profile = await db.scalar(
+      select(PerfilUsuario).where(PerfilUsuario.id_usuario == user_id))
   if not profile:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Perfil no encontrado.")
 
-  projection_data = project_savings(profile)
-
-  return FinancialHealthProjection(**projection_data)
+  desde, hasta = history_window(date.today())
+  historial = await totales_mensuales(db, user_id, desde, hasta)
+  inputs = build_inputs(profile, historial, hasta)
+  semilla = user_id if semilla is None else semilla
+  simulacion = await run_in_threadpool(simulate_savings, inputs,
+                                       horizonte_meses, escenarios,
+                                       tasa_interes_anual, semilla)
+  return ORJSONResponse(simulacion)
 
 
 @router.get("/recommendations",
             response_model=FinancialHealthRecommendations,
             status_code=status.HTTP_200_OK)
-def obtener_recommendations(
-    db: Session = Depends(get_db),
+async def obtener_recommendations(
+    db: AsyncSession = Depends(get_async_db),
     token_user_id: int | None = Depends(get_user_id_from_token),
     id_usuario: int | None = None):
   """Devuelve recomendaciones personalizadas de salud financiera."""
@@ -123,55 +263,59 @@ def obtener_recommendations(
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  profile = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
-  if not profile:
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Perfil no encontrado.")
-
-  transactions = db.query(EventoFinanciero).filter(
-      EventoFinanciero.id_usuario == user_id).all()
-  metrics = analyze_financial_metrics(profile, transactions)
-  recommendations = generate_recommendations(metrics)
-  recommendation_items = [RecommendationItem(**rec) for rec in recommendations]
+  summary_data = await _obtener_resumen(db, user_id)
+  recommendation_items = [
+      RecommendationItem(**rec)
+      for rec in summary_data["recommendations"]["recommendations"]
+  ]
 
   return FinancialHealthRecommendations(recommendations=recommendation_items)
 
 
 @router.get("/summary",
             response_model=FinancialHealthSummary,
-            status_code=status.HTTP_200_OK)
-def obtener_summary(db: Session = Depends(get_db),
-                    token_user_id: int | None = Depends(get_user_id_from_token),
-                    id_usuario: int | None = None):
-  """Devuelve el resumen completo de salud financiera del usuario."""
+            status_code=status.HTTP_200_OK,
+            dependencies=[Depends(query_budget(3))])
+async def obtener_summary(request: Request,
+                          db: AsyncSession = Depends(get_async_db),
+                          token_user_id: int |
+                          None = Depends(get_user_id_from_token),
+                          id_usuario: int | None = None):
+  """Devuelve el resumen completo de salud financiera del usuario.
+
+    La ETag débil sale de ultima_actualizacion del perfil y de
+    usuarios.version_eventos; si coincide con If-None-Match se responde 304
+    sin calcular ni leer el resumen de la caché.
+    """
   user_id = id_usuario or token_user_id
   if not user_id:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  profile = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
-  if not profile:
+  # Versiones leídas antes que los datos: el cuerpo nunca es más viejo que
+  # la ETag. La fecha cuenta porque la ventana de eventos avanza con ella
+  fila = (await db.execute(
+      select(PerfilUsuario.ultima_actualizacion,
+             Usuario.version_eventos).join(Usuario).where(
+                 PerfilUsuario.id_usuario == user_id))).one_or_none()
+  if fila is None:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Perfil no encontrado.")
+  versiones = (*fila, date.today())
+  etiqueta = etag(user_id, *versiones)
+  if coincide_etag(request, etiqueta):
+    return no_modificado(etiqueta)
 
-  transactions = db.query(EventoFinanciero).filter(
-      EventoFinanciero.id_usuario == user_id).all()
-  summary_data = build_summary(profile, transactions)
-
-  # Convert recommendation dictionaries to RecommendationItem objects
-  recommendation_items = [
-      RecommendationItem(**rec)
-      for rec in summary_data["recommendations"]["recommendations"]
-  ]
+  summary_data = await _obtener_resumen(db, user_id, versiones)
 
-  return FinancialHealthSummary(
-      score=FinancialHealthScore(
-          score=summary_data["score"]["score"],
-          status=summary_data["score"]["status"],
-          calculated_at=summary_data["score"]["calculated_at"]),
-      metrics=FinancialHealthMetrics(**summary_data["metrics"]),
-      projection=FinancialHealthProjection(**summary_data["projection"]),
-      recommendations=FinancialHealthRecommendations(
-          recommendations=recommendation_items))
+  # build_summary ya tiene la forma de FinancialHealthSummary: se serializa
+  # una sola vez, sin reconstruir ni revalidar los modelos
+  metrics = summary_data["metrics"]
+  return ORJSONResponse(
+      {
+          **summary_data,
+          "metrics": {
+              campo: metrics[campo] for campo in _CAMPOS_METRICS
+          },
+      },
+      headers=cabeceras_etag(etiqueta))
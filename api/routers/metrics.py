@@ -0,0 +1,112 @@
+"""
+Metrics Router for MoneyPilot API.
+Exposes this worker's runtime statistics in the Prometheus text format:
+per-route HTTP metrics, connection pools, in-memory caches, the password
+hashing pool and threadpool saturation.
+"""
+from anyio import to_thread
+from api.auth.hashing import hashing_pool
+from api.auth.token import token_cache
+from api.database import pool_status
+from api.dependencies import usuario_cache
+from api.services.financial_health_cache import summary_cache
+from api.telemetry import format_histogram
+from api.telemetry import format_labels
+from api.telemetry import http_metrics
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+router = APIRouter(tags=["Monitoreo"])
+
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _metrica(lines: list, name: str, kind: str, help_text: str,
+             samples: list) -> None:
+  """Agrega una familia de métricas con sus muestras (labels, valor)."""
+  if kind == "counter":
+    name += "_total"
+  lines.append(f"# HELP {name} {help_text}")
+  lines.append(f"# TYPE {name} {kind}")
+  for labels, value in samples:
+    lines.append(f"{name}{format_labels(labels)} {value}")
+
+
+def _metricas_pools(lines: list) -> None:
+  pools = pool_status()
+  for campo, kind, help_text in (
+      ("size", "gauge", "Configured pool size."),
+      ("checked_out", "gauge", "Connections in use."),
+      ("checked_in", "gauge", "Idle connections in the pool."),
+      ("overflow", "gauge", "Connections opened beyond pool size."),
+      ("checkout_timeouts", "counter", "Checkouts that timed out."),
+  ):
+    samples = [
+        (dict(pool=nombre), estado[campo]) for nombre, estado in pools.items()
+    ]
+    _metrica(lines, f"db_pool_{campo}", kind, help_text, samples)
+
+  lines.append("# HELP db_pool_checkout_wait_seconds Time waiting for a "
+               "connection.")
+  lines.append("# TYPE db_pool_checkout_wait_seconds histogram")
+  for nombre, estado in pools.items():
+    lines += format_histogram("db_pool_checkout_wait_seconds", {"pool": nombre},
+                              estado["checkout_wait_seconds"])
+
+
+def _metricas_caches(lines: list) -> None:
+  caches = {
+      "financial_health_summary": summary_cache.stats(),
+      "jwt": token_cache.stats(),
+      "usuarios": usuario_cache.stats(),
+  }
+  for campo, kind, help_text in (
+      ("size", "gauge", "Entries in the cache."),
+      ("hits", "counter", "Cache hits."),
+      ("misses", "counter", "Cache misses."),
+  ):
+    samples = [
+        (dict(cache=nombre), stats[campo]) for nombre, stats in caches.items()
+    ]
+    _metrica(lines, f"cache_{campo}", kind, help_text, samples)
+
+
+def _metricas_hashing(lines: list) -> None:
+  stats = hashing_pool.stats()
+  _metrica(lines, "password_hash_in_flight", "gauge",
+           "Hashing operations queued or running.", [({}, stats["in_flight"])])
+  _metrica(lines, "password_hash_queued", "gauge",
+           "Hashing operations waiting for a worker process.",
+           [({}, stats["queued"])])
+  _metrica(lines, "password_hash_rejected", "counter",
+           "Hashing operations rejected because the queue was full.",
+           [({}, stats["rejected"])])
+  lines.append("# HELP password_hash_duration_seconds Time per hashing "
+               "operation, including queueing.")
+  lines.append("# TYPE password_hash_duration_seconds histogram")
+  lines += format_histogram("password_hash_duration_seconds", {},
+                            stats["duration_seconds"])
+
+
+def _metricas_threadpool(lines: list) -> None:
+  limiter = to_thread.current_default_thread_limiter()
+  estadisticas = limiter.statistics()
+  _metrica(lines, "threadpool_threads_busy", "gauge",
+           "Threadpool tokens in use (sync endpoints and dependencies).",
+           [({}, limiter.borrowed_tokens)])
+  _metrica(lines, "threadpool_size", "gauge", "Threadpool size.",
+           [({}, limiter.total_tokens)])
+  _metrica(lines, "threadpool_tasks_waiting", "gauge",
+           "Tasks waiting for a free thread.",
+           [({}, estadisticas.tasks_waiting)])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def obtener_metricas():
+  """Devuelve las métricas de este worker en formato de texto de Prometheus."""
+  lines = http_metrics.render()
+  _metricas_pools(lines)
+  _metricas_caches(lines)
+  _metricas_hashing(lines)
+  _metricas_threadpool(lines)
+  return PlainTextResponse("\n".join(lines) + "\n", media_type=_CONTENT_TYPE)
@@ -0,0 +1,60 @@
+"""
+Monitoring Routers for MoneyPilot API.
+Exposes runtime statistics used to size and operate each worker.
+"""
+from api.auth.hashing import hashing_pool
+from api.auth.token import token_cache
+from api.database import pool_status
+from api.dependencies import get_current_user
+from api.dependencies import usuario_cache
+from api.services.financial_health_cache import summary_cache
+from api.services.reference_data_service import reference_data
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import status
+
+router = APIRouter(prefix="/monitoring", tags=["Monitoreo"])
+
+
+@router.get("/pool", status_code=status.HTTP_200_OK)
+async def obtener_estado_pool():
+  """Devuelve el estado de los pools de conexiones de este worker."""
+  return pool_status()
+
+
+@router.get("/caches", status_code=status.HTTP_200_OK)
+async def obtener_estado_caches():
+  """Devuelve tamaño y aciertos de las cachés en memoria de este worker."""
+  return {
+      "financial_health_summary": summary_cache.stats(),
+      "jwt": token_cache.stats(),
+      "usuarios": usuario_cache.stats(),
+  }
+
+
+@router.get("/hashing", status_code=status.HTTP_200_OK)
+async def obtener_estado_hashing():
+  """Devuelve cola, rechazos y latencia del pool de hashing de este worker."""
+  return hashing_pool.stats()
+
+
+@router.post("/catalogos/refrescar",
+             status_code=status.HTTP_200_OK,
+             dependencies=[Depends(get_current_user)])
+async def refrescar_catalogos():
+  """Recarga ya los catálogos en memoria de este worker, sin esperar el TTL.
+
+    Para usar tras editar categorías, fuentes de ingreso o países por SQL.
+    Cada worker tiene su propia copia: con varios workers solo se recarga el
+    que atiende la petición, y los demás al vencer REFERENCE_DATA_TTL_SECONDS.
+    A diferencia de las demás rutas de monitoreo, modifica el estado del
+    worker, así que requiere un usuario autenticado.
+    """
+  catalogo = await reference_data.refresh()
+  return {
+      "version": catalogo.version,
+      "categorias_gasto": len(catalogo.categorias_gasto),
+      "categorias_ingreso": len(catalogo.categorias_ingreso),
+      "fuentes_ingreso": len(catalogo.fuentes_ingreso),
+      "paises": len(catalogo.paises),
+  }
@@ -1,19 +1,27 @@
 from api.auth.token import get_user_id_from_token
-from api.database import get_db
-from api.models.fuentes_ingreso import FuenteIngreso
+from api.database import get_async_db
+from api.dependencies import obtener_usuario
+from api.dependencies import query_budget
 from api.models.perfil import PerfilUsuario
-from api.models.usuario import Usuario
+from api.responses import cabeceras_etag
+from api.responses import coincide_etag
+from api.responses import etag
+from api.responses import no_modificado
+from api.responses import ORJSONResponse
 from api.schemas.perfil import PerfilFinancieroCreate
 from api.schemas.perfil import PerfilFinancieroRead
 from api.schemas.perfil import PerfilPersonalCreate
 from api.schemas.perfil import PerfilPersonalRead
 from api.schemas.perfil import PerfilUsuarioRead
+from api.services.reference_data_service import reference_data
+from api.services.score_history_service import registrar_score_perfil
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import HTTPException
+from fastapi import Request
 from fastapi import status
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/perfil_personal", tags=["Perfiles"])
 
@@ -21,11 +29,11 @@ router = APIRouter(prefix="/perfil_personal", tags=["Perfiles"])
 @router.post("/",
              response_model=PerfilUsuarioRead,
              status_code=status.HTTP_201_CREATED)
-def crear_perfil_personal(data: PerfilPersonalCreate,
-                          db: Session = Depends(get_db),
-                          token_user_id: int |
-                          None = Depends(get_user_id_from_token),
-                          id_usuario: int | None = None):
+async def crear_perfil_personal(data: PerfilPersonalCreate,
+                                db: AsyncSession = Depends(get_async_db),
+                                token_user_id: int |
+                                None = Depends(get_user_id_from_token),
+                                id_usuario: int | None = None):
   """Crea la información personal básica del usuario.
     Si no se proporciona id_usuario, se toma del token JWT.
     """
@@ -35,23 +43,20 @@ def crear_perfil_personal(data: PerfilPersonalCreate,
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+  user = await obtener_usuario(db, user_id)
   if not user:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Usuario no encontrado.")
 
-  perfil = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
+  perfil = await db.scalar(
+      select(PerfilUsuario).where(PerfilUsuario.id_usuario == user_id))
 
   if perfil:
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                         detail="Perfil ya existe. Use PUT para actualizar.")
 
-  pais = db.execute(
-      text("SELECT id_pais FROM paises_latam WHERE codigo = :codigo"), {
-          "codigo": data.codigo_pais
-      }).fetchone()
-  id_pais = pais[0] if pais else None
+  catalogo = await reference_data.get()
+  id_pais = catalogo.paises_por_codigo.get(data.codigo_pais)
 
   perfil = PerfilUsuario(id_usuario=user_id,
                          nombre=data.nombre,
@@ -61,19 +66,19 @@ def crear_perfil_personal(data: PerfilPersonalCreate,
                          acepta_terminos=data.acepta_terminos)
   db.add(perfil)
 
-  db.commit()
-  db.refresh(perfil)
+  await db.commit()
+  await db.refresh(perfil)
   return perfil
 
 
 @router.put("/",
             response_model=PerfilUsuarioRead,
             status_code=status.HTTP_200_OK)
-def actualizar_perfil_personal(data: PerfilPersonalCreate,
-                               db: Session = Depends(get_db),
-                               token_user_id: int |
-                               None = Depends(get_user_id_from_token),
-                               id_usuario: int | None = None):
+async def actualizar_perfil_personal(data: PerfilPersonalCreate,
+                                     db: AsyncSession = Depends(get_async_db),
+                                     token_user_id: int |
+                                     None = Depends(get_user_id_from_token),
+                                     id_usuario: int | None = None):
   """Actualiza la información personal básica del usuario.
     Si no se proporciona id_usuario, se toma del token JWT.
     """
@@ -83,23 +88,20 @@ def actualizar_perfil_personal(data: PerfilPersonalCreate,
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+  user = await obtener_usuario(db, user_id)
   if not user:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Usuario no encontrado.")
 
-  perfil = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
+  perfil = await db.scalar(
+      select(PerfilUsuario).where(PerfilUsuario.id_usuario == user_id))
 
   if not perfil:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Perfil no encontrado.")
 
-  pais = db.execute(
-      text("SELECT id_pais FROM paises_latam WHERE codigo = :codigo"), {
-          "codigo": data.codigo_pais
-      }).fetchone()
-  id_pais = pais[0] if pais else None
+  catalogo = await reference_data.get()
+  id_pais = catalogo.paises_por_codigo.get(data.codigo_pais)
 
   perfil.nombre = data.nombre
   perfil.apellido = data.apellido
@@ -107,20 +109,25 @@ def actualizar_perfil_personal(data: PerfilPersonalCreate,
   perfil.id_pais_residencia = id_pais
   perfil.acepta_terminos = data.acepta_terminos
 
-  db.commit()
-  db.refresh(perfil)
+  await db.commit()
+  await db.refresh(perfil)
   return perfil
 
 
 @router.get("/",
             response_model=PerfilPersonalRead,
-            status_code=status.HTTP_200_OK)
-def obtener_perfil_personal(
-    db: Session = Depends(get_db),
-    token_user_id: int | None = Depends(get_user_id_from_token),
-    id_usuario: int | None = None):
+            status_code=status.HTTP_200_OK,
+            dependencies=[Depends(query_budget(2))])
+async def obtener_perfil_personal(request: Request,
+                                  db: AsyncSession = Depends(get_async_db),
+                                  token_user_id: int |
+                                  None = Depends(get_user_id_from_token),
+                                  id_usuario: int | None = None):
   """Obtiene la información personal de un usuario (sin acepta_terminos).
     Si no se proporciona id_usuario, se toma del token JWT.
+
+    Responde 304 si If-None-Match coincide con la ETag, que sale de
+    ultima_actualizacion del perfil y de la versión del catálogo de países.
     """
 
   user_id = id_usuario or token_user_id
@@ -128,36 +135,40 @@ def obtener_perfil_personal(
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+  user = await obtener_usuario(db, user_id)
   if not user:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Usuario no encontrado.")
 
-  perfil = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user.id_usuario).first()
+  perfil = await db.scalar(
+      select(PerfilUsuario).where(PerfilUsuario.id_usuario == user.id_usuario))
   if not perfil:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Perfil no encontrado.")
 
-  pais = db.execute(
-      text("SELECT nombre FROM paises_latam WHERE id_pais = :id_pais"), {
-          "id_pais": perfil.id_pais_residencia
-      }).fetchone()
+  catalogo = await reference_data.get()
+  etiqueta = etag(user_id, perfil.ultima_actualizacion, catalogo.version)
+  if coincide_etag(request, etiqueta):
+    return no_modificado(etiqueta)
 
-  return PerfilPersonalRead(nombre=perfil.nombre,
-                            apellido=perfil.apellido,
-                            fecha_nacimiento=perfil.fecha_nacimiento,
-                            pais_residencia=pais[0] if pais else None)
+  return ORJSONResponse(
+      {
+          "nombre": perfil.nombre,
+          "apellido": perfil.apellido,
+          "fecha_nacimiento": perfil.fecha_nacimiento,
+          "pais_residencia": catalogo.paises.get(perfil.id_pais_residencia),
+      },
+      headers=cabeceras_etag(etiqueta))
 
 
 @router.post("/financiero",
              response_model=PerfilUsuarioRead,
              status_code=status.HTTP_201_CREATED)
-def crear_perfil_financiero(data: PerfilFinancieroCreate,
-                            db: Session = Depends(get_db),
-                            token_user_id: int |
-                            None = Depends(get_user_id_from_token),
-                            id_usuario: int | None = None):
+async def crear_perfil_financiero(data: PerfilFinancieroCreate,
+                                  db: AsyncSession = Depends(get_async_db),
+                                  token_user_id: int |
+                                  None = Depends(get_user_id_from_token),
+                                  id_usuario: int | None = None):
   """Crea la información financiera del usuario.
     Si no se proporciona id_usuario, se toma del token JWT.
     """
@@ -167,13 +178,13 @@ def crear_perfil_financiero(data: PerfilFinancieroCreate,
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+  user = await obtener_usuario(db, user_id)
   if not user:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Usuario no encontrado.")
 
-  perfil = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
+  perfil = await db.scalar(
+      select(PerfilUsuario).where(PerfilUsuario.id_usuario == user_id))
 
   if not perfil:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -185,12 +196,11 @@ def crear_perfil_financiero(data: PerfilFinancieroCreate,
         status_code=status.HTTP_400_BAD_REQUEST,
         detail="Perfil financiero ya existe. Use PUT para actualizar.")
 
-  # Validate fuentes_ingreso against the fuentes_ingreso table
+  # Validate fuentes_ingreso against the cached fuentes_ingreso table
   if data.fuentes_ingreso:
+    catalogo = await reference_data.get()
     for fuente in data.fuentes_ingreso:
-      fuente_ingreso = db.query(FuenteIngreso).filter(
-          FuenteIngreso.nombre == fuente).first()
-      if not fuente_ingreso:
+      if fuente not in catalogo.fuentes_ingreso:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail=f"Fuente de ingreso no válida: {fuente}")
 
@@ -203,20 +213,21 @@ def crear_perfil_financiero(data: PerfilFinancieroCreate,
   perfil.monto_meta_ahorro = data.meta_ahorro.monto
   perfil.plazo_meta_ahorro_meses = data.meta_ahorro.plazo_meses
   perfil.ahorro_planificado_mensual = data.ahorro_planificado_mensual
+  registrar_score_perfil(db, perfil)
 
-  db.commit()
-  db.refresh(perfil)
+  await db.commit()
+  await db.refresh(perfil)
   return perfil
 
 
 @router.put("/financiero",
             response_model=PerfilUsuarioRead,
             status_code=status.HTTP_200_OK)
-def actualizar_perfil_financiero(data: PerfilFinancieroCreate,
-                                 db: Session = Depends(get_db),
-                                 token_user_id: int |
-                                 None = Depends(get_user_id_from_token),
-                                 id_usuario: int | None = None):
+async def actualizar_perfil_financiero(data: PerfilFinancieroCreate,
+                                       db: AsyncSession = Depends(get_async_db),
+                                       token_user_id: int |
+                                       None = Depends(get_user_id_from_token),
+                                       id_usuario: int | None = None):
   """Actualiza la información financiera del usuario.
     Si no se proporciona id_usuario, se toma del token JWT.
     """
@@ -226,24 +237,23 @@ def actualizar_perfil_financiero(data: PerfilFinancieroCreate,
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+  user = await obtener_usuario(db, user_id)
   if not user:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Usuario no encontrado.")
 
-  perfil = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
+  perfil = await db.scalar(
+      select(PerfilUsuario).where(PerfilUsuario.id_usuario == user_id))
 
   if not perfil:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Perfil no encontrado.")
 
-  # Validate fuentes_ingreso against the fuentes_ingreso table
+  # Validate fuentes_ingreso against the cached fuentes_ingreso table
   if data.fuentes_ingreso:
+    catalogo = await reference_data.get()
     for fuente in data.fuentes_ingreso:
-      fuente_ingreso = db.query(FuenteIngreso).filter(
-          FuenteIngreso.nombre == fuente).first()
-      if not fuente_ingreso:
+      if fuente not in catalogo.fuentes_ingreso:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail=f"Fuente de ingreso no válida: {fuente}")
 
@@ -256,45 +266,58 @@ def actualizar_perfil_financiero(data: PerfilFinancieroCreate,
   perfil.monto_meta_ahorro = data.meta_ahorro.monto
   perfil.plazo_meta_ahorro_meses = data.meta_ahorro.plazo_meses
   perfil.ahorro_planificado_mensual = data.ahorro_planificado_mensual
+  registrar_score_perfil(db, perfil)
 
-  db.commit()
-  db.refresh(perfil)
+  await db.commit()
+  await db.refresh(perfil)
   return perfil
 
 
 @router.get("/financiero",
             response_model=PerfilFinancieroRead,
-            status_code=status.HTTP_200_OK)
-def obtener_perfil_financiero(
-    db: Session = Depends(get_db),
-    token_user_id: int | None = Depends(get_user_id_from_token),
-    id_usuario: int | None = None):
-  """Obtiene la información financiera del usuario."""
+            status_code=status.HTTP_200_OK,
+            dependencies=[Depends(query_budget(2))])
+async def obtener_perfil_financiero(request: Request,
+                                    db: AsyncSession = Depends(get_async_db),
+                                    token_user_id: int |
+                                    None = Depends(get_user_id_from_token),
+                                    id_usuario: int | None = None):
+  """Obtiene la información financiera del usuario.
+
+    Responde 304 si If-None-Match coincide con la ETag, que sale de
+    ultima_actualizacion del perfil.
+    """
 
   user_id = id_usuario or token_user_id
   if not user_id:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                         detail="No autorizado o token inválido.")
 
-  user = db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
+  user = await obtener_usuario(db, user_id)
   if not user:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Usuario no encontrado.")
 
-  perfil = db.query(PerfilUsuario).filter(
-      PerfilUsuario.id_usuario == user_id).first()
+  perfil = await db.scalar(
+      select(PerfilUsuario).where(PerfilUsuario.id_usuario == user_id))
   if not perfil:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Perfil financiero no encontrado.")
 
-  return PerfilFinancieroRead(
-      ingreso_mensual_estimado=perfil.ingreso_mensual_estimado,
-      fuentes_ingreso=perfil.fuentes_ingreso,
-      gastos_fijos_mensuales=perfil.gastos_fijos_mensuales,
-      gastos_variables_mensuales=perfil.gastos_variables_mensuales,
-      ahorro_actual=perfil.ahorro_actual,
-      deuda_total=perfil.deuda_total,
-      monto_meta_ahorro=perfil.monto_meta_ahorro,
-      plazo_meta_ahorro_meses=perfil.plazo_meta_ahorro_meses,
-      ahorro_planificado_mensual=perfil.ahorro_planificado_mensual,
-  )
+  etiqueta = etag(user_id, perfil.ultima_actualizacion)
+  if coincide_etag(request, etiqueta):
+    return no_modificado(etiqueta)
+
+  return ORJSONResponse(
+      {
+          "ingreso_mensual_estimado": perfil.ingreso_mensual_estimado,
+          "fuentes_ingreso": perfil.fuentes_ingreso,
+          "gastos_fijos_mensuales": perfil.gastos_fijos_mensuales,
+          "gastos_variables_mensuales": perfil.gastos_variables_mensuales,
+          "ahorro_actual": perfil.ahorro_actual,
+          "deuda_total": perfil.deuda_total,
+          "monto_meta_ahorro": perfil.monto_meta_ahorro,
+          "plazo_meta_ahorro_meses": perfil.plazo_meta_ahorro_meses,
+          "ahorro_planificado_mensual": perfil.ahorro_planificado_mensual,
+      },
+      headers=cabeceras_etag(etiqueta))
@@ -1,5 +1,6 @@
-from api.auth.hashing import hash_password
-from api.database import get_db
+from api.auth.hashing import hash_password_async
+from api.auth.hashing import HashingQueueFull
+from api.database import get_async_db
 from api.models.usuario import Usuario
 from api.schemas.usuario import UsuarioCreate
 from api.schemas.usuario import UsuarioRead
@@ -8,7 +9,7 @@ from fastapi import Depends
 from fastapi import HTTPException
 from fastapi import status
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/register_usuario", tags=["Usuarios"])
 
@@ -16,15 +17,23 @@ router = APIRouter(prefix="/register_usuario", tags=["Usuarios"])
 @router.post("/",
              response_model=UsuarioRead,
              status_code=status.HTTP_201_CREATED)
-def register_usuario(data: UsuarioCreate, db: Session = Depends(get_db)):
-  hashed_pwd = hash_password(data.password)
+async def register_usuario(data: UsuarioCreate,
+                           db: AsyncSession = Depends(get_async_db)):
+  # Argon2 es intensivo en CPU: se ejecuta en el pool de procesos de hashing
+  try:
+    hashed_pwd = await hash_password_async(data.password)
+  except HashingQueueFull:
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio de autenticación saturado. Intente nuevamente.",
+        headers={"Retry-After": "1"})
   new_user = Usuario(email=data.email, password_hash=hashed_pwd)
   db.add(new_user)
   try:
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
   except IntegrityError:
-    db.rollback()
+    await db.rollback()
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                         detail="El correo ya está registrado.")
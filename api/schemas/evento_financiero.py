@@ -60,3 +60,23 @@ class EventosFinancierosResponse(BaseModel):
   total_eventos: int
   total_gastos: float
   total_ingresos: float
+  next_cursor: Optional[str] = None
+
+
+class EventoImportError(BaseModel):
+  fila: int
+  detalle: str
+
+
+class EventosImportResponse(BaseModel):
+  insertados: int
+  errores: List[EventoImportError]
+
+
+class ResumenMensualRead(BaseModel):
+  mes: date
+  tipo: str
+  id_categoria: Optional[int]
+  categoria: Optional[str]
+  total: float
+  cantidad: int
@@ -3,7 +3,7 @@ Financial health schemas for MoneyPilot API.
 All monetary values in COP (Colombian Peso), time periods in months/years.
 """
 from datetime import datetime
-from typing import List, Literal
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -16,11 +16,26 @@ class FinancialHealthScore(BaseModel):
   model_config = {"from_attributes": True}
 
 
+class FinancialHealthScoreHistory(BaseModel):
+  historial: List[FinancialHealthScore]  # del más reciente al más antiguo
+
+
 class FuenteIngreso(BaseModel):
   name: str
   amount: float
 
 
+class FinancialHealthActualMetrics(BaseModel):
+  """Métricas calculadas a partir de los eventos registrados."""
+  ingreso_mensual: float
+  gastos_mensuales: float
+  ahorro_mensual: float
+  porcentaje_ahorro: float
+  porcentaje_gastos: float
+  meses: float  # duración transcurrida de la ventana
+  cantidad_eventos: int
+
+
 class FinancialHealthMetrics(BaseModel):
   ingreso_mensual: float
   gastos_fijos_mensuales: float
@@ -33,6 +48,8 @@ class FinancialHealthMetrics(BaseModel):
   ratio_deuda: float
   meses_emergencia: float
   fuentes_ingreso: List[FuenteIngreso]  # {"name": str, "amount": float}
+  # None si el usuario no tiene eventos en la ventana
+  metricas_reales: Optional[FinancialHealthActualMetrics] = None
 
   model_config = {"from_attributes": True}
 
@@ -47,11 +64,41 @@ class ProjectionItem(BaseModel):
 
 class FinancialHealthProjection(BaseModel):
   proyeccion: List[ProjectionItem]
-  meses_para_meta: int
+  meses_para_meta: Optional[int]  # None sin ahorro planificado
 
   model_config = {"from_attributes": True}
 
 
+class SimulationBand(BaseModel):
+  mes_index: int
+  p10: float
+  p25: float
+  p50: float
+  p75: float
+  p90: float
+  probabilidad_meta: float  # escenarios que ya alcanzaron la meta (0–1)
+
+
+class SimulationParameters(BaseModel):
+  saldo_inicial: float
+  meta: float
+  ingreso_medio: float
+  gasto_medio: float
+  volatilidad_ingreso: float  # desviación estándar mensual
+  volatilidad_gasto: float
+  meses_historial: int  # 0 = estimaciones del perfil
+  escenarios: int
+  tasa_interes_anual: float
+
+
+class FinancialHealthSimulation(BaseModel):
+  bandas: List[SimulationBand]  # percentiles del ahorro acumulado por mes
+  meta: float
+  probabilidad_meta: float  # al final del horizonte
+  meses_para_meta: Optional[int]  # mediana; None si < 50 % la alcanza
+  parametros: SimulationParameters
+
+
 class RecommendationItem(BaseModel):
   category: str
   message: str
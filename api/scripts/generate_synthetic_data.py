@@ -0,0 +1,272 @@
+"""
+Generates a large synthetic dataset for scaling tests: users, financial
+profiles and their EventoFinanciero history, streamed into Postgres with
+COPY in chunks of users. The same --seed and options always produce the
+same data (ids depend on the database's sequences).
+
+Events follow per-user activity levels (a few heavy users, many light
+ones), weighted category mixes and amounts proportional to each user's
+income; a share of them are weekly recurring events (es_unico = false,
+semana_inicio = the Monday of their week). The monthly rollup is rebuilt
+at the end.
+
+Generated users are sintetico+N@moneypilot.local and share one password
+(--password). --replace deletes the ones from a previous run first.
+
+Usage:
+  python -m api.scripts.generate_synthetic_data [--usuarios N] [--eventos N]
+      [--meses N] [--seed N] [--chunk-size N] [--replace]
+"""
+import argparse
+import csv
+from datetime import date
+import io
+import sys
+import time
+
+from api import config
+from api.auth.hashing import hash_password
+from api.database import SessionLocal
+import api.models  # noqa: F401  (registra todas las tablas en el metadata)
+from api.models.categorias import CategoriaGasto
+from api.models.categorias import CategoriaIngreso
+from api.models.fuentes_ingreso import FuenteIngreso
+from api.models.pais import PaisLatam
+from api.models.usuario import Usuario
+from api.services.rollup_service import reconstruir
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy import delete
+from sqlalchemy import make_url
+from sqlalchemy import select
+from sqlalchemy.pool import NullPool
+
+EMAIL = "sintetico+{}@moneypilot.local"
+
+# Pesos relativos por nombre de categoría / fuente; las demás pesan 1
+PESOS_GASTO = {
+    "MERCADO": 25,
+    "COMIDA": 20,
+    "TRANSPORTE": 15,
+    "HOGAR": 12,
+    "OCIO": 10,
+    "SALUD": 6,
+    "OTROS": 6,
+    "VIAJES": 3,
+}
+PESOS_INGRESO = {
+    "SALARIO": 60,
+    "FREELANCE": 15,
+    "NEGOCIO": 10,
+    "TRANSFERENCIAS": 8,
+    "INVERSIONES": 4,
+    "OTROS": 3,
+}
+PESOS_FUENTE = {
+    "EMPLEADO FORMAL (ASALARIADO)": 45,
+    "EMPLEADO INFORMAL": 20,
+    "INDEPENDIENTE / CUENTA PROPIA": 20,
+    "EMPLEADOR / EMPRESARIO": 5,
+    "PENSIONADO / JUBILADO": 5,
+}
+
+PROPORCION_INGRESOS = 0.2
+PROPORCION_RECURRENTES = 0.15
+# Numeric(12, 2)
+MONTO_MAXIMO = 9_999_999_999.99
+
+_COLUMNAS_USUARIO = ("id_usuario", "email", "password_hash", "created_at")
+_COLUMNAS_PERFIL = ("id_usuario", "nombre", "apellido", "fecha_nacimiento",
+                    "id_pais_residencia", "acepta_terminos",
+                    "ingreso_mensual_estimado", "gastos_fijos_mensuales",
+                    "gastos_variables_mensuales", "ahorro_actual",
+                    "deuda_total", "monto_meta_ahorro",
+                    "plazo_meta_ahorro_meses", "ahorro_planificado_mensual",
+                    "fuentes_ingreso")
+_COLUMNAS_EVENTO = ("id_usuario", "tipo", "id_categoria_gasto",
+                    "id_categoria_ingreso", "monto", "fecha", "es_unico",
+                    "semana_inicio")
+
+
+def _catalogo(db, columna_id, columna_nombre, pesos: dict):
+  """Ids (o nombres) del catálogo y sus probabilidades."""
+  filas = db.execute(select(columna_id, columna_nombre).order_by(columna_id))
+  ids, nombres = zip(*filas)
+  p = np.array([pesos.get(nombre, 1) for nombre in nombres], dtype=float)
+  return np.array(ids), nombres, p / p.sum()
+
+
+def _montos(valores: np.ndarray) -> np.ndarray:
+  return np.char.mod("%.2f", np.clip(valores, 1, MONTO_MAXIMO).round(2))
+
+
+def _fechas(dias: np.ndarray) -> np.ndarray:
+  return dias.astype("datetime64[D]").astype(str)
+
+
+def _copiar(cursor, tabla: str, columnas: tuple, *valores) -> None:
+  """COPY de las columnas dadas (un array o lista por columna)."""
+  listas = [v.tolist() if isinstance(v, np.ndarray) else v for v in valores]
+  buffer = io.StringIO()
+  csv.writer(buffer).writerows(zip(*listas))
+  buffer.seek(0)
+  cursor.copy_expert(
+      f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)",
+      buffer)
+
+
+def _conexion_copy():
+  """Conexión psycopg2 dedicada: COPY usa cursor.copy_expert."""
+  url = make_url(
+      config.settings.DATABASE_URL).set(drivername="postgresql+psycopg2")
+  return create_engine(url, poolclass=NullPool).raw_connection()
+
+
+class Generador:
+  """Genera y copia los datos de un bloque de usuarios a la vez."""
+
+  def __init__(self, db, args):
+    self.args = args
+    self.gasto_ids, _, self.gasto_p = _catalogo(
+        db, CategoriaGasto.id_categoria_gasto, CategoriaGasto.nombre,
+        PESOS_GASTO)
+    self.ingreso_ids, _, self.ingreso_p = _catalogo(
+        db, CategoriaIngreso.id_categoria_ingreso, CategoriaIngreso.nombre,
+        PESOS_INGRESO)
+    _, self.fuentes, self.fuente_p = _catalogo(db,
+                                               FuenteIngreso.id_fuente_ingreso,
+                                               FuenteIngreso.nombre,
+                                               PESOS_FUENTE)
+    self.paises = np.array(list(db.scalars(select(PaisLatam.id_pais))))
+    self.password_hash = hash_password(args.password)
+    self.hoy = np.datetime64(date.today(), "D").astype(np.int64)
+    self.dias = args.meses * 30
+
+    # Nivel de actividad lognormal: pocos usuarios concentran muchos eventos
+    rng = np.random.default_rng(args.seed)
+    actividad = rng.lognormal(0, 1, args.usuarios)
+    self.eventos_por_usuario = rng.multinomial(args.eventos,
+                                               actividad / actividad.sum())
+
+  def bloque(self, cursor, inicio: int, ids: np.ndarray) -> int:
+    """Copia los usuarios [inicio, inicio + len(ids)) y devuelve sus eventos."""
+    n = len(ids)
+    rng = np.random.default_rng([self.args.seed, inicio])
+    ingreso = rng.lognormal(np.log(3_000_000), 0.6, n).round(2)
+
+    emails = [EMAIL.format(i) for i in range(inicio, inicio + n)]
+    alta = _fechas(self.hoy - rng.integers(self.dias, self.dias + 365, n))
+    _copiar(cursor, "usuarios", _COLUMNAS_USUARIO, ids, emails,
+            [self.password_hash] * n, alta)
+
+    nacimiento = _fechas(self.hoy - rng.integers(18 * 365, 70 * 365, n))
+    fuentes = [
+        "{" + ",".join(f'"{self.fuentes[i]}"'
+                       for i in sorted(set(elegidas))) + "}"
+        for elegidas in rng.choice(
+            len(self.fuentes), size=(n, 2), p=self.fuente_p)
+    ]
+    perfiles = [
+        ids, ["Sintético"] * n, ids, nacimiento,
+        rng.choice(self.paises, n), ["t"] * n,
+        _montos(ingreso),
+        _montos(ingreso * rng.uniform(0.25, 0.6, n)),
+        _montos(ingreso * rng.uniform(0.1, 0.35, n)),
+        _montos(ingreso * rng.exponential(2, n)),
+        _montos(ingreso * rng.exponential(1.5, n)),
+        _montos(ingreso * rng.uniform(2, 24, n)),
+        rng.choice([6, 12, 24, 36, 60], n),
+        _montos(ingreso * rng.uniform(0.02, 0.25, n)), fuentes
+    ]
+    _copiar(cursor, "perfiles_usuario", _COLUMNAS_PERFIL, *perfiles)
+
+    conteos = self.eventos_por_usuario[inicio:inicio + n]
+    total = int(conteos.sum())
+    usuario = np.repeat(np.arange(n), conteos)
+    es_ingreso = rng.random(total) < PROPORCION_INGRESOS
+    recurrente = rng.random(total) < PROPORCION_RECURRENTES
+    categoria = np.where(es_ingreso,
+                         rng.choice(self.ingreso_ids, total, p=self.ingreso_p),
+                         rng.choice(self.gasto_ids, total, p=self.gasto_p))
+    # Ingresos de ~media mensualidad (pago quincenal); gastos, ~2 % del ingreso
+    fraccion = np.where(es_ingreso, rng.lognormal(np.log(0.5), 0.3, total),
+                        rng.lognormal(np.log(0.02), 0.9, total))
+    dias = self.hoy - rng.integers(0, self.dias, total)
+    # 1970-01-01 fue jueves: (dias + 3) % 7 es el día de la semana desde lunes
+    semana = np.where(recurrente, _fechas(dias - (dias + 3) % 7), "")
+
+    categoria_txt = categoria.astype(str)
+    eventos = [
+        ids[usuario],
+        np.where(es_ingreso, "INGRESO", "GASTO"),
+        np.where(es_ingreso, "", categoria_txt),
+        np.where(es_ingreso, categoria_txt, ""),
+        _montos(ingreso[usuario] * fraccion),
+        _fechas(dias),
+        np.where(recurrente, "f", "t"),
+        semana,
+    ]
+    _copiar(cursor, "eventos_financieros", _COLUMNAS_EVENTO, *eventos)
+    return total
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(
+      description="Genera usuarios, perfiles y eventos sintéticos con COPY.")
+  parser.add_argument("--usuarios", type=int, default=100_000)
+  parser.add_argument("--eventos",
+                      type=int,
+                      default=10_000_000,
+                      help="Eventos financieros en total.")
+  parser.add_argument("--meses",
+                      type=int,
+                      default=24,
+                      help="Meses de historial hacia atrás desde hoy.")
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--chunk-size",
+                      type=int,
+                      default=10_000,
+                      help="Usuarios copiados (y confirmados) por bloque.")
+  parser.add_argument("--password", default="Sintetico-2024!")
+  parser.add_argument("--replace",
+                      action="store_true",
+                      help="Borra antes los usuarios sintéticos existentes.")
+  args = parser.parse_args()
+
+  inicio_total = time.perf_counter()
+  with SessionLocal() as db:
+    if args.replace:
+      db.execute(delete(Usuario).where(Usuario.email.like(EMAIL.format("%"))))
+      db.commit()
+    generador = Generador(db, args)
+
+  eventos = 0
+  conexion = _conexion_copy()
+  try:
+    cursor = conexion.cursor()
+    for inicio in range(0, args.usuarios, args.chunk_size):
+      n = min(args.chunk_size, args.usuarios - inicio)
+      cursor.execute(
+          "SELECT nextval(pg_get_serial_sequence('usuarios', 'id_usuario')) "
+          "FROM generate_series(1, %s)", (n,))
+      ids = np.array([fila[0] for fila in cursor.fetchall()])
+      eventos += generador.bloque(cursor, inicio, ids)
+      conexion.commit()
+      print(
+          f"{inicio + n}/{args.usuarios} usuarios, {eventos} eventos "
+          f"({time.perf_counter() - inicio_total:.0f} s)",
+          file=sys.stderr)
+    cursor.execute("ANALYZE usuarios, perfiles_usuario, eventos_financieros")
+    conexion.commit()
+  finally:
+    conexion.close()
+
+  with SessionLocal() as db:
+    filas = reconstruir(db)
+  print(f"Datos sintéticos generados: {args.usuarios} usuarios, {eventos} "
+        f"eventos; resumen mensual con {filas} filas "
+        f"({time.perf_counter() - inicio_total:.0f} s).")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,70 @@
+"""
+Scores every user profile with the vectorized batch engine and writes one
+CSV row per user (score, status, recommendation flags and base metrics).
+A count per status is printed to stderr at the end.
+
+Usage:
+  python -m api.scripts.health_report [--output FILE] [--chunk-size N]
+"""
+import argparse
+from collections import Counter
+import csv
+import sys
+
+from api.database import SessionLocal
+import api.models  # noqa: F401  (registra todas las tablas en el metadata)
+from api.services.financial_health_batch import iter_profile_batches
+from api.services.financial_health_batch import score_batch
+
+_METRICAS = (
+    "ingreso_mensual",
+    "porcentaje_ahorro",
+    "porcentaje_gastos",
+    "ratio_deuda",
+    "meses_emergencia",
+    "disponible_mensual",
+)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(
+      description="Genera el reporte de salud financiera de todos los usuarios."
+  )
+  parser.add_argument("--output",
+                      default=None,
+                      help="Archivo CSV de salida (por defecto, stdout).")
+  parser.add_argument("--chunk-size",
+                      type=int,
+                      default=50000,
+                      help="Perfiles cargados por lote.")
+  args = parser.parse_args()
+
+  salida = open(args.output, "w", newline="") if args.output else sys.stdout
+  por_estado = Counter()
+  try:
+    writer = csv.writer(salida)
+    writer.writerow(("id_usuario", "score", "status", "recommendation_flags") +
+                    _METRICAS)
+    with SessionLocal() as db:
+      for batch in iter_profile_batches(db, args.chunk_size):
+        result = score_batch(batch)
+        columnas = [
+            result.id_usuario.tolist(),
+            result.score.tolist(),
+            result.status.tolist(),
+            result.recommendation_flags.tolist(),
+        ] + [result.metrics[nombre].tolist() for nombre in _METRICAS]
+        writer.writerows(zip(*columnas))
+        por_estado.update(columnas[2])
+  finally:
+    if salida is not sys.stdout:
+      salida.close()
+
+  total = sum(por_estado.values())
+  print(f"Perfiles evaluados: {total}", file=sys.stderr)
+  for estado, cantidad in por_estado.most_common():
+    print(f"  {estado}: {cantidad}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+  main()
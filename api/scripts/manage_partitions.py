@@ -0,0 +1,74 @@
+"""
+Maintains the monthly partitions of eventos_financieros: pre-creates the
+coming months and, optionally, detaches (or drops) the ones older than the
+retention window. Meant to run on a schedule (e.g. monthly cron).
+
+--particionar converts a database created before partitioning; it locks
+the table for the whole copy.
+
+Usage:
+  python -m api.scripts.manage_partitions [--meses-adelante N]
+      [--desde YYYY-MM] [--retener-meses N [--eliminar]] [--particionar]
+"""
+import argparse
+from datetime import date
+
+from api.database import SessionLocal
+from api.services.partition_service import crear_particiones
+from api.services.partition_service import desconectar_antiguas
+from api.services.partition_service import esta_particionada
+from api.services.partition_service import particionar_tabla
+
+
+def _mes(valor: str) -> date:
+  return date.fromisoformat(f"{valor}-01")
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(
+      description="Administra las particiones mensuales de eventos.")
+  parser.add_argument("--meses-adelante",
+                      type=int,
+                      default=3,
+                      help="Meses futuros con partición ya creada.")
+  parser.add_argument("--desde",
+                      type=_mes,
+                      default=None,
+                      help="Crea también las particiones desde este mes "
+                      "(YYYY-MM), moviendo sus filas fuera de DEFAULT.")
+  parser.add_argument("--retener-meses",
+                      type=int,
+                      default=None,
+                      help="Desconecta las particiones anteriores a los "
+                      "últimos N meses (incluido el actual).")
+  parser.add_argument("--eliminar",
+                      action="store_true",
+                      help="Elimina las particiones desconectadas.")
+  parser.add_argument("--particionar",
+                      action="store_true",
+                      help="Convierte una tabla sin particionar.")
+  args = parser.parse_args()
+  if args.retener_meses is not None and args.retener_meses < 1:
+    parser.error("--retener-meses debe ser al menos 1.")
+  if args.eliminar and args.retener_meses is None:
+    parser.error("--eliminar requiere --retener-meses.")
+
+  with SessionLocal() as db:
+    if not esta_particionada(db):
+      if not args.particionar:
+        parser.error("eventos_financieros no está particionada: "
+                     "ejecute con --particionar.")
+      filas = particionar_tabla(db, args.meses_adelante)
+      print(f"Tabla particionada: {filas} eventos copiados.")
+
+    creadas = crear_particiones(db, args.meses_adelante, args.desde)
+    print(f"Particiones creadas: {', '.join(creadas) or 'ninguna'}.")
+
+    if args.retener_meses is not None:
+      afectadas = desconectar_antiguas(db, args.retener_meses, args.eliminar)
+      accion = "eliminadas" if args.eliminar else "desconectadas"
+      print(f"Particiones {accion}: {', '.join(afectadas) or 'ninguna'}.")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,30 @@
+"""
+Rebuilds the monthly event rollup (resumen_mensual_eventos) from
+eventos_financieros. Creates the table when it does not exist yet.
+
+Usage:
+  python -m api.scripts.rebuild_rollups [--usuario ID_USUARIO]
+"""
+import argparse
+
+from api.database import SessionLocal
+import api.models  # noqa: F401  (registra todas las tablas en el metadata)
+from api.services.rollup_service import reconstruir
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(
+      description="Reconstruye el resumen mensual de eventos financieros.")
+  parser.add_argument("--usuario",
+                      type=int,
+                      default=None,
+                      help="Reconstruye solo el resumen de este id_usuario.")
+  args = parser.parse_args()
+
+  with SessionLocal() as db:
+    filas = reconstruir(db, args.usuario)
+  print(f"Resumen mensual reconstruido: {filas} filas.")
+
+
+if __name__ == "__main__":
+  main()
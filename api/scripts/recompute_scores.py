@@ -0,0 +1,31 @@
+"""
+Recomputes every user's financial health score with the batch engine and
+stores one snapshot per user in historial_score_salud. Meant to run on a
+schedule (e.g. nightly cron); creates the table when it does not exist yet.
+
+Usage:
+  python -m api.scripts.recompute_scores [--chunk-size N]
+"""
+import argparse
+
+from api.database import SessionLocal
+import api.models  # noqa: F401  (registra todas las tablas en el metadata)
+from api.services.score_history_service import recalcular_scores
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(
+      description="Recalcula y registra el puntaje de salud de cada usuario.")
+  parser.add_argument("--chunk-size",
+                      type=int,
+                      default=50000,
+                      help="Perfiles procesados por lote.")
+  args = parser.parse_args()
+
+  with SessionLocal() as db:
+    filas = recalcular_scores(db, args.chunk_size)
+  print(f"Historial de puntajes actualizado: {filas} filas.")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,269 @@
+"""
+Financial Health Batch Engine for MoneyPilot API.
+Vectorized counterpart of analyze_financial_metrics, calculate_health_score
+and generate_recommendations for reports over the whole user base. Profiles
+are loaded in chunks as int64 cent columns and scored in one NumPy pass per
+chunk.
+
+The scalar functions work on Decimal amounts, so every threshold check is
+done exactly on the cents by cross-multiplication instead of comparing
+float ratios, and rows whose score lands on a .5 tie are re-rounded with
+exact integer arithmetic. Scores and recommendation flags therefore match
+the scalar path for any NUMERIC(12, 2) profile; the float metrics in the
+result are only for reporting.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+from decimal import ROUND_HALF_UP
+from typing import Dict, Iterator, Sequence
+
+from api.models.perfil import PerfilUsuario
+import numpy as np
+from sqlalchemy import BigInteger
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# Bit per recommendation category, same checks as generate_recommendations
+FLAG_AHORRO = 1
+FLAG_DEUDA = 2
+FLAG_EMERGENCIA = 4
+FLAG_GASTOS = 8
+FLAG_GENERAL = 16
+
+RECOMMENDATION_FLAGS = {
+    "ahorro": FLAG_AHORRO,
+    "deuda": FLAG_DEUDA,
+    "emergencia": FLAG_EMERGENCIA,
+    "gastos": FLAG_GASTOS,
+    "general": FLAG_GENERAL,
+}
+
+_COLUMNAS = (
+    PerfilUsuario.ingreso_mensual_estimado,
+    PerfilUsuario.gastos_fijos_mensuales,
+    PerfilUsuario.gastos_variables_mensuales,
+    PerfilUsuario.ahorro_planificado_mensual,
+    PerfilUsuario.ahorro_actual,
+    PerfilUsuario.deuda_total,
+)
+
+STATUS_LABELS = np.array(["Necesita Atención", "Regular", "Buena", "Excelente"],
+                         dtype=object)
+
+# Float scores closer than this to a .5 tie are re-rounded exactly
+_TIE_TOLERANCE = 1e-6
+
+
+@dataclass
+class ProfileBatch:
+  """
+  Column arrays for a chunk of profiles. Amounts are int64 cents (NUMERIC(12,
+  2) fits with room for the x100 cross-multiplications); NULL loads as 0.
+  """
+  id_usuario: np.ndarray
+  ingresos: np.ndarray
+  gastos_fijos: np.ndarray
+  gastos_variables: np.ndarray
+  ahorro_planificado: np.ndarray
+  ahorro_actual: np.ndarray
+  deuda_total: np.ndarray
+
+  def __len__(self) -> int:
+    return len(self.id_usuario)
+
+
+@dataclass
+class BatchResult:
+  id_usuario: np.ndarray
+  metrics: Dict[str, np.ndarray]
+  score: np.ndarray
+  status: np.ndarray
+  recommendation_flags: np.ndarray
+
+
+def _safe_divide(numerador: np.ndarray, denominador: np.ndarray) -> np.ndarray:
+  """numerador / denominador as float where denominador > 0, else 0."""
+  return np.divide(numerador,
+                   denominador,
+                   out=np.zeros(numerador.shape, dtype=np.float64),
+                   where=denominador > 0)
+
+
+def _ratio_ge(numerador: np.ndarray, denominador: np.ndarray,
+              umbral: int) -> np.ndarray:
+  """Exact (numerador / denominador) >= umbral; the ratio is 0 when
+  denominador <= 0, like the scalar code."""
+  return np.where(denominador > 0, numerador >= umbral * denominador, 0
+                  >= umbral)
+
+
+def _ratio_le(numerador: np.ndarray, denominador: np.ndarray,
+              umbral: int) -> np.ndarray:
+  """Exact (numerador / denominador) <= umbral, see _ratio_ge."""
+  return np.where(denominador > 0, numerador <= umbral * denominador, 0
+                  <= umbral)
+
+
+def compute_metrics(batch: ProfileBatch) -> Dict[str, np.ndarray]:
+  """Numeric part of analyze_financial_metrics for every profile, as floats
+  in currency units."""
+  ingresos = batch.ingresos
+  gastos_totales = batch.gastos_fijos + batch.gastos_variables
+
+  return {
+      "ingreso_mensual":
+          ingresos / 100,
+      "gastos_fijos_mensuales":
+          batch.gastos_fijos / 100,
+      "gastos_variables_mensuales":
+          batch.gastos_variables / 100,
+      "ahorro_actual":
+          batch.ahorro_actual / 100,
+      "ahorro_planificado_mensual":
+          batch.ahorro_planificado / 100,
+      "deuda_total":
+          batch.deuda_total / 100,
+      "porcentaje_ahorro":
+          _safe_divide(batch.ahorro_planificado * 100, ingresos),
+      "porcentaje_gastos":
+          _safe_divide(gastos_totales * 100, ingresos),
+      "ratio_deuda":
+          _safe_divide(batch.deuda_total, ingresos),
+      "meses_emergencia":
+          _safe_divide(batch.ahorro_actual, gastos_totales),
+      "disponible_mensual": (ingresos - gastos_totales) / 100,
+  }
+
+
+def _round_exact(fijos: int, ahorro_num: int, ahorro_den: int,
+                 emergencia_num: int, emergencia_den: int) -> int:
+  """round() of fijos + ahorro_num/ahorro_den + emergencia_num/emergencia_den
+  with Python ints, half to even like round(Decimal)."""
+  denominador = ahorro_den * emergencia_den
+  numerador = (fijos * denominador + ahorro_num * emergencia_den +
+               emergencia_num * ahorro_den)
+  cociente, resto = divmod(numerador, denominador)
+  if 2 * resto > denominador or (2 * resto == denominador and cociente % 2):
+    cociente += 1
+  return cociente
+
+
+def compute_scores(batch: ProfileBatch) -> np.ndarray:
+  """Vectorized calculate_health_score; returns int64 scores."""
+  ingresos = batch.ingresos
+  gastos_totales = batch.gastos_fijos + batch.gastos_variables
+  ahorro = batch.ahorro_planificado * 100  # porcentaje_ahorro = ahorro / ingresos
+  gastos = gastos_totales * 100  # porcentaje_gastos = gastos / ingresos
+
+  # Savings rate (30 pts); below 10% it earns 2 pts per point of rate
+  ahorro_parcial = ~_ratio_ge(ahorro, ingresos, 10)
+  puntos_ahorro = np.select([
+      _ratio_ge(ahorro, ingresos, 20),
+      _ratio_ge(ahorro, ingresos, 15), ~ahorro_parcial
+  ], [30, 25, 20], 0)
+  # Expense ratio (30 pts)
+  puntos_gastos = np.select([
+      _ratio_le(gastos, ingresos, 70),
+      _ratio_le(gastos, ingresos, 80),
+      _ratio_le(gastos, ingresos, 90)
+  ], [30, 20, 10], 5)
+  # Debt ratio (20 pts)
+  puntos_deuda = np.select([
+      _ratio_le(batch.deuda_total, ingresos, 3),
+      _ratio_le(batch.deuda_total, ingresos, 6),
+      _ratio_le(batch.deuda_total, ingresos, 12)
+  ], [20, 15, 10], 5)
+  # Emergency fund (20 pts); below 1 month it earns 10 pts per month
+  emergencia_parcial = ~_ratio_ge(batch.ahorro_actual, gastos_totales, 1)
+  puntos_emergencia = np.select([
+      _ratio_ge(batch.ahorro_actual, gastos_totales, 6),
+      _ratio_ge(batch.ahorro_actual, gastos_totales, 3), ~emergencia_parcial
+  ], [20, 15, 10], 0)
+
+  fijos = puntos_ahorro + puntos_gastos + puntos_deuda + puntos_emergencia
+  # Partial points as num / den, with den = 1 when the term does not apply
+  ahorro_num = np.where(ahorro_parcial & (ingresos > 0), 2 * ahorro, 0)
+  ahorro_den = np.where(ahorro_parcial & (ingresos > 0), ingresos, 1)
+  emergencia_num = np.where(emergencia_parcial & (gastos_totales > 0),
+                            10 * batch.ahorro_actual, 0)
+  emergencia_den = np.where(emergencia_parcial & (gastos_totales > 0),
+                            gastos_totales, 1)
+
+  score = fijos + ahorro_num / ahorro_den + emergencia_num / emergencia_den
+  resultado = np.round(score).astype(np.int64)
+
+  # Float error can only flip the rounding next to a .5 tie
+  cerca = np.abs(score - np.floor(score) - 0.5) < _TIE_TOLERANCE
+  for i in np.flatnonzero(cerca):
+    resultado[i] = _round_exact(int(fijos[i]), int(ahorro_num[i]),
+                                int(ahorro_den[i]), int(emergencia_num[i]),
+                                int(emergencia_den[i]))
+  return resultado
+
+
+def compute_status(scores: np.ndarray) -> np.ndarray:
+  """Vectorized score_status."""
+  nivel = (scores >= 40).astype(np.intp) + (scores >= 60) + (scores >= 80)
+  return STATUS_LABELS[nivel]
+
+
+def compute_recommendation_flags(batch: ProfileBatch) -> np.ndarray:
+  """Bitmask of the categories generate_recommendations would emit."""
+  ingresos = batch.ingresos
+  gastos_totales = batch.gastos_fijos + batch.gastos_variables
+  flags = np.zeros(len(batch), dtype=np.uint8)
+  flags[~_ratio_ge(batch.ahorro_planificado * 100, ingresos, 20)] |= FLAG_AHORRO
+  flags[~_ratio_le(batch.deuda_total, ingresos, 6)] |= FLAG_DEUDA
+  flags[~_ratio_ge(batch.ahorro_actual, gastos_totales, 3)] |= FLAG_EMERGENCIA
+  flags[~_ratio_le(gastos_totales * 100, ingresos, 80)] |= FLAG_GASTOS
+  flags[flags == 0] = FLAG_GENERAL
+  return flags
+
+
+def score_batch(batch: ProfileBatch) -> BatchResult:
+  metrics = compute_metrics(batch)
+  scores = compute_scores(batch)
+  return BatchResult(id_usuario=batch.id_usuario,
+                     metrics=metrics,
+                     score=scores,
+                     status=compute_status(scores),
+                     recommendation_flags=compute_recommendation_flags(batch))
+
+
+def _centavos(monto) -> int:
+  """Amount in cents, rounded like NUMERIC(12, 2) stores it."""
+  return int((Decimal(str(monto or 0)) * 100).quantize(Decimal(1),
+                                                       ROUND_HALF_UP))
+
+
+def profile_batch(perfiles: Sequence[PerfilUsuario]) -> ProfileBatch:
+  """Batch for profiles already in memory, e.g. one just written."""
+  ids = np.array([perfil.id_usuario for perfil in perfiles], dtype=np.int64)
+  valores = np.array(
+      [[_centavos(getattr(perfil, columna.key))
+        for columna in _COLUMNAS]
+       for perfil in perfiles],
+      dtype=np.int64).reshape(len(perfiles), len(_COLUMNAS))
+  return ProfileBatch(ids, *valores.T)
+
+
+def iter_profile_batches(db: Session,
+                         chunk_size: int = 50000) -> Iterator[ProfileBatch]:
+  """Loads every profile in id_usuario order, chunk_size rows at a time."""
+  columnas = [(func.coalesce(columna, 0) * 100).cast(BigInteger)
+              for columna in _COLUMNAS]
+  ultimo_id = None
+  while True:
+    consulta = select(PerfilUsuario.id_usuario,
+                      *columnas).order_by(PerfilUsuario.id_usuario)
+    if ultimo_id is not None:
+      consulta = consulta.where(PerfilUsuario.id_usuario > ultimo_id)
+    filas = db.execute(consulta.limit(chunk_size)).all()
+    if not filas:
+      return
+
+    ids = np.array([fila[0] for fila in filas], dtype=np.int64)
+    valores = np.array([fila[1:] for fila in filas], dtype=np.int64)
+    yield ProfileBatch(ids, *valores.T)
+    ultimo_id = int(ids[-1])
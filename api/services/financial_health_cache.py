@@ -0,0 +1,95 @@
+"""
+Financial Health Cache for MoneyPilot API.
+Per-user cache of build_summary output. Entries are dropped when a
+transaction that touched the user's PerfilUsuario or EventoFinanciero rows
+commits, and expire after FINANCIAL_HEALTH_CACHE_TTL_SECONDS to bound
+staleness from writes handled by other workers.
+"""
+import itertools
+import threading
+from typing import Any, Optional
+
+from api import config
+from api.cache import LRUCache
+from api.models.evento_financiero import EventoFinanciero
+from api.models.perfil import PerfilUsuario
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_USUARIOS_MODIFICADOS = "financial_health_usuarios_modificados"
+
+
+class SummaryCache:
+  """
+    LRU of summaries keyed by id_usuario. A per-user generation number,
+    bumped on every invalidation, keeps a summary computed from data read
+    before a concurrent write from being stored after that write committed.
+
+    Entries may carry the row versions they were built from (see the
+    summary ETag); readers that pass a version only get a matching entry,
+    which also catches writes committed by other workers.
+    """
+
+  def __init__(self, maxsize: int, ttl_seconds: float):
+    self._summaries = LRUCache(maxsize, ttl_seconds)
+    self._generaciones = {}
+    self._contador = itertools.count(1)
+    self._lock = threading.Lock()
+
+  def get(self, id_usuario: int, version: Any = None) -> Optional[dict]:
+    entrada = self._summaries.get(id_usuario)
+    if entrada is None:
+      return None
+    summary, guardada = entrada
+    if version is not None and guardada != version:
+      return None
+    return summary
+
+  def generacion(self, id_usuario: int) -> int:
+    """Generation to pass to `guardar` once the summary has been built."""
+    return self._generaciones.get(id_usuario, 0)
+
+  def guardar(self,
+              id_usuario: int,
+              summary: dict,
+              generacion: int,
+              version: Any = None) -> None:
+    """Stores the summary unless the user was invalidated meanwhile."""
+    with self._lock:
+      if self._generaciones.get(id_usuario, 0) == generacion:
+        self._summaries.set(id_usuario, (summary, version))
+
+  def invalidar(self, id_usuario: int) -> None:
+    with self._lock:
+      self._generaciones[id_usuario] = next(self._contador)
+      self._summaries.pop(id_usuario)
+
+  def stats(self) -> dict:
+    return self._summaries.stats()
+
+
+summary_cache = SummaryCache(config.settings.FINANCIAL_HEALTH_CACHE_SIZE,
+                             config.settings.FINANCIAL_HEALTH_CACHE_TTL_SECONDS)
+
+
+def marcar_usuario_modificado(session: Session, id_usuario: int) -> None:
+  """Registers a change the flush hook cannot see (e.g. bulk INSERTs)."""
+  session.info.setdefault(_USUARIOS_MODIFICADOS, set()).add(id_usuario)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_cambios(session: Session, flush_context) -> None:
+  for obj in itertools.chain(session.new, session.dirty, session.deleted):
+    if isinstance(obj, (PerfilUsuario, EventoFinanciero)):
+      marcar_usuario_modificado(session, obj.id_usuario)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_modificados(session: Session) -> None:
+  for id_usuario in session.info.pop(_USUARIOS_MODIFICADOS, ()):
+    summary_cache.invalidar(id_usuario)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_modificados(session: Session) -> None:
+  session.info.pop(_USUARIOS_MODIFICADOS, None)
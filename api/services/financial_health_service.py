@@ -2,18 +2,70 @@
 Financial Health Service for MoneyPilot API.
 Contains pure functions for calculating financial health metrics, scores, projections, and recommendations.
 """
+import calendar
+from datetime import date
 from datetime import datetime
 from datetime import timezone
-from typing import List
+from typing import NamedTuple, Optional, Tuple
 
-from api.models.evento_financiero import EventoFinanciero
 from api.models.perfil import PerfilUsuario
 
+# Transaction data the service depends on: totals over the trailing
+# TRANSACTION_WINDOW_MONTHS calendar months, the current one up to today.
+# Callers read it as aggregates (see rollup_service.agregados_por_tipo);
+# raw event rows are never needed.
+TRANSACTION_WINDOW_MONTHS = 3
 
-def analyze_financial_metrics(profile: PerfilUsuario,
-                              transactions: List[EventoFinanciero]) -> dict:
+
+class TransactionAggregates(NamedTuple):
+  """Aggregated EventoFinanciero data for one user over the window."""
+  ingresos: float
+  gastos: float
+  cantidad: int
+  meses: float  # elapsed length of the window, see transaction_window
+
+
+def transaction_window(today: date) -> Tuple[date, float]:
+  """
+    Returns the first day of the transaction window ending at `today` and
+    its elapsed length in months, counting the current month by the
+    fraction of it that has passed.
+    """
+  meses = today.year * 12 + today.month - TRANSACTION_WINDOW_MONTHS
+  desde = date(meses // 12, meses % 12 + 1, 1)
+  dias_mes = calendar.monthrange(today.year, today.month)[1]
+  return desde, TRANSACTION_WINDOW_MONTHS - 1 + today.day / dias_mes
+
+
+def analyze_actual_metrics(
+    transactions: Optional[TransactionAggregates]) -> Optional[dict]:
   """
-    Computes base financial metrics derived from the user's profile.
+    Computes monthly income, expenses and savings rate from the user's
+    recorded events. Returns None when there are no events in the window.
+    """
+  if not transactions or not transactions.cantidad:
+    return None
+  ingresos = transactions.ingresos / transactions.meses
+  gastos = transactions.gastos / transactions.meses
+  ahorro = ingresos - gastos
+
+  return {
+      "ingreso_mensual": ingresos,
+      "gastos_mensuales": gastos,
+      "ahorro_mensual": ahorro,
+      "porcentaje_ahorro": (ahorro / ingresos) * 100 if ingresos > 0 else 0,
+      "porcentaje_gastos": (gastos / ingresos) * 100 if ingresos > 0 else 0,
+      "meses": transactions.meses,
+      "cantidad_eventos": transactions.cantidad,
+  }
+
+
+def analyze_financial_metrics(
+    profile: PerfilUsuario,
+    transactions: Optional[TransactionAggregates] = None) -> dict:
+  """
+    Computes base financial metrics derived from the user's profile, plus
+    the actual ones derived from `transactions` under "metricas_reales".
     """
   ingresos = profile.ingreso_mensual_estimado or 0
   gastos_fijos = profile.gastos_fijos_mensuales or 0
@@ -68,6 +120,7 @@ def analyze_financial_metrics(profile: PerfilUsuario,
       "meses_emergencia": meses_emergencia,
       "disponible_mensual": disponible_mensual,
       "fuentes_ingreso": fuentes_ingreso,
+      "metricas_reales": analyze_actual_metrics(transactions),
   }
 
 
@@ -121,6 +174,27 @@ def calculate_health_score(metrics: dict) -> int:
   return round(score)
 
 
+def score_status(score: int) -> str:
+  """Maps a health score to its status label."""
+  if score >= 80:
+    return "Excelente"
+  if score >= 60:
+    return "Buena"
+  if score >= 40:
+    return "Regular"
+  return "Necesita Atención"
+
+
+def build_score(metrics: dict) -> dict:
+  """Builds a dict shaped like FinancialHealthScore, calculated now."""
+  score = calculate_health_score(metrics)
+  return {
+      "score": score,
+      "status": score_status(score),
+      "calculated_at": datetime.now(timezone.utc)
+  }
+
+
 def project_savings(profile: PerfilUsuario) -> dict:
   """
     Returns a 24-month projection of savings progress toward the goal.
@@ -202,22 +276,16 @@ def generate_recommendations(metrics: dict) -> list[dict]:
 
 
 def build_summary(profile: PerfilUsuario,
-                  transactions: List[EventoFinanciero]) -> dict:
+                  transactions: TransactionAggregates) -> dict:
   """
     Orchestrates all previous functions and builds a dict shaped like FinancialHealthSummary.
     """
   metrics = analyze_financial_metrics(profile, transactions)
-  score = calculate_health_score(metrics)
   projection = project_savings(profile)
   recommendations = generate_recommendations(metrics)
 
   return {
-      "score": {
-          "score": score,
-          "status": ("Excelente" if score >= 80 else "Buena" if score >= 60 else
-                     "Regular" if score >= 40 else "Necesita Atención"),
-          "calculated_at": datetime.now(timezone.utc)
-      },
+      "score": build_score(metrics),
       "metrics": metrics,
       "projection": projection,
       "recommendations": {
@@ -0,0 +1,256 @@
+"""
+Partition Management Service for MoneyPilot API.
+eventos_financieros is range-partitioned by fecha, one partition per month
+(eventos_financieros_YYYY_MM) plus eventos_financieros_default for dates
+outside them. Queries filtered by fecha only scan the matching months, and
+vacuum and index maintenance work per partition. This module pre-creates
+future months, detaches expired ones (kept with an _archivada suffix) and
+converts a pre-partitioning table in place.
+
+Detaching a month also deletes its resumen_mensual_eventos rows, so the
+rollup always describes the attached events only: the API serves the same
+totals before and after rollup_service.reconstruir, and an archived month
+reads as empty everywhere, not as totals without events.
+"""
+from datetime import date
+import re
+from typing import List, NamedTuple, Optional, Set
+
+from api.models.evento_financiero import EventoFinanciero
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+TABLA = EventoFinanciero.__tablename__
+PARTICION_DEFAULT = f"{TABLA}_default"
+
+# Índices de la tabla; creados en la tabla padre, se propagan a cada partición
+_INDICES = (
+    ("idx_eventos_usuario_fecha", "(id_usuario, fecha)"),
+    ("idx_eventos_usuario_tipo", "(id_usuario, tipo)"),
+    ("idx_eventos_semana_inicio", "(semana_inicio)"),
+    ("idx_eventos_recurrentes", "(id_usuario) WHERE es_unico = FALSE"),
+)
+
+_RANGO = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+_MES_DESCONECTADO = re.compile(rf"^{TABLA}_(\d{{4}})_(\d{{2}})(_archivada)?$")
+
+
+class Particion(NamedTuple):
+  nombre: str
+  desde: date  # inclusive, día 1 del mes
+  hasta: date  # exclusive
+
+
+def sumar_meses(mes: date, meses: int) -> date:
+  total = mes.year * 12 + mes.month - 1 + meses
+  return date(total // 12, total % 12 + 1, 1)
+
+
+def nombre_particion(mes: date) -> str:
+  return f"{TABLA}_{mes.year:04d}_{mes.month:02d}"
+
+
+def nombre_archivada(mes: date) -> str:
+  return f"{nombre_particion(mes)}_archivada"
+
+
+def esta_particionada(db: Session) -> bool:
+  relkind = db.scalar(
+      text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:tabla)"),
+      {"tabla": TABLA})
+  return relkind == "p"
+
+
+def listar_particiones(db: Session) -> List[Particion]:
+  """Monthly partitions currently attached, oldest first (without DEFAULT)."""
+  filas = db.execute(
+      text("""
+      SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+      FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+      WHERE i.inhparent = to_regclass(:tabla)
+      """), {"tabla": TABLA})
+  particiones = []
+  for nombre, limites in filas:
+    rango = _RANGO.search(limites)
+    if rango:
+      particiones.append(
+          Particion(nombre, date.fromisoformat(rango.group(1)),
+                    date.fromisoformat(rango.group(2))))
+  return sorted(particiones, key=lambda particion: particion.desde)
+
+
+def meses_desconectados(db: Session) -> Set[date]:
+  """Months whose partition table exists but is detached, archived or left
+    with its partition name by an older detach."""
+  filas = db.scalars(
+      text("""
+      SELECT relname FROM pg_class
+      WHERE relkind = 'r' AND NOT relispartition AND relname LIKE :patron
+      """), {"patron": f"{TABLA}\\_%"})
+  meses = set()
+  for nombre in filas:
+    coincidencia = _MES_DESCONECTADO.match(nombre)
+    if coincidencia:
+      meses.add(date(int(coincidencia.group(1)), int(coincidencia.group(2)), 1))
+  return meses
+
+
+def _crear_particion(db: Session, mes: date) -> None:
+  """Creates the partition for `mes`, moving its rows out of DEFAULT.
+
+    Postgres refuses to create a partition while DEFAULT holds rows in its
+    range, so those rows are moved within the same transaction.
+    """
+  desde, hasta = mes, sumar_meses(mes, 1)
+  rango = {"desde": desde, "hasta": hasta}
+  nombre = nombre_particion(mes)
+  en_default = db.scalar(
+      text(f"SELECT EXISTS (SELECT 1 FROM {PARTICION_DEFAULT} "
+           "WHERE fecha >= :desde AND fecha < :hasta)"), rango)
+  if en_default:
+    db.execute(
+        text(f"ALTER TABLE {TABLA} DETACH PARTITION {PARTICION_DEFAULT}"))
+  db.execute(
+      text(f"CREATE TABLE {nombre} PARTITION OF {TABLA} "
+           f"FOR VALUES FROM ('{desde}') TO ('{hasta}')"))
+  if en_default:
+    db.execute(
+        text(f"""
+        WITH movidas AS (
+          DELETE FROM {PARTICION_DEFAULT}
+          WHERE fecha >= :desde AND fecha < :hasta
+          RETURNING *
+        )
+        INSERT INTO {TABLA} SELECT * FROM movidas
+        """), rango)
+    db.execute(
+        text(f"ALTER TABLE {TABLA} ATTACH PARTITION {PARTICION_DEFAULT} "
+             "DEFAULT"))
+
+
+def crear_particiones(db: Session,
+                      meses_adelante: int,
+                      desde: Optional[date] = None) -> List[str]:
+  """Ensures a partition exists for every month from `desde` (default: the
+    current month) through `meses_adelante` months ahead.
+
+    Months already detached are skipped: their events stay archived and new
+    rows for them land in DEFAULT. Returns the names of the partitions
+    created. Commits.
+    """
+  existentes = {particion.desde for particion in listar_particiones(db)}
+  existentes |= meses_desconectados(db)
+  actual = date.today().replace(day=1)
+  mes = (desde or actual).replace(day=1)
+  ultimo = sumar_meses(actual, meses_adelante)
+  creadas = []
+  while mes <= ultimo:
+    if mes not in existentes:
+      _crear_particion(db, mes)
+      creadas.append(nombre_particion(mes))
+    mes = sumar_meses(mes, 1)
+  db.commit()
+  return creadas
+
+
+def desconectar_antiguas(db: Session,
+                         retener_meses: int,
+                         eliminar: bool = False) -> List[str]:
+  """Detaches the partitions that end before the last `retener_meses`
+    months (current month included).
+
+    Detached partitions stay as standalone tables renamed
+    eventos_financieros_YYYY_MM_archivada, ready to archive, unless
+    `eliminar` drops them. Their months are removed from
+    resumen_mensual_eventos in the same transaction, bumping the events
+    version of the users involved. Returns the affected partition names.
+    Commits.
+    """
+  limite = sumar_meses(date.today().replace(day=1), 1 - retener_meses)
+  afectadas = []
+  for particion in listar_particiones(db):
+    if particion.hasta > limite:
+      break
+    db.execute(text(f"ALTER TABLE {TABLA} DETACH PARTITION {particion.nombre}"))
+    if eliminar:
+      db.execute(text(f"DROP TABLE {particion.nombre}"))
+    else:
+      db.execute(
+          text(f"ALTER TABLE {particion.nombre} "
+               f"RENAME TO {nombre_archivada(particion.desde)}"))
+    db.execute(
+        text("""
+        WITH borradas AS (
+          DELETE FROM resumen_mensual_eventos
+          WHERE mes >= :desde AND mes < :hasta
+          RETURNING id_usuario
+        )
+        UPDATE usuarios SET version_eventos = version_eventos + 1
+        WHERE id_usuario IN (SELECT id_usuario FROM borradas)
+        """), {
+            "desde": particion.desde,
+            "hasta": particion.hasta
+        })
+    afectadas.append(particion.nombre)
+  db.commit()
+  return afectadas
+
+
+def particionar_tabla(db: Session, meses_adelante: int) -> int:
+  """Converts a non-partitioned eventos_financieros into the partitioned
+    layout and returns the number of rows copied. Commits.
+
+    Runs in one transaction holding an ACCESS EXCLUSIVE lock on the table
+    for the whole copy: schedule it in a maintenance window.
+    """
+  antigua = f"{TABLA}_sin_particionar"
+  secuencia = f"{TABLA}_id_evento_seq"
+  db.execute(text(f"LOCK TABLE {TABLA} IN ACCESS EXCLUSIVE MODE"))
+  db.execute(text(f"ALTER TABLE {TABLA} RENAME TO {antigua}"))
+  db.execute(
+      text(f"ALTER TABLE {antigua} RENAME CONSTRAINT {TABLA}_pkey "
+           f"TO {antigua}_pkey"))
+  for indice, _ in _INDICES:
+    db.execute(text(f"DROP INDEX IF EXISTS {indice}"))
+  # Que la secuencia sobreviva al DROP de la tabla antigua
+  db.execute(text(f"ALTER SEQUENCE {secuencia} OWNED BY NONE"))
+
+  db.execute(
+      text(f"""
+      CREATE TABLE {TABLA} (
+        LIKE {antigua} INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+        PRIMARY KEY (id_evento, fecha),
+        FOREIGN KEY (id_usuario) REFERENCES usuarios (id_usuario)
+          ON DELETE CASCADE,
+        FOREIGN KEY (id_categoria_gasto)
+          REFERENCES categorias_gastos (id_categoria_gasto) ON DELETE SET NULL,
+        FOREIGN KEY (id_categoria_ingreso)
+          REFERENCES categorias_ingresos (id_categoria_ingreso)
+          ON DELETE SET NULL
+      ) PARTITION BY RANGE (fecha)
+      """))
+  db.execute(text(f"ALTER SEQUENCE {secuencia} OWNED BY {TABLA}.id_evento"))
+  db.execute(
+      text(f"CREATE TABLE {PARTICION_DEFAULT} PARTITION OF {TABLA} DEFAULT"))
+  primera = db.scalar(text(f"SELECT min(fecha) FROM {antigua}"))
+  ultima = db.scalar(text(f"SELECT max(fecha) FROM {antigua}"))
+  actual = date.today().replace(day=1)
+  mes = min(primera.replace(day=1), actual) if primera else actual
+  fin = sumar_meses(actual, meses_adelante)
+  if ultima is not None:
+    fin = max(fin, ultima.replace(day=1))
+  while mes <= fin:
+    db.execute(
+        text(f"CREATE TABLE {nombre_particion(mes)} PARTITION OF {TABLA} "
+             f"FOR VALUES FROM ('{mes}') TO ('{sumar_meses(mes, 1)}')"))
+    mes = sumar_meses(mes, 1)
+
+  copiadas = db.execute(
+      text(f"INSERT INTO {TABLA} SELECT * FROM {antigua}")).rowcount
+  # Los índices se crean después de copiar: construirlos es más barato
+  # que mantenerlos fila a fila
+  for indice, definicion in _INDICES:
+    db.execute(text(f"CREATE INDEX {indice} ON {TABLA} {definicion}"))
+  db.execute(text(f"DROP TABLE {antigua}"))
+  db.commit()
+  return copiadas
@@ -0,0 +1,156 @@
+"""
+Savings Projection Service for MoneyPilot API.
+Monte Carlo counterpart of project_savings: instead of assuming a constant
+monthly saving, it draws thousands of scenarios of monthly income and
+expenses, with the volatility observed in the user's event history, and
+summarizes the resulting savings balance as percentile bands and
+probabilities of reaching the savings goal.
+
+Every scenario and month is simulated at once as (meses, escenarios)
+float64 arrays; there is no Python loop over scenarios or months. Time and
+memory grow with meses × escenarios, which callers bound (see
+SIMULATION_MAX_CELLS).
+"""
+from datetime import date
+from decimal import Decimal
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+from api.models.perfil import PerfilUsuario
+import numpy as np
+
+# Complete months of event history used to estimate means and volatility
+HISTORY_MONTHS = 12
+# Below this many months the profile estimates are used instead
+MIN_HISTORY_MONTHS = 3
+# Monthly standard deviation, relative to the mean, without enough history
+DEFAULT_VOLATILITY = 0.1
+PERCENTILES = (10, 25, 50, 75, 90)
+# Scenarios drawn when the caller does not ask for a number
+DEFAULT_SCENARIOS = 5000
+
+# (mes, ingresos, gastos) por mes con eventos, como totales_mensuales
+Historial = Sequence[Tuple[date, Decimal, Decimal]]
+
+
+class ProjectionInputs(NamedTuple):
+  """Starting point and monthly distribution of one user's cash flow."""
+  saldo_inicial: float
+  meta: float
+  ingreso_medio: float
+  gasto_medio: float
+  volatilidad_ingreso: float  # monthly standard deviation
+  volatilidad_gasto: float
+  meses_historial: int  # 0 when the profile estimates were used
+
+
+def _indice_mes(mes: date) -> int:
+  return mes.year * 12 + mes.month - 1
+
+
+def _mes(indice: int) -> date:
+  return date(indice // 12, indice % 12 + 1, 1)
+
+
+def history_window(today: date) -> Tuple[date, date]:
+  """First days of the first and last complete month of the history."""
+  actual = _indice_mes(today)
+  desde, hasta = actual - HISTORY_MONTHS, actual - 1
+  return _mes(desde), _mes(hasta)
+
+
+def build_inputs(profile: PerfilUsuario, historial: Historial,
+                 hasta: date) -> ProjectionInputs:
+  """
+    Derives the simulation inputs from the profile and the monthly
+    (mes, ingresos, gastos) totals of the history window ending at `hasta`.
+
+    The history spans from the first month with events through `hasta`, so
+    months without events in between count as zero. With fewer than
+    MIN_HISTORY_MONTHS months the profile estimates are used, with
+    DEFAULT_VOLATILITY.
+    """
+  saldo_inicial = float(profile.ahorro_actual or 0)
+  meta = float(profile.monto_meta_ahorro or 0)
+  meses = 0
+  if historial:
+    primero = min(_indice_mes(mes) for mes, _, _ in historial)
+    meses = _indice_mes(hasta) - primero + 1
+
+  if meses < MIN_HISTORY_MONTHS:
+    ingreso = float(profile.ingreso_mensual_estimado or 0)
+    gasto = float((profile.gastos_fijos_mensuales or 0) +
+                  (profile.gastos_variables_mensuales or 0))
+    return ProjectionInputs(saldo_inicial, meta, ingreso, gasto,
+                            ingreso * DEFAULT_VOLATILITY,
+                            gasto * DEFAULT_VOLATILITY, 0)
+
+  montos = np.zeros((2, meses))
+  for mes, ingresos, gastos in historial:
+    montos[:, _indice_mes(mes) - primero] = float(ingresos), float(gastos)
+  medias = montos.mean(axis=1)
+  desviaciones = montos.std(axis=1, ddof=1)
+  return ProjectionInputs(saldo_inicial, meta, float(medias[0]),
+                          float(medias[1]), float(desviaciones[0]),
+                          float(desviaciones[1]), meses)
+
+
+def simulate_savings(inputs: ProjectionInputs,
+                     meses: int,
+                     escenarios: int,
+                     tasa_anual: float = 0.0,
+                     semilla: Optional[int] = None) -> dict:
+  """
+    Simulates `escenarios` paths of the savings balance over `meses` months.
+
+    Income and expenses are taken as independent normals, so each month's
+    saving (income minus expenses) is drawn from one normal with their
+    combined variance and added to the balance, which grows at
+    `tasa_anual` compounded monthly. Returns a dict shaped like
+    FinancialHealthSimulation: one band per month (0 is the current
+    balance) with the balance percentiles and the probability of having
+    reached the goal by then.
+    """
+  rng = np.random.default_rng(semilla)
+  volatilidad = np.hypot(inputs.volatilidad_ingreso, inputs.volatilidad_gasto)
+  # Filas = meses, columnas = escenarios: cada mes es contiguo en memoria
+  saldos = np.empty((meses + 1, escenarios))
+  saldos[0] = inputs.saldo_inicial
+  ahorro = rng.normal(inputs.ingreso_medio - inputs.gasto_medio, volatilidad,
+                      (meses, escenarios))
+
+  # B_t = g^t * (B_0 + sum_{k<=t} s_k / g^k), con g = 1 + tasa mensual
+  tasa_mensual = (1 + tasa_anual)**(1 / 12) - 1
+  crecimiento = (1 + tasa_mensual)**np.arange(meses + 1)
+  ahorro /= crecimiento[1:, None]
+  np.cumsum(ahorro, axis=0, out=saldos[1:])
+  saldos[1:] += inputs.saldo_inicial
+  saldos *= crecimiento[:, None]
+
+  # Un escenario cuenta como alcanzado desde el primer mes en que llega
+  alcanzada = np.logical_or.accumulate(saldos >= inputs.meta, axis=0)
+  probabilidad = alcanzada.mean(axis=1)
+  mediana = np.flatnonzero(probabilidad >= 0.5)
+
+  # Percentiles con interpolación lineal (como np.percentile) sobre cada
+  # mes ordenado: ordenar es bastante más rápido que np.partition aquí
+  saldos.sort(axis=1)
+  posiciones = np.array(PERCENTILES) / 100 * (escenarios - 1)
+  bajo = np.floor(posiciones).astype(int)
+  alto = np.minimum(bajo + 1, escenarios - 1)
+  fraccion = posiciones - bajo
+  bandas = saldos[:, bajo] + (saldos[:, alto] - saldos[:, bajo]) * fraccion
+
+  columnas = ("mes_index", *(f"p{percentil}" for percentil in PERCENTILES),
+              "probabilidad_meta")
+  filas = zip(range(meses + 1), *bandas.T.tolist(), probabilidad.tolist())
+  return {
+      "bandas": [dict(zip(columnas, fila)) for fila in filas],
+      "meta": inputs.meta,
+      "probabilidad_meta": float(probabilidad[-1]),
+      "meses_para_meta": int(mediana[0]) if len(mediana) else None,
+      "parametros": {
+          **inputs._asdict(),
+          "escenarios": escenarios,
+          "tasa_interes_anual": tasa_anual,
+      },
+  }
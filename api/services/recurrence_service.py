@@ -0,0 +1,96 @@
+"""
+Recurrence Service for MoneyPilot API.
+Expands weekly recurring events (es_unico = false) into their occurrences
+inside a date window. A recurring event repeats every 7 days on the
+weekday of its fecha, starting the week of semana_inicio (the week of
+fecha when unset), with no end date. Occurrences are produced lazily by
+generators and merged with heapq.merge, so a page of results never
+materializes whole series, and window totals are counted arithmetically.
+"""
+from datetime import date
+from datetime import timedelta
+import heapq
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+_SEMANA = timedelta(days=7)
+
+
+def primera_ocurrencia(fecha: date, semana_inicio: Optional[date]) -> date:
+  """First occurrence: fecha's weekday in the week of semana_inicio."""
+  semana = semana_inicio or fecha
+  lunes = semana - timedelta(days=semana.weekday())
+  return lunes + timedelta(days=fecha.weekday())
+
+
+def ocurrencias(fecha: date, semana_inicio: Optional[date], desde: date,
+                hasta: date) -> Iterator[date]:
+  """Yields the occurrences in [desde, hasta], most recent first."""
+  primera = primera_ocurrencia(fecha, semana_inicio)
+  if hasta < primera or hasta < desde:
+    return
+  ultima = hasta - timedelta(days=(hasta - primera).days % 7)
+  limite = max(desde, primera)
+  actual = ultima
+  while actual >= limite:
+    yield actual
+    actual -= _SEMANA
+
+
+def contar_ocurrencias(fecha: date, semana_inicio: Optional[date], desde: date,
+                       hasta: date) -> int:
+  """Number of occurrences in [desde, hasta], without iterating them."""
+  primera = primera_ocurrencia(fecha, semana_inicio)
+  if hasta < primera or hasta < desde:
+    return 0
+  inicio = max(desde, primera)
+  # Primera ocurrencia >= inicio
+  inicio += timedelta(days=-(inicio - primera).days % 7)
+  if inicio > hasta:
+    return 0
+  return (hasta - inicio).days // 7 + 1
+
+
+def _serie(evento: Any, extra: Any, desde: date,
+           hasta: date) -> Iterator[Tuple[date, Any, Any]]:
+  for fecha in ocurrencias(evento.fecha, evento.semana_inicio, desde, hasta):
+    yield fecha, evento, extra
+
+
+def expandir(filas: Iterable[Tuple[Any, Any]], desde: date,
+             hasta: date) -> Iterator[Tuple[date, Any, Any]]:
+  """Merges the occurrences of every (evento, extra) row in the window.
+
+    Yields (fecha, evento, extra) ordered by (fecha, id_evento) descending,
+    the order of the events listing. Each series is a generator, so only
+    one pending occurrence per event is held at a time.
+    """
+  series = [_serie(evento, extra, desde, hasta) for evento, extra in filas]
+  return heapq.merge(*series, key=clave_listado, reverse=True)
+
+
+def clave_listado(item: Tuple[date, Any, Any]) -> Tuple[date, int]:
+  fecha, evento, _ = item
+  return fecha, evento.id_evento
+
+
+def combinar(unicos: Iterable[Tuple[Any, Any]],
+             recurrentes: Iterator[Tuple[date, Any, Any]],
+             antes_de: Optional[Tuple[date, int]] = None,
+             inicio: int = 0,
+             cantidad: Optional[int] = None) -> list:
+  """Merges one-off rows (already in listing order) with expanded
+    occurrences and returns the [inicio, inicio + cantidad) slice.
+
+    `antes_de` is a keyset cursor (fecha, id_evento): only items strictly
+    before it are kept.
+    """
+  items = heapq.merge(
+      ((evento.fecha, evento, extra) for evento, extra in unicos),
+      recurrentes,
+      key=clave_listado,
+      reverse=True)
+  if antes_de is not None:
+    items = (item for item in items if clave_listado(item) < antes_de)
+  fin = None if cantidad is None else inicio + cantidad
+  return list(islice(items, inicio, fin))
@@ -0,0 +1,108 @@
+"""
+Reference Data Service for MoneyPilot API.
+In-process cache of the catalog tables (expense/income categories, income
+sources and Latin American countries), which only change through seed
+scripts or manual SQL. Loaded at startup, reloaded after a TTL and
+refreshable on demand.
+"""
+import asyncio
+from dataclasses import dataclass
+import hashlib
+import time
+from typing import Dict, Optional
+
+from api import config
+from api.database import AsyncSessionLocal
+from api.models.categorias import CategoriaGasto
+from api.models.categorias import CategoriaIngreso
+from api.models.fuentes_ingreso import FuenteIngreso
+from api.models.pais import PaisLatam
+from api.telemetry import outside_query_budget
+from sqlalchemy import select
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+  """Immutable snapshot of the catalog tables."""
+  categorias_gasto: Dict[int, str]  # id_categoria_gasto -> nombre
+  categorias_ingreso: Dict[int, str]  # id_categoria_ingreso -> nombre
+  fuentes_ingreso: Dict[str, int]  # nombre -> id_fuente_ingreso
+  paises: Dict[int, str]  # id_pais -> nombre
+  paises_por_codigo: Dict[str, int]  # codigo -> id_pais
+  version: str  # hash of the contents, for ETags
+  loaded_at: float
+
+
+class ReferenceDataCache:
+  """
+    Holds the current ReferenceData snapshot. Readers get the snapshot
+    without touching the database while it is fresh; a single coroutine
+    reloads it once the TTL expires.
+    """
+
+  def __init__(self, ttl_seconds: int):
+    self._ttl_seconds = ttl_seconds
+    self._data: Optional[ReferenceData] = None
+    self._lock = asyncio.Lock()
+
+  def _is_fresh(self, data: Optional[ReferenceData]) -> bool:
+    return (data is not None and
+            time.monotonic() - data.loaded_at < self._ttl_seconds)
+
+  async def get(self) -> ReferenceData:
+    """Returns the cached snapshot, reloading it first if it is stale."""
+    data = self._data
+    if self._is_fresh(data):
+      return data
+    async with self._lock:
+      # Another coroutine may have reloaded while we waited for the lock
+      if not self._is_fresh(self._data):
+        self._data = await self._load()
+      return self._data
+
+  async def refresh(self) -> ReferenceData:
+    """Reloads the snapshot from the database regardless of its age."""
+    async with self._lock:
+      self._data = await self._load()
+      return self._data
+
+  def invalidate(self) -> None:
+    """Drops the snapshot so the next read reloads it."""
+    self._data = None
+
+  async def _load(self) -> ReferenceData:
+    with outside_query_budget():
+      async with AsyncSessionLocal() as db:
+        gastos = (await db.execute(
+            select(CategoriaGasto.id_categoria_gasto,
+                   CategoriaGasto.nombre).order_by(
+                       CategoriaGasto.id_categoria_gasto))).all()
+        ingresos = (await db.execute(
+            select(CategoriaIngreso.id_categoria_ingreso,
+                   CategoriaIngreso.nombre).order_by(
+                       CategoriaIngreso.id_categoria_ingreso))).all()
+        fuentes = (await db.execute(
+            select(FuenteIngreso.id_fuente_ingreso,
+                   FuenteIngreso.nombre).order_by(
+                       FuenteIngreso.id_fuente_ingreso))).all()
+        paises = (await db.execute(
+            select(PaisLatam.id_pais, PaisLatam.codigo,
+                   PaisLatam.nombre).order_by(PaisLatam.id_pais))).all()
+
+    fuentes_por_nombre = {nombre: id_ for id_, nombre in fuentes}
+    paises_por_id = {id_: nombre for id_, _, nombre in paises}
+    paises_por_codigo = {codigo: id_ for id_, codigo, _ in paises}
+
+    tablas = (gastos, ingresos, fuentes, paises)
+    contenido = repr([[tuple(fila) for fila in filas] for filas in tablas])
+    version = hashlib.blake2b(contenido.encode(), digest_size=8).hexdigest()
+    return ReferenceData(categorias_gasto=dict(gastos),
+                         categorias_ingreso=dict(ingresos),
+                         fuentes_ingreso=fuentes_por_nombre,
+                         paises=paises_por_id,
+                         paises_por_codigo=paises_por_codigo,
+                         version=version,
+                         loaded_at=time.monotonic())
+
+
+reference_data = ReferenceDataCache(config.settings.REFERENCE_DATA_TTL_SECONDS)
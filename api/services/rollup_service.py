@@ -0,0 +1,215 @@
+"""
+Monthly Rollup Service for MoneyPilot API.
+Keeps resumen_mensual_eventos in sync with eventos_financieros by applying
+signed deltas inside the same transaction as each event write, so monthly
+totals read O(months) rows instead of scanning every event. The same write
+bumps usuarios.version_eventos, the row version behind event ETags.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from api.models.evento_financiero import EventoFinanciero
+from api.models.resumen_mensual import ResumenMensualEvento
+from api.models.usuario import Usuario
+from sqlalchemy import func
+from sqlalchemy import literal
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy import union_all
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_Clave = Tuple[int, date, str, int]  # (id_usuario, mes, tipo, id_categoria)
+
+
+def primer_dia_mes(fecha: date) -> date:
+  return fecha.replace(day=1)
+
+
+class RollupDeltas:
+  """Accumulates signed changes to the monthly rollup before writing them."""
+
+  def __init__(self):
+    self._deltas: Dict[_Clave, List] = defaultdict(lambda: [Decimal(0), 0])
+    # Users whose events changed, even when their deltas cancel out
+    self.usuarios: Set[int] = set()
+
+  def agregar(self, id_usuario: int, fecha: date, tipo: str,
+              id_categoria_gasto: Optional[int],
+              id_categoria_ingreso: Optional[int], monto, signo: int) -> None:
+    """Adds (signo=1) or removes (signo=-1) one event from its bucket."""
+    id_categoria = (id_categoria_gasto
+                    if tipo == "GASTO" else id_categoria_ingreso) or 0
+    clave = (id_usuario, primer_dia_mes(fecha), tipo, id_categoria)
+    delta = self._deltas[clave]
+    delta[0] += signo * Decimal(str(monto))
+    delta[1] += signo
+    self.usuarios.add(id_usuario)
+
+  def agregar_evento(self, evento, signo: int) -> None:
+    """Same as agregar, reading the fields from an event-like object."""
+    self.agregar(evento.id_usuario, evento.fecha, evento.tipo,
+                 evento.id_categoria_gasto, evento.id_categoria_ingreso,
+                 evento.monto, signo)
+
+  def filas(self) -> List[dict]:
+    """Non-empty deltas as rows, sorted by key to keep lock order stable."""
+    filas = []
+    for clave, (total, cantidad) in sorted(self._deltas.items()):
+      if not total and not cantidad:
+        continue
+      id_usuario, mes, tipo, id_categoria = clave
+      filas.append({
+          "id_usuario": id_usuario,
+          "mes": mes,
+          "tipo": tipo,
+          "id_categoria": id_categoria,
+          "total": total,
+          "cantidad": cantidad,
+      })
+    return filas
+
+
+async def aplicar_deltas(db: AsyncSession, deltas: RollupDeltas) -> None:
+  """Upserts the accumulated deltas and bumps the events version of every
+    user involved; the caller commits the transaction."""
+  if deltas.usuarios:
+    usuarios = sorted(deltas.usuarios)
+    version = update(Usuario).where(Usuario.id_usuario.in_(usuarios)).values(
+        version_eventos=Usuario.version_eventos + 1)
+    await db.execute(version.execution_options(synchronize_session=False))
+  filas = deltas.filas()
+  if not filas:
+    return
+  stmt = insert(ResumenMensualEvento).values(filas)
+  stmt = stmt.on_conflict_do_update(
+      index_elements=["id_usuario", "mes", "tipo", "id_categoria"],
+      set_={
+          "total": ResumenMensualEvento.total + stmt.excluded.total,
+          "cantidad": ResumenMensualEvento.cantidad + stmt.excluded.cantidad,
+      })
+  await db.execute(stmt)
+
+
+async def totales_por_tipo(db: AsyncSession, id_usuario: int, desde: date,
+                           hasta: date) -> Tuple[Decimal, Decimal]:
+  """Returns (total_gastos, total_ingresos) for the months in [desde, hasta]."""
+  suma_gastos = func.sum(
+      ResumenMensualEvento.total).filter(ResumenMensualEvento.tipo == "GASTO")
+  suma_ingresos = func.sum(
+      ResumenMensualEvento.total).filter(ResumenMensualEvento.tipo == "INGRESO")
+  totales = select(func.coalesce(suma_gastos, 0),
+                   func.coalesce(suma_ingresos, 0)).where(
+                       ResumenMensualEvento.id_usuario == id_usuario,
+                       ResumenMensualEvento.mes.between(primer_dia_mes(desde),
+                                                        primer_dia_mes(hasta)))
+  return tuple((await db.execute(totales)).one())
+
+
+async def agregados_por_tipo(db: AsyncSession, id_usuario: int, desde: date,
+                             hasta: date) -> Tuple[Decimal, Decimal, int]:
+  """Returns (total_gastos, total_ingresos, cantidad) for the events dated
+    from `desde` (first day of a month) through `hasta`, inclusive.
+
+    Complete months come from the rollup. The month of `hasta` is read from
+    eventos_financieros up to that day, so events scheduled later in the
+    month are left out; the index on (id_usuario, fecha) keeps that to one
+    month of one user's rows. One statement.
+    """
+  ultimo_mes = primer_dia_mes(hasta)
+  resumen = select(ResumenMensualEvento.tipo,
+                   ResumenMensualEvento.total.label("total"),
+                   ResumenMensualEvento.cantidad.label("cantidad")).where(
+                       ResumenMensualEvento.id_usuario == id_usuario,
+                       ResumenMensualEvento.mes >= primer_dia_mes(desde),
+                       ResumenMensualEvento.mes < ultimo_mes)
+  eventos = select(EventoFinanciero.tipo, EventoFinanciero.monto,
+                   literal(1)).where(EventoFinanciero.id_usuario == id_usuario,
+                                     EventoFinanciero.fecha >= ultimo_mes,
+                                     EventoFinanciero.fecha <= hasta)
+  filas = union_all(resumen, eventos).subquery()
+  suma_gastos = func.sum(filas.c.total).filter(filas.c.tipo == "GASTO")
+  suma_ingresos = func.sum(filas.c.total).filter(filas.c.tipo == "INGRESO")
+  agregados = select(func.coalesce(suma_gastos, 0),
+                     func.coalesce(suma_ingresos, 0),
+                     func.coalesce(func.sum(filas.c.cantidad), 0))
+  return tuple((await db.execute(agregados)).one())
+
+
+async def totales_mensuales(db: AsyncSession, id_usuario: int, desde: date,
+                            hasta: date) -> List[Tuple[date, Decimal, Decimal]]:
+  """Returns (mes, total_ingresos, total_gastos) for each month in
+    [desde, hasta] with events, oldest first."""
+  suma_ingresos = func.sum(
+      ResumenMensualEvento.total).filter(ResumenMensualEvento.tipo == "INGRESO")
+  suma_gastos = func.sum(
+      ResumenMensualEvento.total).filter(ResumenMensualEvento.tipo == "GASTO")
+  ingresos = func.coalesce(suma_ingresos, 0)
+  gastos = func.coalesce(suma_gastos, 0)
+  mes = ResumenMensualEvento.mes
+  consulta = select(mes, ingresos, gastos).where(
+      ResumenMensualEvento.id_usuario == id_usuario,
+      mes.between(primer_dia_mes(desde),
+                  primer_dia_mes(hasta))).group_by(mes).having(
+                      func.sum(ResumenMensualEvento.cantidad) > 0).order_by(mes)
+  return [tuple(fila) for fila in await db.execute(consulta)]
+
+
+async def version_eventos(db: AsyncSession, id_usuario: int) -> Optional[int]:
+  """The user's events version, or None if the user does not exist."""
+  return await db.scalar(
+      select(Usuario.version_eventos).where(Usuario.id_usuario == id_usuario))
+
+
+async def resumen_por_mes(db: AsyncSession, id_usuario: int, desde: date,
+                          hasta: date) -> List[ResumenMensualEvento]:
+  """Returns the non-empty rollup rows for the months in [desde, hasta]."""
+  consulta = select(ResumenMensualEvento).where(
+      ResumenMensualEvento.id_usuario == id_usuario,
+      ResumenMensualEvento.mes.between(primer_dia_mes(desde),
+                                       primer_dia_mes(hasta)),
+      ResumenMensualEvento.cantidad
+      > 0).order_by(ResumenMensualEvento.mes, ResumenMensualEvento.tipo,
+                    ResumenMensualEvento.id_categoria)
+  return list(await db.scalars(consulta))
+
+
+def reconstruir(db: Session, id_usuario: Optional[int] = None) -> int:
+  """Rebuilds the rollup from eventos_financieros and returns its row count.
+
+    Takes an EXCLUSIVE lock on the rollup so concurrent event writes wait
+    and then apply their deltas on top of the rebuilt totals. Also bumps the
+    users' events version, since their events may have been edited by hand.
+    Only attached partitions are read, matching the rollup that
+    partition_service.desconectar_antiguas leaves behind.
+    """
+  ResumenMensualEvento.__table__.create(db.get_bind(), checkfirst=True)
+  db.execute(text("LOCK TABLE resumen_mensual_eventos IN EXCLUSIVE MODE"))
+
+  filtro = "WHERE id_usuario = :id_usuario" if id_usuario else ""
+  params = {"id_usuario": id_usuario} if id_usuario else {}
+  db.execute(text(f"DELETE FROM resumen_mensual_eventos {filtro}"), params)
+  resultado = db.execute(
+      text(f"""
+      INSERT INTO resumen_mensual_eventos
+        (id_usuario, mes, tipo, id_categoria, total, cantidad)
+      SELECT id_usuario,
+             date_trunc('month', fecha)::date,
+             tipo,
+             COALESCE(CASE WHEN tipo = 'GASTO' THEN id_categoria_gasto
+                           ELSE id_categoria_ingreso END, 0),
+             SUM(monto),
+             COUNT(*)
+      FROM {EventoFinanciero.__tablename__}
+      {filtro}
+      GROUP BY 1, 2, 3, 4
+      """), params)
+  db.execute(
+      text("UPDATE usuarios SET version_eventos = version_eventos + 1 "
+           f"{filtro}"), params)
+  db.commit()
+  return resultado.rowcount
@@ -0,0 +1,110 @@
+"""
+Score History Service for MoneyPilot API.
+Stores financial health score snapshots in historial_score_salud so score
+reads are a single indexed lookup on (id_usuario, calculated_at) and trend
+charts read past snapshots instead of recomputing past states.
+
+Every snapshot, whether written on a profile change or by the recompute
+job, is scored by the batch engine, so two snapshots of an unchanged
+profile always agree.
+"""
+from datetime import datetime
+from datetime import timezone
+from typing import List, Optional
+
+from api.models.historial_score import HistorialScoreSalud
+from api.models.perfil import PerfilUsuario
+from api.services.financial_health_batch import iter_profile_batches
+from api.services.financial_health_batch import profile_batch
+from api.services.financial_health_batch import score_batch
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def _con_zona(momento: Optional[datetime]) -> Optional[datetime]:
+  """Naive datetimes are taken as UTC, like calculated_at."""
+  if momento is not None and momento.tzinfo is None:
+    return momento.replace(tzinfo=timezone.utc)
+  return momento
+
+
+def registrar_score(db, id_usuario: int, score: dict) -> HistorialScoreSalud:
+  """Adds a snapshot built from a FinancialHealthScore-shaped dict.
+
+    Works with sync and async sessions; the caller commits.
+    """
+  snapshot = HistorialScoreSalud(id_usuario=id_usuario, **score)
+  db.add(snapshot)
+  return snapshot
+
+
+def registrar_score_perfil(db, profile: PerfilUsuario) -> HistorialScoreSalud:
+  """Scores the profile as it is now and adds the snapshot."""
+  result = score_batch(profile_batch([profile]))
+  return registrar_score(
+      db, profile.id_usuario, {
+          "score": int(result.score[0]),
+          "status": str(result.status[0]),
+          "calculated_at": datetime.now(timezone.utc),
+      })
+
+
+async def ultimo_score(
+    db: AsyncSession,
+    id_usuario: int,
+    as_of: Optional[datetime] = None) -> Optional[HistorialScoreSalud]:
+  """Latest snapshot, or the latest one calculated at or before as_of."""
+  consulta = select(HistorialScoreSalud).where(
+      HistorialScoreSalud.id_usuario == id_usuario)
+  if as_of is not None:
+    consulta = consulta.where(
+        HistorialScoreSalud.calculated_at <= _con_zona(as_of))
+  consulta = consulta.order_by(HistorialScoreSalud.calculated_at.desc(),
+                               HistorialScoreSalud.id_historial.desc())
+  return await db.scalar(consulta.limit(1))
+
+
+async def historial_scores(db: AsyncSession,
+                           id_usuario: int,
+                           desde: Optional[datetime] = None,
+                           hasta: Optional[datetime] = None,
+                           limit: int = 100) -> List[HistorialScoreSalud]:
+  """Snapshots in [desde, hasta], newest first."""
+  consulta = select(HistorialScoreSalud).where(
+      HistorialScoreSalud.id_usuario == id_usuario)
+  if desde is not None:
+    consulta = consulta.where(
+        HistorialScoreSalud.calculated_at >= _con_zona(desde))
+  if hasta is not None:
+    consulta = consulta.where(
+        HistorialScoreSalud.calculated_at <= _con_zona(hasta))
+  consulta = consulta.order_by(HistorialScoreSalud.calculated_at.desc(),
+                               HistorialScoreSalud.id_historial.desc())
+  return list(await db.scalars(consulta.limit(limit)))
+
+
+def recalcular_scores(db: Session, chunk_size: int = 50000) -> int:
+  """Snapshots every profile with the batch engine; returns rows written.
+
+    All snapshots of a run share the same calculated_at. Commits per chunk,
+    so an interrupted run keeps the chunks already written.
+    """
+  HistorialScoreSalud.__table__.create(db.get_bind(), checkfirst=True)
+  calculated_at = datetime.now(timezone.utc)
+  total = 0
+  for batch in iter_profile_batches(db, chunk_size):
+    result = score_batch(batch)
+    columnas = zip(result.id_usuario.tolist(), result.score.tolist(),
+                   result.status.tolist())
+    filas = [{
+        "id_usuario": id_usuario,
+        "score": score,
+        "status": estado,
+        "calculated_at": calculated_at,
+    } for id_usuario, score, estado in columnas]
+    db.execute(insert(HistorialScoreSalud), filas)
+    db.commit()
+    total += len(filas)
+  return total
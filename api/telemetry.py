@@ -0,0 +1,234 @@
+"""
+Telemetry primitives for MoneyPilot API.
+Small thread-safe counters, gauges and histograms used to expose runtime
+statistics without pulling in an external metrics client, plus the
+per-request context the HTTP and SQL instrumentation share and a renderer
+for the Prometheus text exposition format.
+"""
+import bisect
+from collections import defaultdict
+import contextlib
+import contextvars
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds (seconds) suited for DB checkouts and HTTP request latencies
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                           2.5, 5.0, 10.0)
+
+# Upper bounds for the number of SQL statements issued by one request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Counter:
+  """Monotonic counter."""
+
+  def __init__(self):
+    self._value = 0
+    self._lock = threading.Lock()
+
+  def inc(self, amount: float = 1) -> None:
+    with self._lock:
+      self._value += amount
+
+  @property
+  def value(self) -> float:
+    return self._value
+
+
+class Gauge:
+  """Value that can go up and down."""
+
+  def __init__(self):
+    self._value = 0
+    self._lock = threading.Lock()
+
+  def inc(self, amount: float = 1) -> None:
+    with self._lock:
+      self._value += amount
+
+  def dec(self, amount: float = 1) -> None:
+    with self._lock:
+      self._value -= amount
+
+  @property
+  def value(self) -> float:
+    return self._value
+
+
+class Histogram:
+  """Cumulative histogram with fixed upper bounds (Prometheus semantics)."""
+
+  def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+    self.buckets = tuple(sorted(buckets))
+    self._counts = [0] * (len(self.buckets) + 1)
+    self._sum = 0.0
+    self._lock = threading.Lock()
+
+  def observe(self, value: float) -> None:
+    index = bisect.bisect_left(self.buckets, value)
+    with self._lock:
+      self._counts[index] += 1
+      self._sum += value
+
+  def snapshot(self) -> dict:
+    """Returns cumulative bucket counts keyed by upper bound, sum and count."""
+    with self._lock:
+      counts = list(self._counts)
+      total_sum = self._sum
+
+    buckets = {}
+    cumulative = 0
+    for bound, count in zip(self.buckets, counts):
+      cumulative += count
+      buckets[str(bound)] = cumulative
+    cumulative += counts[-1]
+    buckets["+Inf"] = cumulative
+
+    return {"buckets": buckets, "sum": total_sum, "count": cumulative}
+
+
+class RequestStats:
+  """Work done on behalf of the HTTP request being served."""
+
+  def __init__(self, scope: Optional[dict] = None):
+    self.scope = scope or {}
+    self.queries = 0
+    self.db_seconds = 0.0
+    # Maximum SQL statements declared by the route (see query_budget) and
+    # the statements charged to it, i.e. issued outside cache loaders
+    self.query_budget: Optional[int] = None
+    self.budgeted_queries = 0
+
+  @property
+  def route(self) -> str:
+    """Route template once routing has run, else the raw path."""
+    route = getattr(self.scope.get("route"), "path", None)
+    return route or self.scope.get("path", "<sin ruta>")
+
+
+# Stats of the request handled by the current task, set by MetricsMiddleware
+current_request: contextvars.ContextVar[
+    Optional[RequestStats]] = contextvars.ContextVar("current_request",
+                                                     default=None)
+
+# False while a cache loader runs (see outside_query_budget)
+charge_query_budget: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "charge_query_budget", default=True)
+
+
+@contextlib.contextmanager
+def outside_query_budget():
+  """Statements issued inside the block are not charged to the budget.
+
+    For shared cache loaders, which run or not depending on the cache state
+    (cold worker, TTL expiry) rather than on the route: budgets are sized
+    for the warm path. The statements still count in the route metrics.
+    """
+  token = charge_query_budget.set(False)
+  try:
+    yield
+  finally:
+    charge_query_budget.reset(token)
+
+
+class HttpMetrics:
+  """Per-route request counters and latency / query-count histograms."""
+
+  def __init__(self):
+    self.in_progress = Gauge()
+    self._responses: Dict[Tuple[str, str, int], int] = defaultdict(int)
+    self._latency: Dict[Tuple[str, str], Histogram] = {}
+    self._queries: Dict[Tuple[str, str], Histogram] = {}
+    self._db_seconds: Dict[Tuple[str, str], Histogram] = {}
+    self._lock = threading.Lock()
+
+  def observe(self, method: str, route: str, status: int, seconds: float,
+              stats: RequestStats) -> None:
+    key = (method, route)
+    with self._lock:
+      self._responses[(method, route, status)] += 1
+      if key not in self._latency:
+        self._latency[key] = Histogram()
+        self._queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+        self._db_seconds[key] = Histogram()
+    self._latency[key].observe(seconds)
+    self._queries[key].observe(stats.queries)
+    self._db_seconds[key].observe(stats.db_seconds)
+
+  def render(self) -> List[str]:
+    """Prometheus text lines for every metric in this registry."""
+    with self._lock:
+      responses = sorted(self._responses.items())
+      latency = sorted(self._latency.items())
+      queries = sorted(self._queries.items())
+      db_seconds = sorted(self._db_seconds.items())
+
+    lines = [
+        "# HELP http_requests_in_progress Requests being served.",
+        "# TYPE http_requests_in_progress gauge",
+        f"http_requests_in_progress {self.in_progress.value}",
+        "# HELP http_requests_total Responses by route and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), count in responses:
+      labels = {"method": method, "route": route, "status": str(status)}
+      lines.append(f"http_requests_total{format_labels(labels)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), histogram in latency:
+      lines += format_histogram("http_request_duration_seconds", {
+          "method": method,
+          "route": route
+      }, histogram.snapshot())
+
+    lines += [
+        "# HELP http_request_db_queries SQL statements issued per request.",
+        "# TYPE http_request_db_queries histogram",
+    ]
+    for (method, route), histogram in queries:
+      lines += format_histogram("http_request_db_queries", {
+          "method": method,
+          "route": route
+      }, histogram.snapshot())
+
+    lines += [
+        "# HELP http_request_db_seconds Time spent in SQL per request.",
+        "# TYPE http_request_db_seconds histogram",
+    ]
+    for (method, route), histogram in db_seconds:
+      lines += format_histogram("http_request_db_seconds", {
+          "method": method,
+          "route": route
+      }, histogram.snapshot())
+    return lines
+
+
+http_metrics = HttpMetrics()
+
+
+def _escape(value: str) -> str:
+  return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+  if not labels:
+    return ""
+  pairs = ",".join(
+      f'{name}="{_escape(value)}"' for name, value in labels.items())
+  return "{" + pairs + "}"
+
+
+def format_histogram(name: str, labels: Dict[str, str],
+                     snapshot: dict) -> List[str]:
+  """Prometheus lines for a Histogram.snapshot()."""
+  lines = []
+  for bound, count in snapshot["buckets"].items():
+    bucket_labels = {**labels, "le": bound}
+    lines.append(f"{name}_bucket{format_labels(bucket_labels)} {count}")
+  lines.append(f"{name}_sum{format_labels(labels)} {snapshot['sum']}")
+  lines.append(f"{name}_count{format_labels(labels)} {snapshot['count']}")
+  return lines
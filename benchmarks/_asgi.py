@@ -0,0 +1,41 @@
+"""In-process ASGI driver shared by the micro-benchmarks."""
+import time
+from typing import List, Optional, Tuple
+
+
+async def _receive():
+  return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+  pass
+
+
+async def run_requests(
+    app,
+    requests: int,
+    path: str = "/",
+    headers: Optional[List[Tuple[bytes, bytes]]] = None,
+    client: Tuple[str, int] = ("127.0.0.1", 51000)
+) -> float:
+  """Seconds taken to serve `requests` sequential GET calls to path."""
+  start = time.perf_counter()
+  for _ in range(requests):
+    scope = {
+        "type": "http",
+        "asgi": {
+            "version": "3.0"
+        },
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": list(headers or []),
+        "client": client,
+        "server": ("127.0.0.1", 8000),
+    }
+    await app(scope, _receive, _send)
+  return time.perf_counter() - start
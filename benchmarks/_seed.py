@@ -0,0 +1,133 @@
+"""
+Synthetic users, financial profiles and events for the load test.
+
+Every run replaces the previous load-test users (emails
+loadtest+N@moneypilot.local, removed with ON DELETE CASCADE) so results do
+not depend on earlier runs. All of them share PASSWORD.
+"""
+from dataclasses import dataclass
+from datetime import date
+from datetime import timedelta
+import random
+from typing import List
+
+from api.auth.hashing import hash_password
+from api.models.categorias import CategoriaGasto
+from api.models.categorias import CategoriaIngreso
+from api.models.evento_financiero import EventoFinanciero
+from api.models.pais import PaisLatam
+from api.models.perfil import PerfilUsuario
+from api.models.usuario import Usuario
+from api.services.rollup_service import reconstruir
+from sqlalchemy import delete
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+EMAIL = "loadtest+{}@moneypilot.local"
+PASSWORD = "LoadTest-2024!"
+DIAS_HISTORIAL = 180
+
+
+@dataclass(frozen=True)
+class Catalogo:
+  """Ids de categorías válidos para crear eventos."""
+  categorias_gasto: List[int]
+  categorias_ingreso: List[int]
+
+
+def leer_catalogo(db: Session) -> Catalogo:
+  gasto = db.scalars(select(CategoriaGasto.id_categoria_gasto))
+  ingreso = db.scalars(select(CategoriaIngreso.id_categoria_ingreso))
+  return Catalogo(categorias_gasto=list(gasto),
+                  categorias_ingreso=list(ingreso))
+
+
+def usuarios_existentes(db: Session) -> List[str]:
+  """Emails de los usuarios sembrados por una ejecución anterior."""
+  consulta = select(Usuario.email).where(Usuario.email.like(
+      EMAIL.format("%"))).order_by(Usuario.id_usuario)
+  return list(db.scalars(consulta))
+
+
+def evento_aleatorio(rng: random.Random, catalogo: Catalogo,
+                     fecha: date) -> dict:
+  """Columnas de un evento; uno de cada cuatro es un ingreso."""
+  if rng.random() < 0.25:
+    return {
+        "tipo": "INGRESO",
+        "id_categoria_gasto": None,
+        "id_categoria_ingreso": rng.choice(catalogo.categorias_ingreso),
+        "monto": round(rng.uniform(200_000, 3_000_000), 2),
+        "fecha": fecha,
+        "descripcion": "Ingreso de prueba de carga",
+    }
+  return {
+      "tipo": "GASTO",
+      "id_categoria_gasto": rng.choice(catalogo.categorias_gasto),
+      "id_categoria_ingreso": None,
+      "monto": round(rng.uniform(5_000, 400_000), 2),
+      "fecha": fecha,
+      "descripcion": "Gasto de prueba de carga",
+  }
+
+
+def _perfil(rng: random.Random, id_usuario: int, paises: List[int]) -> dict:
+  ingreso = round(rng.uniform(1_500_000, 9_000_000), 2)
+  return {
+      "id_usuario": id_usuario,
+      "nombre": "Carga",
+      "apellido": str(id_usuario),
+      "id_pais_residencia": rng.choice(paises),
+      "acepta_terminos": True,
+      "ingreso_mensual_estimado": ingreso,
+      "gastos_fijos_mensuales": round(ingreso * rng.uniform(0.3, 0.6), 2),
+      "gastos_variables_mensuales": round(ingreso * rng.uniform(0.1, 0.3), 2),
+      "ahorro_actual": round(ingreso * rng.uniform(0, 6), 2),
+      "deuda_total": round(ingreso * rng.uniform(0, 4), 2),
+      "monto_meta_ahorro": round(ingreso * rng.uniform(2, 12), 2),
+      "plazo_meta_ahorro_meses": rng.choice((6, 12, 24, 36)),
+      "ahorro_planificado_mensual": round(ingreso * rng.uniform(0.05, 0.2), 2),
+  }
+
+
+def sembrar(db: Session, usuarios: int, eventos_por_usuario: int,
+            semilla: int) -> List[str]:
+  """Recrea los usuarios de la prueba de carga y devuelve sus emails.
+
+    Cada usuario tiene perfil financiero y eventos repartidos en los últimos
+    DIAS_HISTORIAL días; el resumen mensual se reconstruye al final.
+    """
+  rng = random.Random(semilla)
+  catalogo = leer_catalogo(db)
+  paises = list(db.scalars(select(PaisLatam.id_pais)))
+
+  db.execute(delete(Usuario).where(Usuario.email.like(EMAIL.format("%"))))
+
+  # Argon2 es caro: todos los usuarios comparten el mismo hash
+  password_hash = hash_password(PASSWORD)
+  emails = [EMAIL.format(i) for i in range(usuarios)]
+  filas = [{"email": email, "password_hash": password_hash} for email in emails]
+  insertar = insert(Usuario).returning(Usuario.id_usuario,
+                                       sort_by_parameter_order=True)
+  ids = list(db.scalars(insertar, filas))
+
+  db.execute(insert(PerfilUsuario),
+             [_perfil(rng, id_usuario, paises) for id_usuario in ids])
+
+  hoy = date.today()
+  eventos = []
+  for id_usuario in ids:
+    for _ in range(eventos_por_usuario):
+      fecha = hoy - timedelta(days=rng.randrange(DIAS_HISTORIAL))
+      eventos.append({
+          "id_usuario": id_usuario,
+          **evento_aleatorio(rng, catalogo, fecha)
+      })
+  if eventos:
+    db.execute(insert(EventoFinanciero), eventos)
+  db.commit()
+
+  for id_usuario in ids:
+    reconstruir(db, id_usuario)
+  return emails
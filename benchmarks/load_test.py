@@ -0,0 +1,350 @@
+"""
+End-to-end load test of the API over HTTP.
+
+Seeds synthetic users (benchmarks/_seed.py), boots api.main:app with
+uvicorn (or targets an already running server with --base-url) and drives
+a weighted mix of requests from concurrent virtual users for a fixed time.
+Reports p50/p95/p99 latency and throughput per operation. --output saves
+the results as JSON; --baseline compares against a saved run and exits
+with status 1 when an operation regressed beyond --tolerance.
+
+Needs DATABASE_URL pointing to a Postgres with init-scripts/ applied; the
+seeding writes to it.
+
+Usage:
+  python -m benchmarks.load_test [--mix dashboard] [--concurrency C]
+      [--duration S] [--warmup S] [--usuarios N] [--eventos-por-usuario N]
+      [--skip-seed] [--base-url URL] [--workers W]
+      [--output FILE] [--baseline FILE] [--tolerance T]
+"""
+import argparse
+import asyncio
+from collections import Counter
+from collections import defaultdict
+import contextlib
+from dataclasses import dataclass
+from datetime import date
+from datetime import datetime
+from datetime import timezone
+import json
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from api.database import SessionLocal
+import httpx
+import numpy as np
+
+from benchmarks._seed import Catalogo
+from benchmarks._seed import evento_aleatorio
+from benchmarks._seed import leer_catalogo
+from benchmarks._seed import PASSWORD
+from benchmarks._seed import sembrar
+from benchmarks._seed import usuarios_existentes
+
+
+@dataclass
+class UsuarioVirtual:
+  email: str
+  headers: dict
+  rng: random.Random
+
+
+async def _login(client: httpx.AsyncClient, usuario: UsuarioVirtual,
+                 catalogo: Catalogo) -> httpx.Response:
+  return await client.post("/auth/login",
+                           data={
+                               "username": usuario.email,
+                               "password": PASSWORD
+                           })
+
+
+async def _resumen(client: httpx.AsyncClient, usuario: UsuarioVirtual,
+                   catalogo: Catalogo) -> httpx.Response:
+  return await client.get("/financial_health/summary", headers=usuario.headers)
+
+
+async def _listar_eventos(client: httpx.AsyncClient, usuario: UsuarioVirtual,
+                          catalogo: Catalogo) -> httpx.Response:
+  # Sin rango de fechas: el mes en curso, como la pantalla de movimientos
+  return await client.get("/eventos_financieros/", headers=usuario.headers)
+
+
+async def _crear_evento(client: httpx.AsyncClient, usuario: UsuarioVirtual,
+                        catalogo: Catalogo) -> httpx.Response:
+  evento = evento_aleatorio(usuario.rng, catalogo, date.today())
+  evento["fecha"] = evento["fecha"].isoformat()
+  return await client.post("/eventos_financieros/",
+                           headers=usuario.headers,
+                           json=evento)
+
+
+# nombre -> (petición, código HTTP esperado)
+OPERACIONES = {
+    "login": (_login, 200),
+    "summary": (_resumen, 200),
+    "eventos": (_listar_eventos, 200),
+    "crear_evento": (_crear_evento, 201),
+}
+
+# Pesos relativos de cada operación
+MEZCLAS: Dict[str, Dict[str, int]] = {
+    "dashboard": {
+        "summary": 45,
+        "eventos": 40,
+        "crear_evento": 10,
+        "login": 5
+    },
+    "escritura": {
+        "crear_evento": 60,
+        "eventos": 25,
+        "summary": 15
+    },
+    "login": {
+        "login": 100
+    },
+}
+
+
+def _puerto_libre() -> int:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def _servidor(workers: int):
+  """Arranca api.main:app con uvicorn y devuelve su URL cuando responde."""
+  puerto = _puerto_libre()
+  url = f"http://127.0.0.1:{puerto}"
+  comando = [
+      sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1",
+      "--port", f"{puerto}", "--workers", f"{workers}", "--no-access-log",
+      "--log-level", "warning"
+  ]
+  proceso = subprocess.Popen(comando)
+  try:
+    limite = time.monotonic() + 30
+    while True:
+      if proceso.poll() is not None:
+        raise RuntimeError("uvicorn terminó antes de aceptar conexiones.")
+      try:
+        httpx.get(url + "/", timeout=1).raise_for_status()
+        break
+      except httpx.HTTPError:
+        if time.monotonic() > limite:
+          raise RuntimeError("uvicorn no respondió en 30 s.")
+        time.sleep(0.2)
+    yield url
+  finally:
+    proceso.terminate()
+    proceso.wait(timeout=30)
+
+
+async def _ejecutar_usuario(client: httpx.AsyncClient, usuario: UsuarioVirtual,
+                            mezcla: Dict[str, int], catalogo: Catalogo,
+                            medir_desde: float, fin: float,
+                            latencias: Dict[str, List[float]],
+                            errores: Counter) -> None:
+  nombres = list(mezcla)
+  pesos = list(mezcla.values())
+  while time.perf_counter() < fin:
+    nombre = usuario.rng.choices(nombres, pesos)[0]
+    operacion, esperado = OPERACIONES[nombre]
+    inicio = time.perf_counter()
+    try:
+      respuesta = await operacion(client, usuario, catalogo)
+      ok = respuesta.status_code == esperado
+    except httpx.HTTPError:
+      ok = False
+    duracion = time.perf_counter() - inicio
+    # Las peticiones del calentamiento no se cuentan
+    if inicio < medir_desde:
+      continue
+    if ok:
+      latencias[nombre].append(duracion)
+    else:
+      errores[nombre] += 1
+
+
+async def _conducir(base_url: str, emails: List[str], catalogo: Catalogo,
+                    args) -> dict:
+  limits = httpx.Limits(max_connections=args.concurrency,
+                        max_keepalive_connections=args.concurrency)
+  async with httpx.AsyncClient(base_url=base_url, limits=limits,
+                               timeout=30) as client:
+    usuarios = []
+    for i in range(args.concurrency):
+      usuario = UsuarioVirtual(email=emails[i % len(emails)],
+                               headers={},
+                               rng=random.Random(args.seed + i))
+      respuesta = await _login(client, usuario, catalogo)
+      respuesta.raise_for_status()
+      token = respuesta.json()["access_token"]
+      usuario.headers = {"Authorization": f"Bearer {token}"}
+      usuarios.append(usuario)
+
+    latencias = defaultdict(list)
+    errores = Counter()
+    medir_desde = time.perf_counter() + args.warmup
+    fin = medir_desde + args.duration
+    mezcla = MEZCLAS[args.mix]
+    await asyncio.gather(*[
+        _ejecutar_usuario(client, usuario, mezcla, catalogo, medir_desde, fin,
+                          latencias, errores) for usuario in usuarios
+    ])
+  return _resumir(latencias, errores, args.duration)
+
+
+def _estadisticas(valores: List[float], fallidas: int, segundos: float) -> dict:
+  ms = np.asarray(valores) * 1000
+  p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (0, 0, 0)
+  return {
+      "requests": len(valores) + fallidas,
+      "errors": fallidas,
+      "rps": round(len(valores) / segundos, 2),
+      "p50_ms": round(float(p50), 2),
+      "p95_ms": round(float(p95), 2),
+      "p99_ms": round(float(p99), 2),
+  }
+
+
+def _resumir(latencias: Dict[str, List[float]], errores: Counter,
+             segundos: float) -> dict:
+  nombres = sorted(set(latencias) | set(errores))
+  operaciones = {
+      nombre: _estadisticas(latencias[nombre], errores[nombre], segundos)
+      for nombre in nombres
+  }
+  todas = [valor for nombre in nombres for valor in latencias[nombre]]
+  operaciones["total"] = _estadisticas(todas, sum(errores.values()), segundos)
+  return operaciones
+
+
+def _imprimir(operaciones: dict) -> None:
+  print(f"{'operación':<14} {'requests':>9} {'errores':>8} {'req/s':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+  for nombre, op in operaciones.items():
+    print(f"{nombre:<14} {op['requests']:>9} {op['errors']:>8} "
+          f"{op['rps']:>9.1f} {op['p50_ms']:>9.1f} {op['p95_ms']:>9.1f} "
+          f"{op['p99_ms']:>9.1f}")
+
+
+def comparar(actual: dict, base: dict, tolerancia: float) -> List[str]:
+  """Imprime la variación contra la línea base y devuelve las regresiones.
+
+    Es regresión que p95/p99 suban, o req/s bajen, más que `tolerancia`
+    (fracción) en alguna operación presente en ambas ejecuciones.
+    """
+  for clave in ("mix", "concurrency", "duration", "workers"):
+    if actual["config"].get(clave) != base["config"].get(clave):
+      print(f"Aviso: la línea base usó {clave}={base['config'].get(clave)}, "
+            f"esta ejecución {actual['config'].get(clave)}.")
+
+  regresiones = []
+  print(f"\n{'operación':<14} {'métrica':<7} {'base':>9} {'actual':>9} "
+        f"{'cambio':>8}")
+  for nombre, op in actual["operaciones"].items():
+    ref = base["operaciones"].get(nombre)
+    if not ref:
+      continue
+    for metrica, peor_si_sube in (("p95_ms", True), ("p99_ms", True), ("rps",
+                                                                       False)):
+      if not ref[metrica]:
+        continue
+      cambio = op[metrica] / ref[metrica] - 1
+      print(f"{nombre:<14} {metrica:<7} {ref[metrica]:>9.1f} "
+            f"{op[metrica]:>9.1f} {cambio:>+8.1%}")
+      empeoro = cambio if peor_si_sube else -cambio
+      if empeoro > tolerancia:
+        regresiones.append(f"{nombre} {metrica}: {ref[metrica]:.1f} -> "
+                           f"{op[metrica]:.1f} ({cambio:+.1%})")
+  return regresiones
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(
+      description="Prueba de carga de la API con mezclas de peticiones.")
+  parser.add_argument("--mix", choices=sorted(MEZCLAS), default="dashboard")
+  parser.add_argument("--concurrency",
+                      type=int,
+                      default=20,
+                      help="Usuarios virtuales simultáneos.")
+  parser.add_argument("--duration",
+                      type=float,
+                      default=30,
+                      help="Segundos medidos.")
+  parser.add_argument("--warmup",
+                      type=float,
+                      default=5,
+                      help="Segundos iniciales que no se miden.")
+  parser.add_argument("--usuarios", type=int, default=50)
+  parser.add_argument("--eventos-por-usuario", type=int, default=200)
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--skip-seed",
+                      action="store_true",
+                      help="Reutiliza los usuarios de una ejecución anterior.")
+  parser.add_argument("--base-url",
+                      default=None,
+                      help="Servidor ya levantado; si falta, arranca uvicorn.")
+  parser.add_argument("--workers", type=int, default=1)
+  parser.add_argument("--output", default=None)
+  parser.add_argument("--baseline", default=None)
+  parser.add_argument("--tolerance",
+                      type=float,
+                      default=0.10,
+                      help="Empeoramiento tolerado frente a la línea base.")
+  args = parser.parse_args()
+
+  with SessionLocal() as db:
+    catalogo = leer_catalogo(db)
+    if args.skip_seed:
+      emails = usuarios_existentes(db)
+    else:
+      emails = sembrar(db, args.usuarios, args.eventos_por_usuario, args.seed)
+  if not emails:
+    parser.error("No hay usuarios de prueba: ejecute sin --skip-seed.")
+
+  with contextlib.ExitStack() as stack:
+    base_url = args.base_url or stack.enter_context(_servidor(args.workers))
+    operaciones = asyncio.run(_conducir(base_url, emails, catalogo, args))
+
+  workers = None if args.base_url else args.workers
+  eventos_por_usuario = None if args.skip_seed else args.eventos_por_usuario
+  resultado = {
+      "config": {
+          "mix": args.mix,
+          "concurrency": args.concurrency,
+          "duration": args.duration,
+          "workers": workers,
+          "usuarios": len(emails),
+          "eventos_por_usuario": eventos_por_usuario,
+      },
+      "entorno": {
+          "python": platform.python_version(),
+          "maquina": platform.node(),
+          "fecha": datetime.now(timezone.utc).isoformat(),
+      },
+      "operaciones": operaciones,
+  }
+  _imprimir(operaciones)
+
+  if args.output:
+    with open(args.output, "w", encoding="utf-8") as archivo:
+      json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+
+  if args.baseline:
+    with open(args.baseline, encoding="utf-8") as archivo:
+      base = json.load(archivo)
+    regresiones = comparar(resultado, base, args.tolerance)
+    if regresiones:
+      print("\nRegresiones:\n  " + "\n  ".join(regresiones))
+      sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,83 @@
+"""
+Per-request overhead of ForwardedProtoMiddleware on the `/` route.
+
+Builds three apps serving api.main.read_root: without middleware, with the
+previous BaseHTTPMiddleware implementation and with the ASGI one in
+api.middleware, and drives each in-process through the ASGI interface (no
+sockets), so the difference between them is the middleware cost.
+
+Usage:
+  python -m benchmarks.middleware_overhead [--requests N] [--repeat R]
+"""
+import argparse
+import asyncio
+import statistics
+
+from api.main import read_root
+from api.middleware import ForwardedProtoMiddleware
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from benchmarks._asgi import run_requests
+
+_HEADERS = [
+    (b"host", b"api.moneypilot.local"),
+    (b"x-forwarded-proto", b"https"),
+    (b"x-forwarded-for", b"203.0.113.7, 10.0.0.2"),
+]
+_CLIENTE = ("10.0.0.1", 51000)
+
+
+class BaseHTTPForwardedProtoMiddleware(BaseHTTPMiddleware):
+  """Implementación anterior (api/main.py), conservada como referencia."""
+
+  async def dispatch(self, request: Request, call_next):
+    forwarded_proto = request.headers.get("x-forwarded-proto")
+    if forwarded_proto:
+      scope = request.scope
+      scope["scheme"] = forwarded_proto
+    response = await call_next(request)
+    return response
+
+
+def _app(middleware=None, **options) -> FastAPI:
+  app = FastAPI()
+  app.add_api_route("/", read_root)
+  if middleware is not None:
+    app.add_middleware(middleware, **options)
+  return app
+
+
+async def main(requests: int, repeat: int) -> None:
+  apps = {
+      "sin middleware": _app(),
+      "BaseHTTPMiddleware": _app(BaseHTTPForwardedProtoMiddleware),
+      "ASGI": _app(ForwardedProtoMiddleware, trusted_proxies=["10.0.0.0/8"]),
+  }
+  resultados = {}
+  for nombre, app in apps.items():
+    # Calentamiento
+    await run_requests(app,
+                       min(requests, 1000),
+                       headers=_HEADERS,
+                       client=_CLIENTE)
+    tiempos = [
+        await run_requests(app, requests, headers=_HEADERS, client=_CLIENTE)
+        for _ in range(repeat)
+    ]
+    resultados[nombre] = statistics.median(tiempos) / requests * 1e6
+
+  base = resultados["sin middleware"]
+  print(f"{'variante':<20} {'us/petición':>12} {'overhead us':>12}")
+  for nombre, us in resultados.items():
+    print(f"{nombre:<20} {us:>12.2f} {us - base:>12.2f}")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+      description="Mide el overhead de ForwardedProtoMiddleware en GET /.")
+  parser.add_argument("--requests", type=int, default=20000)
+  parser.add_argument("--repeat", type=int, default=5)
+  args = parser.parse_args()
+  asyncio.run(main(args.requests, args.repeat))
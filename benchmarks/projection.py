@@ -0,0 +1,70 @@
+"""
+Cost of the Monte Carlo savings projection per user.
+
+Times api.services.projection_service.simulate_savings (scenario draws,
+compounding, goal probabilities and percentile bands) across horizons and
+scenario counts, with inputs built from a synthetic 12-month history. No
+database is involved. Sizes above SIMULATION_MAX_CELLS, which the API
+rejects, are marked with *.
+
+Usage:
+  python -m benchmarks.projection [--horizontes 24,120,360]
+      [--escenarios 1000,2500,5000] [--tasa T] [--repeat R]
+"""
+import argparse
+from datetime import date
+from datetime import timedelta
+from decimal import Decimal
+import statistics
+import time
+from types import SimpleNamespace
+
+from api import config
+from api.services.projection_service import build_inputs
+from api.services.projection_service import history_window
+from api.services.projection_service import simulate_savings
+
+
+def _inputs():
+  perfil = SimpleNamespace(ahorro_actual=Decimal("2500000"),
+                           monto_meta_ahorro=Decimal("30000000"))
+  desde, hasta = history_window(date.today())
+  historial = []
+  mes = desde
+  for i in range(12):
+    historial.append((mes, Decimal(3_000_000 + 150_000 * (i % 4)),
+                      Decimal(2_200_000 + 300_000 * (i % 3))))
+    mes = (mes + timedelta(days=31)).replace(day=1)
+  return build_inputs(perfil, historial, hasta)
+
+
+def main(horizontes: list, escenarios: list, tasa: float, repeat: int) -> None:
+  inputs = _inputs()
+  max_celdas = config.settings.SIMULATION_MAX_CELLS
+  print(f"{'meses':>6} {'escenarios':>11} {'ms/usuario':>11} {'P(meta)':>8}")
+  for meses in horizontes:
+    for cantidad in escenarios:
+      tiempos = []
+      for semilla in range(repeat):
+        inicio = time.perf_counter()
+        resultado = simulate_savings(inputs, meses, cantidad, tasa, semilla)
+        tiempos.append(time.perf_counter() - inicio)
+      fuera = "*" if meses * cantidad > max_celdas else ""
+      print(f"{meses:>6} {cantidad:>11} "
+            f"{statistics.median(tiempos) * 1000:>11.2f} "
+            f"{resultado['probabilidad_meta']:>8.3f}{fuera}")
+
+
+def _enteros(valor: str) -> list:
+  return [int(parte) for parte in valor.split(",")]
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+      description="Mide la proyección de ahorro de Monte Carlo.")
+  parser.add_argument("--horizontes", type=_enteros, default=[24, 120, 360])
+  parser.add_argument("--escenarios", type=_enteros, default=[1000, 2500, 5000])
+  parser.add_argument("--tasa", type=float, default=0.05)
+  parser.add_argument("--repeat", type=int, default=9)
+  args = parser.parse_args()
+  main(args.horizontes, args.escenarios, args.tasa, args.repeat)
@@ -0,0 +1,96 @@
+"""
+Cost of expanding weekly recurring events for the events listing.
+
+Builds users with hundreds of recurring events and times, per user, one
+listing page over a multi-year window and its totals, two ways: the lazy
+expansion in api.services.recurrence_service (heapq.merge over per-event
+generators, arithmetic occurrence counts) and materializing every
+occurrence, sorting and summing. No database is involved.
+
+Usage:
+  python -m benchmarks.recurrence [--usuarios N] [--recurrentes N]
+      [--anios N] [--limit N] [--repeat R]
+"""
+import argparse
+from datetime import date
+from datetime import timedelta
+from decimal import Decimal
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from api.services.recurrence_service import clave_listado
+from api.services.recurrence_service import combinar
+from api.services.recurrence_service import contar_ocurrencias
+from api.services.recurrence_service import expandir
+from api.services.recurrence_service import ocurrencias
+
+
+def _usuarios(usuarios: int, recurrentes: int, desde: date, dias: int) -> list:
+  """Filas (evento, categoria) de eventos recurrentes por usuario."""
+  rng = random.Random(7)
+  return [[(SimpleNamespace(id_evento=u * recurrentes + i,
+                            tipo="GASTO" if i % 4 else "INGRESO",
+                            monto=Decimal(rng.randrange(1000, 500000)),
+                            fecha=desde + timedelta(days=rng.randrange(dias)),
+                            semana_inicio=None), "Categoría")
+           for i in range(recurrentes)]
+          for u in range(usuarios)]
+
+
+def _perezoso(filas: list, desde: date, hasta: date, limit: int) -> tuple:
+  pagina = combinar([], expandir(filas, desde, hasta), cantidad=limit + 1)
+  total = sum(ev.monto * contar_ocurrencias(ev.fecha, None, desde, hasta)
+              for ev, _ in filas)
+  return pagina[:limit], total
+
+
+def _materializado(filas: list, desde: date, hasta: date, limit: int) -> tuple:
+  todas = [(fecha, ev, categoria)
+           for ev, categoria in filas
+           for fecha in ocurrencias(ev.fecha, None, desde, hasta)]
+  todas.sort(key=clave_listado, reverse=True)
+  total = sum(ev.monto for _, ev, _ in todas)
+  return todas[:limit], total
+
+
+def main(usuarios: int, recurrentes: int, anios: int, limit: int,
+         repeat: int) -> None:
+  hasta = date.today()
+  desde = hasta - timedelta(days=365 * anios)
+  datos = _usuarios(usuarios, recurrentes, desde, 365 * anios)
+
+  # Ambas variantes deben devolver la misma página y los mismos totales
+  for filas in datos[:3]:
+    esperado = _materializado(filas, desde, hasta, limit)
+    assert _perezoso(filas, desde, hasta, limit) == esperado
+
+  por_usuario = sum(
+      contar_ocurrencias(ev.fecha, None, desde, hasta)
+      for filas in datos
+      for ev, _ in filas) // usuarios
+  print(f"{usuarios} usuarios x {recurrentes} recurrentes, ventana de {anios} "
+        f"años: ~{por_usuario} ocurrencias por usuario")
+  print(f"{'variante':<14} {'ms/usuario':>11}")
+  variantes = {"perezoso": _perezoso, "materializado": _materializado}
+  for nombre, variante in variantes.items():
+    tiempos = []
+    for _ in range(repeat):
+      inicio = time.perf_counter()
+      for filas in datos:
+        variante(filas, desde, hasta, limit)
+      tiempos.append(time.perf_counter() - inicio)
+    print(f"{nombre:<14} {statistics.median(tiempos) / usuarios * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+      description="Mide la expansión de eventos recurrentes del listado.")
+  parser.add_argument("--usuarios", type=int, default=50)
+  parser.add_argument("--recurrentes", type=int, default=300)
+  parser.add_argument("--anios", type=int, default=3)
+  parser.add_argument("--limit", type=int, default=100)
+  parser.add_argument("--repeat", type=int, default=3)
+  args = parser.parse_args()
+  main(args.usuarios, args.recurrentes, args.anios, args.limit, args.repeat)
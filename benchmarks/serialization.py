@@ -0,0 +1,109 @@
+"""
+Throughput of GET /eventos_financieros/ serialization on large pages.
+
+Serves the same in-memory page of events through two routes: the previous
+path (EventoFinancieroListRead models, re-validated and dumped through
+response_model) and the current one (plain dicts returned as
+ORJSONResponse). No database is involved, so the difference is the
+serialization cost.
+
+Usage:
+  python -m benchmarks.serialization [--eventos N] [--requests N] [--repeat R]
+"""
+import argparse
+import asyncio
+from datetime import date
+from datetime import timedelta
+from decimal import Decimal
+import statistics
+from types import SimpleNamespace
+
+from api.responses import ORJSONResponse
+from api.schemas.evento_financiero import EventoFinancieroListRead
+from api.schemas.evento_financiero import EventosFinancierosResponse
+from fastapi import FastAPI
+
+from benchmarks._asgi import run_requests
+
+
+def _filas(cantidad: int) -> list:
+  """Filas (evento, categoria) como las devuelve la consulta del listado."""
+  inicio = date(2024, 1, 1)
+  return [(SimpleNamespace(id_evento=i,
+                           tipo="GASTO" if i % 3 else "INGRESO",
+                           monto=Decimal(f"{1000 + i % 997}.{i % 100:02d}"),
+                           fecha=inicio + timedelta(days=i % 365),
+                           descripcion=f"Evento {i}",
+                           es_unico=bool(i % 2),
+                           semana_inicio=None),
+           "Alimentación" if i % 3 else "Salario") for i in range(cantidad)]
+
+
+def _app(filas: list) -> FastAPI:
+  app = FastAPI()
+
+  @app.get("/modelos", response_model=EventosFinancierosResponse)
+  async def modelos():
+    eventos = [
+        EventoFinancieroListRead(id_evento=ev.id_evento,
+                                 tipo=ev.tipo,
+                                 monto=ev.monto,
+                                 fecha=ev.fecha,
+                                 descripcion=ev.descripcion,
+                                 es_unico=ev.es_unico,
+                                 semana_inicio=ev.semana_inicio,
+                                 categoria=categoria) for ev, categoria in filas
+    ]
+    return EventosFinancierosResponse(eventos=eventos,
+                                      total_eventos=len(eventos),
+                                      total_gastos=0.0,
+                                      total_ingresos=0.0)
+
+  @app.get("/orjson", response_model=EventosFinancierosResponse)
+  async def orjson():
+    eventos = [{
+        "id_evento": ev.id_evento,
+        "tipo": ev.tipo,
+        "monto": ev.monto,
+        "fecha": ev.fecha,
+        "descripcion": ev.descripcion,
+        "es_unico": ev.es_unico,
+        "semana_inicio": ev.semana_inicio,
+        "categoria": categoria,
+    } for ev, categoria in filas]
+    return ORJSONResponse({
+        "eventos": eventos,
+        "total_eventos": len(eventos),
+        "total_gastos": 0.0,
+        "total_ingresos": 0.0,
+        "next_cursor": None,
+    })
+
+  return app
+
+
+async def main(eventos: int, requests: int, repeat: int) -> None:
+  app = _app(_filas(eventos))
+  resultados = {}
+  for ruta in ("/modelos", "/orjson"):
+    await run_requests(app, max(requests // 10, 1), path=ruta)  # calentamiento
+    tiempos = [
+        await run_requests(app, requests, path=ruta) for _ in range(repeat)
+    ]
+    resultados[ruta] = requests / statistics.median(tiempos)
+
+  print(f"Página de {eventos} eventos")
+  print(f"{'ruta':<10} {'peticiones/s':>14}")
+  for ruta, por_segundo in resultados.items():
+    print(f"{ruta:<10} {por_segundo:>14.1f}")
+  print(f"Aceleración: {resultados['/orjson'] / resultados['/modelos']:.2f}x")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+      description="Compara la serialización del listado de eventos.")
+  parser.add_argument("--eventos", type=int, default=500)
+  parser.add_argument("--requests", type=int, default=200)
+  parser.add_argument("--repeat", type=int, default=5)
+  args = parser.parse_args()
+  asyncio.run(main(args.eventos, args.requests, args.repeat))
@@ -2,7 +2,8 @@ CREATE TABLE public.usuarios (
   id_usuario SERIAL PRIMARY KEY,
   email VARCHAR(100) NOT NULL UNIQUE,
   password_hash VARCHAR(255) NOT NULL,
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  version_eventos BIGINT NOT NULL DEFAULT 0
 );
 
 CREATE TABLE public.paises_latam (
@@ -60,8 +61,10 @@ BEFORE UPDATE ON public.perfiles_usuario
 FOR EACH ROW
 EXECUTE FUNCTION actualizar_ultima_actualizacion();
 
+-- Particionada por rango de fecha, una partición por mes (ver
+-- api/services/partition_service.py y `python -m api.scripts.manage_partitions`)
 CREATE TABLE public.eventos_financieros (
-  id_evento SERIAL PRIMARY KEY,
+  id_evento SERIAL,
   id_usuario INTEGER NOT NULL REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
   tipo VARCHAR(10) NOT NULL CHECK (tipo IN ('INGRESO', 'GASTO')),
   id_categoria_gasto INTEGER REFERENCES categorias_gastos(id_categoria_gasto) ON DELETE SET NULL,
@@ -75,15 +78,56 @@ CREATE TABLE public.eventos_financieros (
   CONSTRAINT chk_categoria_tipo CHECK (
     (tipo = 'GASTO' AND id_categoria_gasto IS NOT NULL AND id_categoria_ingreso IS NULL) OR
     (tipo = 'INGRESO' AND id_categoria_ingreso IS NOT NULL AND id_categoria_gasto IS NULL)
-  )
-);
+  ),
+  PRIMARY KEY (id_evento, fecha)
+) PARTITION BY RANGE (fecha);
+
+-- Fechas sin partición mensual (muy antiguas o muy futuras)
+CREATE TABLE public.eventos_financieros_default PARTITION OF public.eventos_financieros DEFAULT;
+
+-- Últimos 24 meses y los 3 siguientes; manage_partitions crea los siguientes
+DO $$
+DECLARE
+  mes DATE;
+BEGIN
+  FOR i IN -24..3 LOOP
+    mes := (date_trunc('month', CURRENT_DATE) + make_interval(months => i))::date;
+    EXECUTE format(
+      'CREATE TABLE public.%I PARTITION OF public.eventos_financieros FOR VALUES FROM (%L) TO (%L)',
+      'eventos_financieros_' || to_char(mes, 'YYYY_MM'), mes, (mes + INTERVAL '1 month')::date);
+  END LOOP;
+END $$;
 
 CREATE INDEX idx_eventos_usuario_fecha ON eventos_financieros (id_usuario, fecha);
 CREATE INDEX idx_eventos_usuario_tipo ON eventos_financieros (id_usuario, tipo);
 CREATE INDEX idx_eventos_semana_inicio ON eventos_financieros (semana_inicio);
+-- Eventos recurrentes de un usuario, que el listado expande en ocurrencias
+CREATE INDEX idx_eventos_recurrentes ON eventos_financieros (id_usuario) WHERE es_unico = FALSE;
 CREATE INDEX idx_perfiles_usuario_usuario ON perfiles_usuario (id_usuario);
 CREATE INDEX idx_perfiles_usuario_pais_residencia ON perfiles_usuario (id_pais_residencia);
 
+-- Totales mensuales por usuario, tipo y categoría (mantenidos por la API)
+CREATE TABLE public.resumen_mensual_eventos (
+  id_usuario INTEGER NOT NULL REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
+  mes DATE NOT NULL,
+  tipo VARCHAR(10) NOT NULL,
+  id_categoria INTEGER NOT NULL DEFAULT 0,
+  total NUMERIC(14,2) NOT NULL DEFAULT 0,
+  cantidad INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (id_usuario, mes, tipo, id_categoria)
+);
+
+-- Historial de puntajes de salud financiera (perfil financiero y recálculo programado)
+CREATE TABLE public.historial_score_salud (
+  id_historial BIGSERIAL PRIMARY KEY,
+  id_usuario INTEGER NOT NULL REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
+  score INTEGER NOT NULL,
+  status VARCHAR(20) NOT NULL,
+  calculated_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX idx_historial_score_usuario_fecha ON historial_score_salud (id_usuario, calculated_at);
+
 INSERT INTO public.paises_latam (codigo, nombre) VALUES
 ('AR', 'Argentina'),
 ('BO', 'Bolivia'),
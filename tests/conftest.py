@@ -0,0 +1,94 @@
+"""
+Shared fixtures for the MoneyPilot API tests.
+
+Tests that need the database run the app in-process against DATABASE_URL
+(the docker compose `db` service with `make tests`) and are skipped when it
+is not reachable. Each one gets its own throwaway user, deleted afterwards
+together with its rows (ON DELETE CASCADE).
+"""
+from decimal import Decimal
+import uuid
+
+from api import config
+from api.database import async_engine
+from api.database import engine
+from api.database import SessionLocal
+from api.main import app
+from api.models.perfil import PerfilUsuario
+from api.models.usuario import Usuario
+import httpx
+import pytest
+from sqlalchemy import delete
+from sqlalchemy import event
+from sqlalchemy import exc
+
+
+@pytest.fixture
+def anyio_backend():
+  return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def presupuestos_estrictos(monkeypatch):
+  """Exceeding a route's query budget fails the test instead of logging."""
+  monkeypatch.setattr(config.settings, "QUERY_BUDGET_ENFORCE", True)
+
+
+@pytest.fixture(scope="session")
+def base_de_datos():
+  try:
+    with engine.connect():
+      pass
+  except exc.OperationalError:
+    pytest.skip("La base de datos de DATABASE_URL no está disponible")
+
+
+@pytest.fixture
+def usuario(base_de_datos):
+  """Id of a new user with a profile, deleted after the test."""
+  with SessionLocal() as db:
+    user = Usuario(email=f"test-{uuid.uuid4().hex}@example.com",
+                   password_hash="x")
+    user.perfil = PerfilUsuario(id_pais_residencia=1,
+                                ingreso_mensual_estimado=Decimal("3000000"),
+                                gastos_fijos_mensuales=Decimal("1500000"),
+                                gastos_variables_mensuales=Decimal("500000"),
+                                ahorro_actual=Decimal("1000000"),
+                                monto_meta_ahorro=Decimal("5000000"),
+                                plazo_meta_ahorro_meses=12)
+    db.add(user)
+    db.commit()
+    user_id = user.id_usuario
+  yield user_id
+  with SessionLocal() as db:
+    db.execute(delete(Usuario).where(Usuario.id_usuario == user_id))
+    db.commit()
+
+
+@pytest.fixture
+async def cliente(base_de_datos):
+  """HTTP client bound to the app, without going through the network."""
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(transport=transport,
+                               base_url="http://test") as client:
+    yield client
+  # Las conexiones de asyncpg quedan atadas al event loop de cada test
+  await async_engine.dispose()
+
+
+class ContadorConsultas:
+  """Counts the SQL statements the async engine sends to the database."""
+
+  def __init__(self):
+    self.total = 0
+
+  def __call__(self, conn, cursor, statement, parameters, context, executemany):
+    self.total += 1
+
+
+@pytest.fixture
+def consultas():
+  contador = ContadorConsultas()
+  event.listen(async_engine.sync_engine, "before_cursor_execute", contador)
+  yield contador
+  event.remove(async_engine.sync_engine, "before_cursor_execute", contador)
@@ -0,0 +1,36 @@
+from api.database import async_engine
+from api.database import AsyncSessionLocal
+from api.dependencies import obtener_usuario
+from api.dependencies import usuario_cache
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def sesiones(base_de_datos):
+  yield AsyncSessionLocal
+  await async_engine.dispose()
+
+
+async def test_usuario_en_cache_sobrevive_al_rollback(sesiones, usuario):
+  usuario_cache.pop(usuario)
+  async with sesiones() as db:
+    user = await obtener_usuario(db, usuario)
+    email = user.email
+    # Expira las instancias de la sesión, no la copia de la caché
+    await db.rollback()
+
+  async with sesiones() as db:
+    user = await obtener_usuario(db, usuario)
+    assert user.email == email
+    assert user.id_usuario == usuario
+    assert user in db
+
+
+async def test_usuario_en_cache_no_queda_en_la_sesion(sesiones, usuario):
+  usuario_cache.pop(usuario)
+  async with sesiones() as db:
+    user = await obtener_usuario(db, usuario)
+  assert usuario_cache.get(usuario) is not user
+  assert usuario_cache.get(usuario).email == user.email
@@ -0,0 +1,80 @@
+from api.responses import coincide_etag
+from api.responses import etag
+import pytest
+from starlette.requests import Request
+
+pytestmark = pytest.mark.anyio
+
+
+def _request(if_none_match: str) -> Request:
+  return Request({
+      "type": "http",
+      "headers": [(b"if-none-match", if_none_match.encode())]
+  })
+
+
+def test_comparacion_debil():
+  etiqueta = etag(1, 2)
+  assert etiqueta.startswith('W/"')
+  assert coincide_etag(_request(etiqueta), etiqueta)
+  assert coincide_etag(_request(etiqueta.removeprefix("W/")), etiqueta)
+  assert coincide_etag(_request(f'"otra", {etiqueta}'), etiqueta)
+  assert coincide_etag(_request("*"), etiqueta)
+  assert not coincide_etag(_request(etag(1, 3)), etiqueta)
+
+
+async def test_listado_responde_304_si_no_cambio(cliente, usuario, consultas):
+  params = {"id_usuario": usuario}
+  respuesta = await cliente.get("/eventos_financieros/", params=params)
+  assert respuesta.status_code == 200
+  etiqueta = respuesta.headers["etag"]
+
+  consultas.total = 0
+  respuesta = await cliente.get("/eventos_financieros/",
+                                params=params,
+                                headers={"If-None-Match": etiqueta})
+  assert respuesta.status_code == 304
+  assert respuesta.content == b""
+  assert respuesta.headers["etag"] == etiqueta
+  # Solo se lee usuarios.version_eventos
+  assert consultas.total == 1
+
+  # Una escritura de eventos cambia la versión
+  await cliente.post("/eventos_financieros/",
+                     params=params,
+                     json={
+                         "tipo": "GASTO",
+                         "id_categoria_gasto": 1,
+                         "monto": 100,
+                         "fecha": "2025-03-01"
+                     })
+  respuesta = await cliente.get("/eventos_financieros/",
+                                params=params,
+                                headers={"If-None-Match": etiqueta})
+  assert respuesta.status_code == 200
+  assert respuesta.headers["etag"] != etiqueta
+
+
+async def test_resumen_responde_304_si_no_cambio(cliente, usuario):
+  params = {"id_usuario": usuario}
+  respuesta = await cliente.get("/financial_health/summary", params=params)
+  assert respuesta.status_code == 200
+  etiqueta = respuesta.headers["etag"]
+
+  respuesta = await cliente.get("/financial_health/summary",
+                                params=params,
+                                headers={"If-None-Match": etiqueta})
+  assert respuesta.status_code == 304
+  assert respuesta.content == b""
+
+
+async def test_categorias_responde_304_sin_consultas(cliente, consultas):
+  respuesta = await cliente.get("/categorias/gastos")
+  etiqueta = respuesta.headers["etag"]
+  assert not etiqueta.startswith("W/")
+
+  consultas.total = 0
+  respuesta = await cliente.get("/categorias/gastos",
+                                headers={"If-None-Match": etiqueta})
+  assert respuesta.status_code == 304
+  assert consultas.total == 0
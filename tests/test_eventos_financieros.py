@@ -0,0 +1,195 @@
+from datetime import date
+import json
+
+from api.database import SessionLocal
+from api.models.resumen_mensual import ResumenMensualEvento
+from api.routers import eventos_financieros
+from api.services.rollup_service import reconstruir
+import pytest
+from sqlalchemy import select
+
+pytestmark = pytest.mark.anyio
+
+# Un mes completo en el pasado: el listado usa el resumen mensual
+RANGO = {"fecha_inicio": "2025-03-01", "fecha_fin": "2025-03-31"}
+
+
+def _eventos(cantidad: int) -> list:
+  eventos = []
+  for i in range(cantidad):
+    evento = {"monto": 1000 + i, "fecha": date(2025, 3, i % 28 + 1).isoformat()}
+    if i % 3:
+      evento.update(tipo="GASTO", id_categoria_gasto=i % 8 + 1)
+    else:
+      evento.update(tipo="INGRESO", id_categoria_ingreso=i % 6 + 1)
+    eventos.append(evento)
+  return eventos
+
+
+def _resumen(usuario: int) -> set:
+  """Filas no vacías del resumen mensual del usuario."""
+  with SessionLocal() as db:
+    return set(
+        db.execute(
+            select(ResumenMensualEvento.mes, ResumenMensualEvento.tipo,
+                   ResumenMensualEvento.id_categoria,
+                   ResumenMensualEvento.total,
+                   ResumenMensualEvento.cantidad).where(
+                       ResumenMensualEvento.id_usuario == usuario,
+                       ResumenMensualEvento.cantidad > 0)).all())
+
+
+def _resumen_reconstruido(usuario: int) -> set:
+  with SessionLocal() as db:
+    reconstruir(db, usuario)
+  return _resumen(usuario)
+
+
+async def test_listado_no_depende_del_tamano_de_pagina(cliente, usuario,
+                                                       consultas):
+  respuesta = await cliente.post("/eventos_financieros/bulk",
+                                 params={"id_usuario": usuario},
+                                 json=_eventos(60))
+  assert respuesta.json()["insertados"] == 60
+  # Calienta las cachés de usuario y catálogos
+  await cliente.get("/eventos_financieros/", params={"id_usuario": usuario})
+
+  por_limite = {}
+  for limit in (1, 500):
+    consultas.total = 0
+    respuesta = await cliente.get("/eventos_financieros/",
+                                  params={
+                                      "id_usuario": usuario,
+                                      "limit": limit,
+                                      **RANGO
+                                  })
+    assert respuesta.status_code == 200
+    assert len(respuesta.json()["eventos"]) == min(limit, 60)
+    por_limite[limit] = consultas.total
+
+  assert por_limite[1] == por_limite[500]
+
+
+async def test_bulk_informa_las_filas_invalidas(cliente, usuario):
+  eventos = _eventos(6)
+  eventos[1] = {"tipo": "GASTO", "fecha": "2025-03-02"}  # sin monto
+  eventos[3]["monto"] = "mucho"
+  eventos[4]["id_categoria_gasto"] = 999
+  respuesta = await cliente.post("/eventos_financieros/bulk",
+                                 params={"id_usuario": usuario},
+                                 json=eventos)
+  assert respuesta.status_code == 200
+  cuerpo = respuesta.json()
+  assert cuerpo["insertados"] == 3
+  assert [error["fila"] for error in cuerpo["errores"]] == [2, 4, 5]
+  assert "monto" in cuerpo["errores"][0]["detalle"]
+
+  # El resumen mantenido por la importación es el que se reconstruiría
+  resumen = _resumen(usuario)
+  assert sum(cantidad for *_, cantidad in resumen) == 3
+  assert _resumen_reconstruido(usuario) == resumen
+
+
+async def test_exportar_sin_fechas_lee_todo_por_bloques(cliente, usuario,
+                                                        monkeypatch):
+  eventos = _eventos(25)
+  for i, evento in enumerate(eventos):
+    # Meses pasados: el rango por defecto del listado no los incluiría
+    evento["fecha"] = date(2024 + i % 2, i % 12 + 1, i % 28 + 1).isoformat()
+  await cliente.post("/eventos_financieros/bulk",
+                     params={"id_usuario": usuario},
+                     json=eventos)
+
+  bloques = []
+  stream_filas = eventos_financieros._stream_filas
+
+  async def contar_bloques(query):
+    async for bloque in stream_filas(query):
+      bloques.append(len(bloque))
+      yield bloque
+
+  monkeypatch.setattr(eventos_financieros, "_FILAS_POR_BLOQUE", 10)
+  monkeypatch.setattr(eventos_financieros, "_stream_filas", contar_bloques)
+  respuesta = await cliente.get("/eventos_financieros/export",
+                                params={"id_usuario": usuario})
+  assert respuesta.status_code == 200
+  assert bloques == [10, 10, 5]
+
+  filas = [json.loads(linea) for linea in respuesta.text.splitlines()]
+  assert len(filas) == 25
+  orden = [(fila["fecha"], fila["id_evento"]) for fila in filas]
+  assert orden == sorted(orden, reverse=True)
+
+
+def test_cursor_ida_y_vuelta():
+  cursor = eventos_financieros._codificar_cursor(date(2025, 3, 14), 12345)
+  assert "=" not in cursor
+  assert eventos_financieros._decodificar_cursor(cursor) == (date(2025, 3,
+                                                                  14), 12345)
+
+
+async def test_cursor_recorre_empates_de_fecha(cliente, usuario):
+  # Todos en la misma fecha: solo id_evento separa las páginas
+  eventos = _eventos(7)
+  for evento in eventos:
+    evento["fecha"] = "2025-03-14"
+  await cliente.post("/eventos_financieros/bulk",
+                     params={"id_usuario": usuario},
+                     json=eventos)
+
+  ids, cursor = [], None
+  while True:
+    params = {"id_usuario": usuario, "limit": 3, **RANGO}
+    if cursor:
+      params["cursor"] = cursor
+    cuerpo = (await cliente.get("/eventos_financieros/", params=params)).json()
+    ids += [evento["id_evento"] for evento in cuerpo["eventos"]]
+    cursor = cuerpo["next_cursor"]
+    if not cursor:
+      break
+
+  assert len(ids) == 7
+  assert ids == sorted(ids, reverse=True)
+
+
+@pytest.mark.parametrize("cursor", ["%%%", "bm8tc2VwYXJhZG9y", "MjAyNXxhYmM"])
+async def test_cursor_invalido(cliente, usuario, cursor):
+  respuesta = await cliente.get("/eventos_financieros/",
+                                params={
+                                    "id_usuario": usuario,
+                                    "cursor": cursor
+                                })
+  assert respuesta.status_code == 400
+  assert respuesta.json()["detail"] == "Cursor inválido."
+
+
+async def test_resumen_tras_actualizar_coincide_con_reconstruir(
+    cliente, usuario):
+  await cliente.post("/eventos_financieros/bulk",
+                     params={"id_usuario": usuario},
+                     json=_eventos(6))
+  params = {"id_usuario": usuario, **RANGO}
+  listado = await cliente.get("/eventos_financieros/", params=params)
+  gastos = [
+      evento["id_evento"]
+      for evento in listado.json()["eventos"]
+      if evento["tipo"] == "GASTO"
+  ]
+
+  # Otro mes, otra categoría, otro tipo y todo a la vez
+  cambios = [
+      dict(fecha="2025-04-10"),
+      dict(id_categoria_gasto=8, monto=4321.5),
+      dict(tipo="INGRESO", id_categoria_ingreso=2),
+      dict(fecha="2025-02-01", tipo="INGRESO", id_categoria_ingreso=3),
+  ]
+  for id_evento, cambio in zip(gastos, cambios):
+    respuesta = await cliente.put(f"/eventos_financieros/{id_evento}",
+                                  params={"id_usuario": usuario},
+                                  json=cambio)
+    assert respuesta.status_code == 200
+
+  resumen = _resumen(usuario)
+  meses = {mes for mes, *_ in resumen}
+  assert meses == {date(2025, 2, 1), date(2025, 3, 1), date(2025, 4, 1)}
+  assert _resumen_reconstruido(usuario) == resumen
@@ -0,0 +1,106 @@
+from datetime import date
+from datetime import timedelta
+
+from api.services.financial_health_service import analyze_actual_metrics
+from api.services.financial_health_service import transaction_window
+from api.services.financial_health_service import TransactionAggregates
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def test_ventana_cuenta_la_fraccion_del_mes_en_curso():
+  desde, meses = transaction_window(date(2026, 1, 15))
+  assert desde == date(2025, 11, 1)
+  assert meses == pytest.approx(2 + 15 / 31)
+
+
+def test_metricas_reales_por_mes():
+  metricas = analyze_actual_metrics(
+      TransactionAggregates(ingresos=9000, gastos=6750, cantidad=4, meses=3))
+  assert metricas == {
+      "ingreso_mensual": 3000,
+      "gastos_mensuales": 2250,
+      "ahorro_mensual": 750,
+      "porcentaje_ahorro": 25,
+      "porcentaje_gastos": 75,
+      "meses": 3,
+      "cantidad_eventos": 4,
+  }
+
+
+def test_metricas_reales_sin_eventos():
+  vacio = TransactionAggregates(ingresos=0, gastos=0, cantidad=0, meses=3)
+  assert analyze_actual_metrics(vacio) is None
+  assert analyze_actual_metrics(None) is None
+
+
+async def test_metricas_reales_desde_los_eventos(cliente, usuario):
+  hoy = date.today()
+  desde, meses = transaction_window(hoy)
+  eventos = [
+      {
+          "tipo": "INGRESO",
+          "id_categoria_ingreso": 1,
+          "monto": 3000,
+          "fecha": desde.isoformat()
+      },
+      {
+          "tipo": "INGRESO",
+          "id_categoria_ingreso": 2,
+          "monto": 1500,
+          "fecha": hoy.isoformat()
+      },
+      {
+          "tipo": "GASTO",
+          "id_categoria_gasto": 1,
+          "monto": 900,
+          "fecha": hoy.replace(day=1).isoformat()
+      },
+      # Fuera de la ventana
+      {
+          "tipo": "GASTO",
+          "id_categoria_gasto": 2,
+          "monto": 5000,
+          "fecha": date(desde.year - 1, 1, 1).isoformat()
+      },
+  ]
+  await cliente.post("/eventos_financieros/bulk",
+                     params={"id_usuario": usuario},
+                     json=eventos)
+
+  respuesta = await cliente.get("/financial_health/metrics",
+                                params={"id_usuario": usuario})
+  assert respuesta.status_code == 200
+  reales = respuesta.json()["metricas_reales"]
+  assert reales["cantidad_eventos"] == 3
+  assert reales["meses"] == pytest.approx(meses)
+  assert reales["ingreso_mensual"] == pytest.approx(4500 / meses)
+  assert reales["gastos_mensuales"] == pytest.approx(900 / meses)
+  assert reales["porcentaje_ahorro"] == pytest.approx(80)
+
+
+async def test_sin_eventos_no_hay_metricas_reales(cliente, usuario):
+  respuesta = await cliente.get("/financial_health/metrics",
+                                params={"id_usuario": usuario})
+  assert respuesta.status_code == 200
+  assert respuesta.json()["metricas_reales"] is None
+
+
+async def test_metricas_reales_ignoran_eventos_futuros(cliente, usuario):
+  hoy = date.today()
+  eventos = [{
+      "tipo": "INGRESO",
+      "id_categoria_ingreso": 1,
+      "monto": monto,
+      "fecha": fecha.isoformat()
+  } for monto, fecha in ((1000, hoy), (7000, hoy + timedelta(days=1)))]
+  await cliente.post("/eventos_financieros/bulk",
+                     params={"id_usuario": usuario},
+                     json=eventos)
+
+  respuesta = await cliente.get("/financial_health/metrics",
+                                params={"id_usuario": usuario})
+  reales = respuesta.json()["metricas_reales"]
+  assert reales["cantidad_eventos"] == 1
+  assert reales["ingreso_mensual"] == pytest.approx(1000 / reales["meses"])
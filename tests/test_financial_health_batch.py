@@ -0,0 +1,101 @@
+from decimal import Decimal
+import random
+from types import SimpleNamespace
+
+from api.services.financial_health_batch import compute_recommendation_flags
+from api.services.financial_health_batch import compute_scores
+from api.services.financial_health_batch import ProfileBatch
+from api.services.financial_health_batch import RECOMMENDATION_FLAGS
+from api.services.financial_health_service import analyze_financial_metrics
+from api.services.financial_health_service import calculate_health_score
+from api.services.financial_health_service import generate_recommendations
+import numpy as np
+
+_CAMPOS = (
+    "ingreso_mensual_estimado",
+    "gastos_fijos_mensuales",
+    "gastos_variables_mensuales",
+    "ahorro_planificado_mensual",
+    "ahorro_actual",
+    "deuda_total",
+)
+
+
+def _perfil(ingresos, fijos, variables, ahorro_planificado, ahorro_actual,
+            deuda):
+  """Perfil con montos Decimal en centavos, como los carga la base."""
+  centavos = (ingresos, fijos, variables, ahorro_planificado, ahorro_actual,
+              deuda)
+  return SimpleNamespace(**{
+      campo: Decimal(valor).scaleb(-2)
+      for campo, valor in zip(_CAMPOS, centavos)
+  })
+
+
+def _batch(perfiles):
+  columnas = [
+      [int(getattr(p, campo).scaleb(2)) for p in perfiles] for campo in _CAMPOS
+  ]
+  return ProfileBatch(np.arange(len(perfiles), dtype=np.int64),
+                      *np.array(columnas, dtype=np.int64))
+
+
+def _perfiles_en_umbrales(cantidad):
+  """Perfiles con cada razón a un centavo (o menos) de su umbral."""
+  rng = random.Random(20261018)
+  perfiles = []
+  for _ in range(cantidad):
+    ingresos = rng.randint(1, 10**9)
+    gastos = ingresos * rng.choice((70, 80, 90, 100)) // 100
+    gastos += rng.randint(-1, 1)
+    fijos = rng.randint(0, max(gastos, 0))
+    variables = gastos - fijos
+    ahorro = ingresos * rng.choice((5, 10, 15, 20)) // 100 + rng.randint(-1, 1)
+    deuda = ingresos * rng.choice((3, 6, 12)) + rng.randint(-1, 1)
+    actual = gastos * rng.choice((1, 3, 6)) + rng.randint(-1, 1)
+    if rng.random() < 0.3:
+      # Fondo parcial (< 1 mes): suma decimales al puntaje
+      actual = rng.randint(0, max(gastos - 1, 0))
+    perfiles.append(
+        _perfil(ingresos, fijos, variables, ahorro, max(actual, 0),
+                max(deuda, 0)))
+  return perfiles
+
+
+def _comparar(perfiles):
+  batch = _batch(perfiles)
+  scores = compute_scores(batch)
+  flags = compute_recommendation_flags(batch)
+  for i, perfil in enumerate(perfiles):
+    metricas = analyze_financial_metrics(perfil)
+    assert scores[i] == calculate_health_score(metricas), perfil
+    esperadas = 0
+    for recomendacion in generate_recommendations(metricas):
+      esperadas |= RECOMMENDATION_FLAGS[recomendacion["category"]]
+    assert flags[i] == esperadas, perfil
+
+
+def test_coincide_con_el_calculo_escalar_en_el_ejemplo_del_umbral():
+  _comparar([_perfil(108338420, 9533781, 77136955, 21667684, 0, 0)])
+
+
+def test_coincide_con_el_calculo_escalar_en_los_umbrales():
+  _comparar(_perfiles_en_umbrales(5000))
+
+
+def test_redondea_los_empates_exactos_como_decimal():
+  _comparar([
+      # 200 * ahorro / ingresos = 0.5 -> 70.5, redondea a 70
+      _perfil(4000000, 0, 0, 10000, 0, 0),
+      # 1/3 de ahorro + 1/6 de fondo -> x.5 que el float no representa exacto
+      _perfil(600000, 600000, 0, 1000, 10000, 0),
+      _perfil(600000, 300000, 300000, 3000, 30000, 0),
+  ])
+
+
+def test_ingresos_y_gastos_en_cero():
+  _comparar([
+      _perfil(0, 0, 0, 0, 0, 0),
+      _perfil(0, 50000, 0, 10000, 200000, 300000),
+      _perfil(100000, 0, 0, 0, 50000, 0),
+  ])
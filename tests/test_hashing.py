@@ -0,0 +1,15 @@
+from api.auth.hashing import PasswordHashingPool
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_start_arranca_los_procesos_antes_del_primer_uso():
+  pool = PasswordHashingPool(workers=2, max_queue=4)
+  pool.start()
+  try:
+    assert len(pool._executor._processes) == 2
+    assert await pool.run(pow, 2, 10) == 1024
+  finally:
+    pool.shutdown()
+  assert pool._executor is None
@@ -0,0 +1,45 @@
+from api.middleware import ForwardedProtoMiddleware
+from fastapi import FastAPI
+from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
+import httpx
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+# Red de un proxy inverso en otro contenedor
+RED_PROXY = "172.20.0.0/16"
+
+
+def _app_produccion(trusted_proxies):
+  """Mismo orden de middlewares que api.main con ENV=production."""
+  app = FastAPI()
+
+  @app.get("/ping")
+  async def ping():
+    return {"ok": True}
+
+  app.add_middleware(HTTPSRedirectMiddleware)
+  app.add_middleware(ForwardedProtoMiddleware, trusted_proxies=trusted_proxies)
+  return app
+
+
+async def _get_desde(app, ip_cliente: str) -> httpx.Response:
+  transport = httpx.ASGITransport(app=app, client=(ip_cliente, 40000))
+  async with httpx.AsyncClient(transport=transport,
+                               base_url="http://api") as client:
+    return await client.get("/ping", headers={"X-Forwarded-Proto": "https"})
+
+
+async def test_proxy_confiable_evita_la_redireccion():
+  app = _app_produccion(["127.0.0.1", "::1", RED_PROXY])
+  respuesta = await _get_desde(app, "172.20.0.5")
+  assert respuesta.status_code == 200
+
+
+async def test_proxy_no_confiable_se_redirige():
+  # Con el valor por defecto (solo loopback) el proxy en contenedor entra en
+  # bucle: su X-Forwarded-Proto se ignora y cada petición se redirige
+  app = _app_produccion(["127.0.0.1", "::1"])
+  respuesta = await _get_desde(app, "172.20.0.5")
+  assert respuesta.status_code == 307
+  assert respuesta.headers["location"].startswith("https://")
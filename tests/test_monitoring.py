@@ -0,0 +1,23 @@
+from api.auth.token import create_access_token
+from api.services.reference_data_service import reference_data
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_refrescar_catalogos_requiere_autenticacion(cliente):
+  respuesta = await cliente.post("/monitoring/catalogos/refrescar")
+  assert respuesta.status_code == 401
+
+
+async def test_refrescar_catalogos(cliente, usuario):
+  antes = await reference_data.get()
+  token = create_access_token({"sub": str(usuario)})
+  respuesta = await cliente.post("/monitoring/catalogos/refrescar",
+                                 headers={"Authorization": f"Bearer {token}"})
+  assert respuesta.status_code == 200
+  cuerpo = respuesta.json()
+  assert cuerpo["version"] == antes.version
+  assert cuerpo["categorias_gasto"] == len(antes.categorias_gasto)
+  # Nueva instantánea, sin esperar el TTL
+  assert await reference_data.get() is not antes
@@ -0,0 +1,101 @@
+from datetime import date
+
+from api.database import SessionLocal
+from api.models.evento_financiero import EventoFinanciero
+from api.models.resumen_mensual import ResumenMensualEvento
+from api.models.usuario import Usuario
+from api.services import partition_service
+from api.services.partition_service import _crear_particion
+from api.services.partition_service import crear_particiones
+from api.services.partition_service import desconectar_antiguas
+from api.services.partition_service import listar_particiones
+from api.services.partition_service import nombre_archivada
+from api.services.partition_service import nombre_particion
+from api.services.rollup_service import reconstruir
+import pytest
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy import text
+
+# Mes de prueba, anterior a cualquier partición del esquema
+MES = date(2000, 1, 1)
+# Retención que solo alcanza a MES: las demás particiones son más recientes
+RETENER_MESES = (date.today().year - 2000) * 12
+
+
+def _resumen(db, usuario):
+  return set(
+      db.execute(
+          select(ResumenMensualEvento.mes, ResumenMensualEvento.total).where(
+              ResumenMensualEvento.id_usuario == usuario)).all())
+
+
+@pytest.fixture
+def particion_antigua(base_de_datos):
+  with SessionLocal() as db:
+    _crear_particion(db, MES)
+    db.commit()
+  yield nombre_particion(MES)
+  with SessionLocal() as db:
+    db.execute(text(f"DROP TABLE IF EXISTS {nombre_particion(MES)}"))
+    db.execute(text(f"DROP TABLE IF EXISTS {nombre_archivada(MES)}"))
+    db.commit()
+
+
+def test_desconectar_borra_el_resumen_del_mes(particion_antigua, usuario):
+  with SessionLocal() as db:
+    db.execute(insert(EventoFinanciero), [{
+        "id_usuario": usuario,
+        "tipo": "GASTO",
+        "id_categoria_gasto": 1,
+        "monto": monto,
+        "fecha": fecha
+    } for monto, fecha in ((100, MES), (250, date(2025, 3, 1)))])
+    db.commit()
+    reconstruir(db, usuario)
+    assert (MES, 100) in _resumen(db, usuario)
+    version = db.get(Usuario, usuario).version_eventos
+
+    afectadas = desconectar_antiguas(db, RETENER_MESES, eliminar=True)
+    assert afectadas == [particion_antigua]
+    despues = _resumen(db, usuario)
+    assert despues == {(date(2025, 3, 1), 250)}
+    db.expire_all()
+    assert db.get(Usuario, usuario).version_eventos > version
+
+    # Reconstruir da lo mismo que dejó la desconexión
+    reconstruir(db, usuario)
+    assert _resumen(db, usuario) == despues
+
+
+class _Enero2000(date):
+  """Hoy fijo en MES, para que crear_particiones solo recorra ese mes."""
+
+  @classmethod
+  def today(cls):
+    return cls(2000, 1, 15)
+
+
+def test_desconectar_archiva_y_no_recrea_el_mes(particion_antigua, monkeypatch):
+  with SessionLocal() as db:
+    assert desconectar_antiguas(db, RETENER_MESES) == [particion_antigua]
+    archivada = db.scalar(text("SELECT to_regclass(:tabla) IS NOT NULL"),
+                          {"tabla": nombre_archivada(MES)})
+    assert archivada
+
+    monkeypatch.setattr(partition_service, "date", _Enero2000)
+    assert crear_particiones(db, 0, desde=MES) == []
+    assert MES not in {particion.desde for particion in listar_particiones(db)}
+
+
+def test_no_recrea_un_mes_desconectado_sin_renombrar(particion_antigua,
+                                                     monkeypatch):
+  # Tabla desconectada por una versión anterior, con el nombre del mes
+  with SessionLocal() as db:
+    db.execute(
+        text(f"ALTER TABLE eventos_financieros "
+             f"DETACH PARTITION {particion_antigua}"))
+    db.commit()
+
+    monkeypatch.setattr(partition_service, "date", _Enero2000)
+    assert crear_particiones(db, 0, desde=MES) == []
@@ -0,0 +1,88 @@
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+from api import config
+from api.services.projection_service import build_inputs
+from api.services.projection_service import PERCENTILES
+from api.services.projection_service import ProjectionInputs
+from api.services.projection_service import simulate_savings
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+INPUTS = ProjectionInputs(saldo_inicial=1000,
+                          meta=5000,
+                          ingreso_medio=3000,
+                          gasto_medio=2500,
+                          volatilidad_ingreso=300,
+                          volatilidad_gasto=200,
+                          meses_historial=12)
+
+
+def test_forma_de_la_simulacion():
+  resultado = simulate_savings(INPUTS, 24, 500, 0.05, semilla=7)
+  bandas = resultado["bandas"]
+  assert len(bandas) == 25
+  assert [banda["mes_index"] for banda in bandas] == list(range(25))
+  assert set(bandas[0]) == {
+      "mes_index", *(f"p{p}" for p in PERCENTILES), "probabilidad_meta"
+  }
+  # Mes 0: saldo actual en todos los escenarios
+  assert all(bandas[0][f"p{p}"] == 1000 for p in PERCENTILES)
+  for banda in bandas:
+    valores = [banda[f"p{p}"] for p in PERCENTILES]
+    assert valores == sorted(valores)
+  probabilidades = [banda["probabilidad_meta"] for banda in bandas]
+  assert probabilidades == sorted(probabilidades)
+  assert resultado["probabilidad_meta"] == probabilidades[-1]
+  assert resultado["parametros"]["escenarios"] == 500
+
+
+def test_misma_semilla_mismo_resultado():
+  primera = simulate_savings(INPUTS, 36, 1000, 0.03, semilla=42)
+  assert simulate_savings(INPUTS, 36, 1000, 0.03, semilla=42) == primera
+  assert simulate_savings(INPUTS, 36, 1000, 0.03, semilla=43) != primera
+
+
+def test_sin_volatilidad_es_deterministica():
+  fija = INPUTS._replace(volatilidad_ingreso=0, volatilidad_gasto=0)
+  resultado = simulate_savings(fija, 8, 100)
+  # 1000 + 500 por mes: la meta de 5000 se alcanza en el mes 8
+  assert resultado["bandas"][-1]["p50"] == pytest.approx(5000)
+  assert resultado["meses_para_meta"] == 8
+
+
+def test_sin_historial_usa_el_perfil():
+  perfil = SimpleNamespace(ahorro_actual=Decimal("100"),
+                           monto_meta_ahorro=Decimal("1000"),
+                           ingreso_mensual_estimado=Decimal("2000"),
+                           gastos_fijos_mensuales=Decimal("1200"),
+                           gastos_variables_mensuales=Decimal("300"))
+  inputs = build_inputs(perfil, [], date(2026, 9, 1))
+  assert inputs.meses_historial == 0
+  assert inputs.ingreso_medio == 2000
+  assert inputs.gasto_medio == 1500
+  assert inputs.volatilidad_ingreso == pytest.approx(200)
+
+
+async def test_simulacion_limita_meses_por_escenarios(cliente, usuario):
+  url = "/financial_health/projection/simulation"
+  respuesta = await cliente.get(url,
+                                params={
+                                    "id_usuario": usuario,
+                                    "horizonte_meses": 360,
+                                    "escenarios": 10000
+                                })
+  assert respuesta.status_code == 400
+
+  respuesta = await cliente.get(url,
+                                params={
+                                    "id_usuario": usuario,
+                                    "horizonte_meses": 360
+                                })
+  assert respuesta.status_code == 200
+  simulacion = respuesta.json()
+  assert len(simulacion["bandas"]) == 361
+  assert simulacion["parametros"]["escenarios"] == min(
+      5000, config.settings.SIMULATION_MAX_CELLS // 360)
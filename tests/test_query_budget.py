@@ -0,0 +1,69 @@
+from api.database import async_engine
+from api.database import get_async_db
+from api.database import QueryBudgetExceeded
+from api.dependencies import query_budget
+from api.dependencies import usuario_cache
+from api.middleware import MetricsMiddleware
+from api.services.reference_data_service import reference_data
+from api.telemetry import outside_query_budget
+from fastapi import Depends
+from fastapi import FastAPI
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = pytest.mark.anyio
+
+
+def _app(presupuesto: int, consultas: int, de_cache: int = 0) -> FastAPI:
+  """App with one route that runs `consultas` statements, `de_cache` of them
+  as a cache loader would."""
+  app = FastAPI()
+  app.add_middleware(MetricsMiddleware)
+
+  @app.get("/ruta", dependencies=[Depends(query_budget(presupuesto))])
+  async def ruta(db: AsyncSession = Depends(get_async_db)):
+    with outside_query_budget():
+      for _ in range(de_cache):
+        await db.execute(text("SELECT 1"))
+    for _ in range(consultas):
+      await db.execute(text("SELECT 1"))
+    return {}
+
+  return app
+
+
+@pytest.fixture
+async def pedir(base_de_datos):
+
+  async def _pedir(app: FastAPI) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport,
+                                 base_url="http://test") as client:
+      return await client.get("/ruta")
+
+  yield _pedir
+  await async_engine.dispose()
+
+
+async def test_ruta_dentro_del_presupuesto(pedir):
+  assert (await pedir(_app(presupuesto=2, consultas=2))).status_code == 200
+
+
+async def test_ruta_sobre_el_presupuesto_falla(pedir):
+  with pytest.raises(QueryBudgetExceeded, match="/ruta"):
+    await pedir(_app(presupuesto=2, consultas=3))
+
+
+async def test_cargas_de_cache_no_cuentan(pedir):
+  app = _app(presupuesto=1, consultas=1, de_cache=3)
+  assert (await pedir(app)).status_code == 200
+
+
+async def test_listado_con_caches_frias(cliente, usuario):
+  reference_data.invalidate()
+  usuario_cache.pop(usuario)
+  respuesta = await cliente.get("/eventos_financieros/",
+                                params={"id_usuario": usuario})
+  assert respuesta.status_code == 200
@@ -0,0 +1,117 @@
+from datetime import date
+from datetime import timedelta
+from types import SimpleNamespace
+
+from api.services.recurrence_service import combinar
+from api.services.recurrence_service import contar_ocurrencias
+from api.services.recurrence_service import expandir
+from api.services.recurrence_service import ocurrencias
+from api.services.recurrence_service import primera_ocurrencia
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+RANGO = {"fecha_inicio": "2025-03-01", "fecha_fin": "2025-03-31"}
+
+
+def _evento(id_evento, fecha, semana_inicio=None):
+  return SimpleNamespace(id_evento=id_evento,
+                         fecha=fecha,
+                         semana_inicio=semana_inicio)
+
+
+def test_primera_ocurrencia_en_la_semana_de_inicio():
+  miercoles = date(2025, 3, 5)
+  assert primera_ocurrencia(miercoles, None) == miercoles
+  assert primera_ocurrencia(miercoles, date(2025, 3, 20)) == date(2025, 3, 19)
+
+
+def test_ocurrencias_y_conteo_coinciden_con_fuerza_bruta():
+  fecha = date(2025, 1, 8)
+  for semana_inicio in (None, date(2025, 2, 1)):
+    primera = primera_ocurrencia(fecha, semana_inicio)
+    todas = [primera + timedelta(weeks=i) for i in range(30)]
+    for inicio in range(0, 120, 11):
+      for largo in range(0, 60, 6):
+        desde = date(2024, 12, 20) + timedelta(days=inicio)
+        hasta = desde + timedelta(days=largo)
+        esperadas = [d for d in reversed(todas) if desde <= d <= hasta]
+        assert list(ocurrencias(fecha, semana_inicio, desde,
+                                hasta)) == esperadas
+        assert contar_ocurrencias(fecha, semana_inicio, desde,
+                                  hasta) == len(esperadas)
+
+
+def test_expandir_y_combinar_en_orden_del_listado():
+  lunes = _evento(1, date(2025, 3, 3))
+  otro_lunes = _evento(2, date(2025, 2, 24))
+  unico = _evento(3, date(2025, 3, 10))
+  series = expandir([(lunes, "a"), (otro_lunes, "b")], date(2025, 3, 1),
+                    date(2025, 3, 16))
+  items = combinar([(unico, "c")], series)
+  dias = [(fecha.day, ev.id_evento) for fecha, ev, _ in items]
+  assert dias == [(10, 3), (10, 2), (10, 1), (3, 2), (3, 1)]
+
+  series = expandir([(lunes, "a"), (otro_lunes, "b")], date(2025, 3, 1),
+                    date(2025, 3, 16))
+  pagina = combinar([(unico, "c")],
+                    series,
+                    antes_de=(date(2025, 3, 10), 2),
+                    inicio=1,
+                    cantidad=2)
+  dias = [(fecha.day, ev.id_evento) for fecha, ev, _ in pagina]
+  assert dias == [(3, 2), (3, 1)]
+
+
+async def test_listado_expande_recurrentes(cliente, usuario):
+  eventos = [
+      # Todos los lunes de marzo (3 al 31)
+      {
+          "tipo": "GASTO",
+          "id_categoria_gasto": 1,
+          "monto": 100,
+          "fecha": "2025-03-03",
+          "es_unico": False
+      },
+      # Serie iniciada en enero: también cae los lunes de marzo
+      {
+          "tipo": "INGRESO",
+          "id_categoria_ingreso": 1,
+          "monto": 1000,
+          "fecha": "2025-01-06",
+          "es_unico": False
+      },
+      {
+          "tipo": "GASTO",
+          "id_categoria_gasto": 2,
+          "monto": 50,
+          "fecha": "2025-03-12"
+      },
+  ]
+  respuesta = await cliente.post("/eventos_financieros/bulk",
+                                 params={"id_usuario": usuario},
+                                 json=eventos)
+  assert respuesta.json()["insertados"] == 3
+
+  params = {"id_usuario": usuario, "expandir_recurrentes": True, **RANGO}
+  cuerpo = (await cliente.get("/eventos_financieros/", params=params)).json()
+  assert cuerpo["total_eventos"] == 11
+  assert cuerpo["total_gastos"] == 5 * 100 + 50
+  assert cuerpo["total_ingresos"] == 5 * 1000
+  fechas = [evento["fecha"] for evento in cuerpo["eventos"]]
+  assert fechas == sorted(fechas, reverse=True)
+  assert fechas.count("2025-03-31") == 2
+
+  # Por cursor se recorren las mismas ocurrencias, sin repetir
+  paginas, cursor = [], None
+  while True:
+    pagina = {**params, "limit": 4}
+    if cursor:
+      pagina["cursor"] = cursor
+    respuesta = (await cliente.get("/eventos_financieros/",
+                                   params=pagina)).json()
+    paginas += [(e["fecha"], e["id_evento"]) for e in respuesta["eventos"]]
+    cursor = respuesta["next_cursor"]
+    if not cursor:
+      break
+  assert paginas == [(e["fecha"], e["id_evento"]) for e in cuerpo["eventos"]]
@@ -0,0 +1,121 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from api.database import SessionLocal
+from api.models.historial_score import HistorialScoreSalud
+from api.services.score_history_service import recalcular_scores
+from api.services.score_history_service import registrar_score
+import pytest
+from sqlalchemy import func
+from sqlalchemy import select
+
+pytestmark = pytest.mark.anyio
+
+AHORA = datetime.now(timezone.utc).replace(microsecond=0)
+
+# Perfil justo en 20% de ahorro y 80% de gastos: 70 puntos, pero 60 si
+# se dividieran los float del request (80.00000000000001% de gastos)
+PERFIL_EN_UMBRAL = {
+    "ingreso_mensual_estimado": 1083384.20,
+    "fuentes_ingreso": [],
+    "gastos_fijos_mensuales": 95337.81,
+    "gastos_variables_mensuales": 771369.55,
+    "ahorro_actual": 0,
+    "deuda_total": 0,
+    "meta_ahorro": {
+        "monto": 1000000,
+        "plazo_meses": 12
+    },
+    "ahorro_planificado_mensual": 216676.84,
+}
+
+
+def _snapshots(usuario):
+  with SessionLocal() as db:
+    return db.scalars(
+        select(HistorialScoreSalud.score).where(
+            HistorialScoreSalud.id_usuario == usuario).order_by(
+                HistorialScoreSalud.id_historial)).all()
+
+
+@pytest.fixture
+def historial(usuario):
+  """Tres puntajes del usuario, de hace dos días a hoy."""
+  with SessionLocal() as db:
+    for dias, score, estado in ((2, 45, "Regular"), (1, 65, "Buena"),
+                                (0, 85, "Excelente")):
+      registrar_score(
+          db, usuario, {
+              "score": score,
+              "status": estado,
+              "calculated_at": AHORA - timedelta(days=dias)
+          })
+    db.commit()
+  return usuario
+
+
+async def test_score_lee_el_ultimo_o_el_de_as_of(cliente, historial):
+  respuesta = await cliente.get("/financial_health/score",
+                                params={"id_usuario": historial})
+  assert respuesta.status_code == 200
+  assert respuesta.json()["score"] == 85
+
+  ayer = (AHORA - timedelta(hours=12)).isoformat()
+  respuesta = await cliente.get("/financial_health/score",
+                                params={
+                                    "id_usuario": historial,
+                                    "as_of": ayer
+                                })
+  assert respuesta.json()["score"] == 65
+
+  antes = (AHORA - timedelta(days=3)).isoformat()
+  respuesta = await cliente.get("/financial_health/score",
+                                params={
+                                    "id_usuario": historial,
+                                    "as_of": antes
+                                })
+  assert respuesta.status_code == 404
+  # as_of nunca registra un puntaje nuevo
+  assert len(_snapshots(historial)) == 3
+
+
+async def test_historial_filtra_y_ordena(cliente, historial):
+  respuesta = await cliente.get("/financial_health/score/history",
+                                params={"id_usuario": historial})
+  assert [s["score"] for s in respuesta.json()["historial"]] == [85, 65, 45]
+
+  respuesta = await cliente.get(
+      "/financial_health/score/history",
+      params={
+          "id_usuario": historial,
+          "desde": (AHORA - timedelta(days=1)).isoformat(),
+          "limit": 1
+      })
+  assert [s["score"] for s in respuesta.json()["historial"]] == [85]
+
+
+async def test_score_sin_historial_registra_el_primero(cliente, usuario):
+  assert _snapshots(usuario) == []
+  respuesta = await cliente.get("/financial_health/score",
+                                params={"id_usuario": usuario})
+  assert respuesta.status_code == 200
+  assert _snapshots(usuario) == [respuesta.json()["score"]]
+
+  # La segunda lectura sirve el mismo puntaje sin escribir
+  await cliente.get("/financial_health/score", params={"id_usuario": usuario})
+  assert len(_snapshots(usuario)) == 1
+
+
+async def test_recalculo_coincide_con_el_puntaje_al_escribir(cliente, usuario):
+  respuesta = await cliente.put("/perfil_personal/financiero",
+                                params={"id_usuario": usuario},
+                                json=PERFIL_EN_UMBRAL)
+  assert respuesta.status_code == 200
+
+  with SessionLocal() as db:
+    antes = db.scalar(select(func.count()).select_from(HistorialScoreSalud))
+    escritas = recalcular_scores(db, chunk_size=2)
+    despues = db.scalar(select(func.count()).select_from(HistorialScoreSalud))
+  assert escritas == despues - antes
+  assert _snapshots(usuario) == [70, 70]